@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from categories.models import Category
+from notes.signals import recompute_notes_count
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized Category.notes_count column from the notes table."
+
+    def handle(self, *args, **options):
+        updated = recompute_notes_count(Category.objects.all())
+        self.stdout.write(self.style.SUCCESS(f"Recomputed notes_count for {updated} categories."))
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:08
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_notes_count(apps, schema_editor):
+    Category = apps.get_model("categories", "Category")
+    Note = apps.get_model("notes", "Note")
+    counts = (
+        Note.objects.filter(category=OuterRef("pk"))
+        .order_by()
+        .values("category")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    Category.objects.update(notes_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0001_initial'),
+        ('notes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='notes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_notes_count, migrations.RunPython.noop),
+    ]
@@ -13,6 +13,9 @@ class Category(models.Model):
     name = models.CharField(max_length=60)
     color_hex = models.CharField(max_length=7)  # e.g. "#F3C6A3"
     created_at = models.DateTimeField(auto_now_add=True)
+    # Denormalized count kept in sync by notes.signals; read only when
+    # settings.CATEGORY_NOTES_COUNT_DENORMALIZED is enabled.
+    notes_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         constraints = [
@@ -1,6 +1,9 @@
+from functools import lru_cache
+
 from rest_framework import serializers
 
 from categories.models import Category
+from core.rows import DateTime, row_columns, rows_mapper
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -14,4 +17,21 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "name", "color_hex", "created_at", "notes_count"]
 
     def get_notes_count(self, obj):
-        return obj.notes.count()
+        live_count = getattr(obj, "live_notes_count", None)
+        return obj.notes_count if live_count is None else live_count
+
+
+@lru_cache(maxsize=None)
+def category_row(count_column: str):
+    """(columns, mapper) giving CategorySerializer output from values() rows (core.rows).
+
+    count_column is "live_notes_count" when annotated, else "notes_count".
+    """
+    spec = {
+        "id": "id",
+        "name": "name",
+        "color_hex": "color_hex",
+        "created_at": DateTime("created_at"),
+        "notes_count": count_column,
+    }
+    return row_columns(spec), rows_mapper(spec)
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from categories.models import Category
+from core.cache import bump_generation_on_commit
+from notes.events import publish_user_event
+
+
+@receiver(post_save, sender=Category, dispatch_uid="categories_category_saved")
+def category_saved(sender, instance, created=False, raw=False, **kwargs):
+    if not raw:
+        bump_generation_on_commit(instance.user_id)
+        event = "category.created" if created else "category.updated"
+        publish_user_event(instance.user_id, event, {"id": instance.pk})
+
+
+@receiver(post_delete, sender=Category, dispatch_uid="categories_category_deleted")
+def category_deleted(sender, instance, **kwargs):
+    bump_generation_on_commit(instance.user_id)
+    publish_user_event(instance.user_id, "category.deleted", {"id": instance.pk})
@@ -35,3 +35,106 @@ class TestCategoriesList:
         response = auth_client.get("/api/categories/")
         cat_data = next(c for c in response.data if c["name"] == "TestCat")
         assert cat_data["notes_count"] == 1
+
+    def test_categories_list_counts_notes_in_a_single_query(
+        self, auth_client, user1, django_assert_max_num_queries
+    ):
+        from conftest import create_note
+
+        for name in ("A", "B", "C"):
+            cat = create_category(user1, name, "#FF0000")
+            create_note(user1, cat, "N", "body " * 100)
+
+        # User lookup, two ETag version aggregates, one categories-with-counts query.
+        with django_assert_max_num_queries(4):
+            response = auth_client.get("/api/categories/")
+        assert response.status_code == 200
+        assert [c["notes_count"] for c in response.data] == [1, 1, 1]
+
+
+@pytest.mark.django_db
+class TestDenormalizedNotesCount:
+    def _counts(self, *categories):
+        from categories.models import Category
+
+        return [Category.objects.get(pk=c.pk).notes_count for c in categories]
+
+    def test_count_column_tracks_create_move_and_delete(self, user1):
+        from conftest import create_note
+
+        cat1 = create_category(user1, "C1", "#FF0000")
+        cat2 = create_category(user1, "C2", "#00FF00")
+        note = create_note(user1, cat1, "N", "")
+        create_note(user1, cat1, "M", "")
+        assert self._counts(cat1, cat2) == [2, 0]
+
+        note.category = cat2
+        note.save()
+        assert self._counts(cat1, cat2) == [1, 1]
+
+        note.delete()
+        assert self._counts(cat1, cat2) == [1, 0]
+
+    def test_list_reads_column_when_denormalized_setting_enabled(
+        self, auth_client, user1, settings
+    ):
+        from conftest import create_note
+
+        settings.CATEGORY_NOTES_COUNT_DENORMALIZED = True
+        cat = create_category(user1, "TestCat", "#FF0000")
+        create_note(user1, cat, "N", "")
+        response = auth_client.get("/api/categories/")
+        cat_data = next(c for c in response.data if c["name"] == "TestCat")
+        assert cat_data["notes_count"] == 1
+
+    def test_sync_command_repairs_drifted_counts(self, user1):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        from categories.models import Category
+        from conftest import create_note
+
+        cat = create_category(user1, "C", "#FF0000")
+        create_note(user1, cat, "N", "")
+        Category.objects.filter(pk=cat.pk).update(notes_count=42)
+        call_command("sync_notes_count", stdout=StringIO())
+        assert self._counts(cat) == [1]
+
+
+@pytest.mark.django_db
+class TestCategoriesConditional:
+    def test_categories_list_304_until_a_note_changes(self, auth_client, user1):
+        from conftest import create_note
+
+        cat = create_category(user1, "C", "#FF0000")
+        etag = auth_client.get("/api/categories/")["ETag"]
+        assert auth_client.get("/api/categories/", HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        create_note(user1, cat, "N", "")
+        response = auth_client.get("/api/categories/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.data[0]["notes_count"] == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("async_views")
+class TestAsyncCategoriesList:
+    def test_async_list_counts_notes_and_honours_etags(self, api_client, user1, user2, user_password):
+        from conftest import create_note
+
+        cat = create_category(user1, "Mine", "#FF0000")
+        create_category(user2, "Theirs", "#00FF00")
+        create_note(user1, cat, "N", "")
+        login(api_client, user1.email, user_password)
+
+        response = api_client.get("/api/categories/")
+        assert response.status_code == 200
+        assert [(c["name"], c["notes_count"]) for c in response.json()] == [("Mine", 1)]
+        etag = response["ETag"]
+        assert api_client.get("/api/categories/", HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        create_note(user1, cat, "N2", "")
+        response = api_client.get("/api/categories/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()[0]["notes_count"] == 2
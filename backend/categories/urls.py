@@ -1,9 +1,12 @@
+from django.conf import settings
 from django.urls import path
 
-from categories.views import CategoryListView
+from categories.views import AsyncCategoryListView, CategoryListView
 
 app_name = "categories"
 
+list_view = AsyncCategoryListView if settings.API_ASYNC_VIEWS else CategoryListView
+
 urlpatterns = [
-    path("", CategoryListView.as_view(), name="list"),
+    path("", list_view.as_view(), name="list"),
 ]
@@ -1,17 +1,71 @@
+from django.conf import settings
+from django.db.models import Count
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from rest_framework.generics import ListAPIView
 
 from categories.models import Category
-from categories.serializers import CategorySerializer
+from categories.serializers import CategorySerializer, category_row
+from core.async_views import AsyncAPIView, json_response
+from core.cache import CachedListMixin, aget_or_build, response_key
+from notes.conditional import aload_versions, category_list_etag, category_list_last_modified
 
 
-class CategoryListView(ListAPIView):
-    """GET /api/categories/ - List categories for the current user."""
+def categories_queryset(user):
+    qs = Category.objects.filter(user=user)
+    if not settings.CATEGORY_NOTES_COUNT_DENORMALIZED:
+        # One GROUP BY query instead of loading every note row.
+        qs = qs.annotate(live_notes_count=Count("notes"))
+    return qs.order_by("created_at", "id")
+
+
+def category_rows(user):
+    """categories_queryset() as values() rows, with the mapper to CategorySerializer output."""
+    if settings.CATEGORY_NOTES_COUNT_DENORMALIZED:
+        columns, to_dicts = category_row("notes_count")
+    else:
+        columns, to_dicts = category_row("live_notes_count")
+    return categories_queryset(user).values(*columns), to_dicts
+
+
+@method_decorator(
+    condition(etag_func=category_list_etag, last_modified_func=category_list_last_modified),
+    name="get",
+)
+class CategoryListView(CachedListMixin, ListAPIView):
+    """GET /api/categories/ - List categories for the current user (cached)."""
 
     serializer_class = CategorySerializer
+    cache_namespace = "categories"
+    allow_stateless_user = True
 
     def get_queryset(self):
-        return (
-            Category.objects.filter(user=self.request.user)
-            .prefetch_related("notes")
-            .order_by("created_at")
-        )
+        return categories_queryset(self.request.user)
+
+    def list_data(self, request, *args, **kwargs):
+        rows, to_dicts = category_rows(request.user)
+        return to_dicts(rows)
+
+
+@method_decorator(
+    condition(etag_func=category_list_etag, last_modified_func=category_list_last_modified),
+    name="get",
+)
+class AsyncCategoryListView(AsyncAPIView):
+    """Async CategoryListView (settings.API_ASYNC_VIEWS): same response, cache and ETags."""
+
+    allow_stateless_user = True
+
+    async def initial(self, request, *args, **kwargs):
+        await super().initial(request, *args, **kwargs)
+        await aload_versions(request, notes=True, categories=True)
+
+    async def get(self, request):
+        async def build():
+            rows, to_dicts = category_rows(request.user)
+            return to_dicts([row async for row in rows.aiterator()])
+
+        key = response_key("categories", request.user.pk, request.get_full_path())
+        response = json_response(await aget_or_build(key, build))
+        response.api_cache_key = key
+        return response
@@ -0,0 +1,73 @@
+"""Gunicorn configuration for production serving.
+
+Run from the backend directory:
+
+    gunicorn -c config/gunicorn_conf.py
+
+Every value comes from the SERVER_* settings so it can be tuned from env.
+"""
+
+import multiprocessing
+import os
+import tempfile
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+# Workers share their metrics through files here (core.prometheus).
+os.environ.setdefault(
+    "METRICS_DIR", os.path.join(tempfile.gettempdir(), f"notes-metrics-{os.getpid()}")
+)
+
+from django.conf import settings  # noqa: E402
+
+WORKER_CLASSES = {
+    "gthread": ("gthread", "config.wsgi:application"),
+    "uvicorn": ("uvicorn.workers.UvicornWorker", "config.asgi:application"),
+}
+
+if settings.SERVER_WORKER_CLASS not in WORKER_CLASSES:
+    raise RuntimeError(
+        f"SERVER_WORKER_CLASS must be one of {', '.join(WORKER_CLASSES)}, "
+        f"not {settings.SERVER_WORKER_CLASS!r}."
+    )
+
+worker_class, wsgi_app = WORKER_CLASSES[settings.SERVER_WORKER_CLASS]
+bind = settings.SERVER_BIND
+workers = settings.SERVER_WORKERS or multiprocessing.cpu_count() * 2 + 1
+threads = settings.SERVER_THREADS
+keepalive = settings.SERVER_KEEPALIVE
+timeout = settings.SERVER_TIMEOUT
+graceful_timeout = settings.SERVER_TIMEOUT
+max_requests = settings.SERVER_MAX_REQUESTS
+max_requests_jitter = settings.SERVER_MAX_REQUESTS_JITTER
+# Load (and warm up) the app once in the master; workers inherit it on fork.
+preload_app = True
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    from core import prometheus
+
+    prometheus.clear_directory()
+
+
+def post_fork(server, worker):
+    # Never share database connections opened in the master with forked workers.
+    from django.db import connections
+
+    from core import prometheus
+
+    connections.close_all()
+    prometheus.start_flusher()
+
+
+def worker_exit(server, worker):
+    from core import prometheus
+
+    prometheus.write_process_state()
+
+
+def child_exit(server, worker):
+    from core import prometheus
+
+    prometheus.archive_process(worker.pid)
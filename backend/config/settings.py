@@ -14,6 +14,7 @@ from datetime import timedelta
 from pathlib import Path
 import os
 
+from corsheaders.defaults import default_headers
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +46,11 @@ ALLOWED_HOSTS = [
 # Cookie security (set True in production over HTTPS)
 SECURE_COOKIE = os.getenv("SECURE_COOKIE", "false").lower() in ("true", "1", "yes")
 
+# Serve Category.notes_count from the denormalized column instead of a COUNT
+CATEGORY_NOTES_COUNT_DENORMALIZED = os.getenv(
+    "CATEGORY_NOTES_COUNT_DENORMALIZED", "false"
+).lower() in ("true", "1", "yes")
+
 
 # Application definition
 
@@ -57,12 +63,15 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "rest_framework",
     "corsheaders",
+    "core",
     "categories",
     "notes",
     "users",
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
+    'core.compression.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -75,6 +84,46 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'config.urls'
 
+# Per-request timing, query and size metrics (core.middleware); slower requests are logged at WARNING
+REQUEST_METRICS_ENABLED = os.getenv("REQUEST_METRICS_ENABLED", "true").lower() in ("true", "1", "yes")
+REQUEST_SERVER_TIMING = os.getenv("REQUEST_SERVER_TIMING", "true").lower() in ("true", "1", "yes")
+REQUEST_SLOW_MS = float(os.getenv("REQUEST_SLOW_MS", "500"))
+
+# Response compression (core.compression): encodings in preference order (br needs the
+# brotli package), smallest body worth compressing, and whether streamed responses are too
+RESPONSE_COMPRESSION_ENABLED = os.getenv("RESPONSE_COMPRESSION_ENABLED", "true").lower() in ("true", "1", "yes")
+RESPONSE_COMPRESSION_ENCODINGS = [
+    name.strip() for name in os.getenv("RESPONSE_COMPRESSION_ENCODINGS", "br,gzip").split(",") if name.strip()
+]
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+RESPONSE_COMPRESSION_STREAMING = os.getenv("RESPONSE_COMPRESSION_STREAMING", "false").lower() in ("true", "1", "yes")
+# Speed/ratio trade-off: gzip level 1-9, brotli quality 0-11 (its default 11 is too slow per request)
+RESPONSE_COMPRESSION_GZIP_LEVEL = int(os.getenv("RESPONSE_COMPRESSION_GZIP_LEVEL", "6"))
+RESPONSE_COMPRESSION_BROTLI_QUALITY = int(os.getenv("RESPONSE_COMPRESSION_BROTLI_QUALITY", "4"))
+
+# Directory where each worker process periodically writes its metrics for /metrics to merge
+# (config/gunicorn_conf.py creates one); empty serves the scraped process's metrics only
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+# Bearer token a scraper must send to /metrics; the endpoint is disabled (404) while empty
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+# How long the per-model row counts on /metrics are reused between scrapes
+METRICS_OBJECT_COUNTS_TTL = int(os.getenv("METRICS_OBJECT_COUNTS_TTL", "60"))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        # One JSON line per request; INFO logs every request, WARNING only slow ones
+        "core.requests": {
+            "handlers": ["console"],
+            "level": os.getenv("REQUEST_LOG_LEVEL", "WARNING"),
+            "propagate": False,
+        },
+    },
+}
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -96,30 +145,135 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# The core.backends engines wrap Django's to record connection metrics (core.db).
 _db_name = os.getenv("DB_NAME")
 if _db_name:
     DATABASES = {
         "default": {
-            "ENGINE": "django.db.backends.postgresql",
+            "ENGINE": "core.backends.postgresql",
             "NAME": _db_name,
             "USER": os.getenv("DB_USER", ""),
             "PASSWORD": os.getenv("DB_PASSWORD", ""),
             "HOST": os.getenv("DB_HOST", ""),
             "PORT": os.getenv("DB_PORT", "5432"),
+            # Seconds to keep a connection open between requests (0: close after each).
+            # Defaults to 0 under uvicorn (ASGI) workers: async ORM calls run on a thread
+            # per request, and each would leave its own idle connection open until it expired.
+            "CONN_MAX_AGE": int(
+                os.getenv(
+                    "DB_CONN_MAX_AGE",
+                    "0" if os.getenv("SERVER_WORKER_CLASS", "gthread") == "uvicorn" else "60",
+                )
+            ),
+            "CONN_HEALTH_CHECKS": os.getenv("DB_CONN_HEALTH_CHECKS", "true").lower()
+            in ("true", "1", "yes"),
         }
     }
+    # Optional psycopg 3 connection pool shared by all threads of a worker process.
+    # Django requires CONN_MAX_AGE = 0 with a pool: connections go back to it after each request.
+    if os.getenv("DB_POOL", "false").lower() in ("true", "1", "yes"):
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"] = {
+            "pool": {
+                "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+                "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+                "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+            }
+        }
 else:
     DATABASES = {
         "default": {
-            "ENGINE": "django.db.backends.sqlite3",
+            "ENGINE": "core.backends.sqlite3",
             "NAME": BASE_DIR / "db.sqlite3",
         }
     }
 
 
+# Cache
+# Local memory by default (and in tests); set REDIS_URL to share it across workers.
+_redis_url = os.getenv("REDIS_URL")
+if _redis_url:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": _redis_url,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Fan-out for live updates (core.pubsub): in-process unless REDIS_URL is set, since
+# without Redis an event only reaches clients connected to the worker that wrote it
+PUBSUB_BACKEND = os.getenv(
+    "PUBSUB_BACKEND", "core.pubsub.RedisBroker" if _redis_url else "core.pubsub.LocalBroker"
+)
+PUBSUB_REDIS_URL = os.getenv("PUBSUB_REDIS_URL", _redis_url or "")
+
+# Read-through cache of serialized list responses (core.cache)
+API_CACHE_ENABLED = os.getenv("API_CACHE_ENABLED", "true").lower() in ("true", "1", "yes")
+API_CACHE_ALIAS = "default"
+API_CACHE_TIMEOUT = int(os.getenv("API_CACHE_TIMEOUT", "300"))
+# A cold key is built by one request; others wait up to API_CACHE_LOCK_WAIT seconds
+API_CACHE_LOCK_TIMEOUT = 10
+API_CACHE_LOCK_WAIT = float(os.getenv("API_CACHE_LOCK_WAIT", "2"))
+
+# Authenticated-user cache in CookieJWTAuthentication (users.user_cache); 0 disables
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+AUTH_USER_LOCAL_CACHE_TTL = int(os.getenv("AUTH_USER_LOCAL_CACHE_TTL", "5"))
+# Build request.user from token claims (no DB/cache lookup) on opted-in read endpoints.
+# Trade-off: is_active is not checked there, so a deactivated account keeps read access
+# until its access token expires (SIMPLE_JWT ACCESS_TOKEN_LIFETIME); writes are refused.
+AUTH_STATELESS_READS = os.getenv("AUTH_STATELESS_READS", "false").lower() in ("true", "1", "yes")
+# Threads per process that compute password hashes (0: hash on the request thread)
+AUTH_HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", "0"))
+# Sliding-window limits on login/signup per client IP and per email (users.throttling); "" disables one
+AUTH_THROTTLE_ENABLED = os.getenv("AUTH_THROTTLE_ENABLED", "true").lower() in ("true", "1", "yes")
+AUTH_THROTTLE_RATES = {
+    "login_ip": os.getenv("AUTH_THROTTLE_LOGIN_IP", "30/min"),
+    "login_email": os.getenv("AUTH_THROTTLE_LOGIN_EMAIL", "5/min"),
+    "signup_ip": os.getenv("AUTH_THROTTLE_SIGNUP_IP", "10/hour"),
+    "signup_email": os.getenv("AUTH_THROTTLE_SIGNUP_EMAIL", "3/hour"),
+}
+
+
+# Production serving (config/gunicorn_conf.py). "gthread" runs config.wsgi with
+# SERVER_THREADS threads per worker; "uvicorn" runs config.asgi under uvicorn workers.
+SERVER_BIND = os.getenv("SERVER_BIND", "0.0.0.0:8000")
+SERVER_WORKER_CLASS = os.getenv("SERVER_WORKER_CLASS", "gthread")
+# 0 means 2 x CPU cores + 1
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "0"))
+SERVER_THREADS = int(os.getenv("SERVER_THREADS", "4"))
+SERVER_KEEPALIVE = int(os.getenv("SERVER_KEEPALIVE", "5"))
+SERVER_TIMEOUT = int(os.getenv("SERVER_TIMEOUT", "30"))
+# Recycle workers after this many requests (plus jitter) to bound memory growth; 0 disables
+SERVER_MAX_REQUESTS = int(os.getenv("SERVER_MAX_REQUESTS", "2000"))
+SERVER_MAX_REQUESTS_JITTER = int(os.getenv("SERVER_MAX_REQUESTS_JITTER", "200"))
+# Build URL resolvers and serializer fields at startup instead of on the first requests
+SERVER_WARMUP = os.getenv("SERVER_WARMUP", "true").lower() in ("true", "1", "yes")
+# Serve the notes list/detail and category list with the async views (core.async_views).
+# Defaults on under uvicorn (ASGI) workers; the sync DRF views suit gthread workers.
+API_ASYNC_VIEWS = os.getenv(
+    "API_ASYNC_VIEWS", "true" if SERVER_WORKER_CLASS == "uvicorn" else "false"
+).lower() in ("true", "1", "yes")
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
+# Django's defaults with PBKDF2 swapped for the pooled subclass (same hash format, see
+# users.hashers); listing both would let the plain one verify pbkdf2_sha256 hashes.
+PASSWORD_HASHERS = [
+    "users.hashers.PooledPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -162,13 +316,66 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # CORS configuration for local frontend
 CORS_ALLOWED_ORIGINS = ["http://localhost:3000"]
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_headers, "x-write-sequence")
+CORS_EXPOSE_HEADERS = ["ETag", "Last-Modified", "X-Write-Sequence"]
 CSRF_TRUSTED_ORIGINS = ["http://localhost:3000"]
 
 
+# Characters of note content returned as content_preview by the list endpoint
+NOTES_PREVIEW_LENGTH = int(os.getenv("NOTES_PREVIEW_LENGTH", "200"))
+
+# Delta sync: how long deletions are remembered, and how far each sync re-reads
+# before its cursor to cover writes that committed out of timestamp order
+NOTES_TOMBSTONE_RETENTION_DAYS = int(os.getenv("NOTES_TOMBSTONE_RETENTION_DAYS", "30"))
+NOTES_SYNC_OVERLAP_SECONDS = int(os.getenv("NOTES_SYNC_OVERLAP_SECONDS", "2"))
+# Most notes per /changes response; larger syncs are paged with has_more (0: no cap)
+NOTES_CHANGES_MAX = int(os.getenv("NOTES_CHANGES_MAX", "500"))
+
+# Revision history (notes.revisions): record a revision per note edit, and store a full
+# snapshot every NOTES_REVISION_SNAPSHOT_INTERVAL revisions so rebuilding one applies fewer deltas
+NOTES_REVISIONS_ENABLED = os.getenv("NOTES_REVISIONS_ENABLED", "true").lower() in ("true", "1", "yes")
+NOTES_REVISION_SNAPSHOT_INTERVAL = int(os.getenv("NOTES_REVISION_SNAPSHOT_INTERVAL", "20"))
+
+# Large-content tier (notes.storage): bodies longer than NOTES_LARGE_CONTENT_THRESHOLD characters
+# (0 keeps every body inline) are stored zlib-compressed in NOTES_LARGE_CONTENT_CHUNK_BYTES chunks
+# outside the notes table, which keeps the first NOTES_LARGE_CONTENT_HEAD_CHARS for previews and search
+NOTES_LARGE_CONTENT_THRESHOLD = int(os.getenv("NOTES_LARGE_CONTENT_THRESHOLD", "0"))
+NOTES_LARGE_CONTENT_HEAD_CHARS = int(os.getenv("NOTES_LARGE_CONTENT_HEAD_CHARS", "1000"))
+NOTES_LARGE_CONTENT_CHUNK_BYTES = int(os.getenv("NOTES_LARGE_CONTENT_CHUNK_BYTES", "262144"))
+
+# Honour X-Write-Sequence on note PATCH/PUT, dropping writes older than the last one applied
+NOTES_WRITE_SEQUENCES_ENABLED = os.getenv("NOTES_WRITE_SEQUENCES_ENABLED", "true").lower() in ("true", "1", "yes")
+
+# Live updates (GET /api/notes/events/, notes.events): seconds between keep-alives, seconds
+# before a stream ends and the client resumes with Last-Event-ID, and the client's retry delay
+NOTES_EVENTS_HEARTBEAT = float(os.getenv("NOTES_EVENTS_HEARTBEAT", "15"))
+NOTES_EVENTS_MAX_AGE = float(os.getenv("NOTES_EVENTS_MAX_AGE", "300"))
+NOTES_EVENTS_RETRY_MS = int(os.getenv("NOTES_EVENTS_RETRY_MS", "3000"))
+# Events buffered per stream before a slow client is told to resync
+NOTES_EVENTS_QUEUE_SIZE = int(os.getenv("NOTES_EVENTS_QUEUE_SIZE", "100"))
+
+# Maximum number of items accepted by one POST /api/notes/bulk/ request
+NOTES_BULK_MAX_ITEMS = int(os.getenv("NOTES_BULK_MAX_ITEMS", "1000"))
+
+# Rows fetched per server-side cursor round trip (and per streamed chunk) by /api/notes/export
+NOTES_EXPORT_CHUNK_SIZE = int(os.getenv("NOTES_EXPORT_CHUNK_SIZE", "500"))
+
+# Notes inserted per bulk_create (and per transaction) by imports, and per-row errors reported
+NOTES_IMPORT_BATCH_SIZE = int(os.getenv("NOTES_IMPORT_BATCH_SIZE", "500"))
+NOTES_IMPORT_MAX_ERRORS = int(os.getenv("NOTES_IMPORT_MAX_ERRORS", "100"))
+
+
 # Django REST framework configuration
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": ["users.authentication.CookieJWTAuthentication"],
     "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.IsAuthenticated"],
+    # orjson-backed JSON (same bytes as DRF's JSONRenderer; stdlib fallback without orjson)
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    # Proxies in front of the app, so throttles key on the real client IP from X-Forwarded-For
+    "NUM_PROXIES": int(os.environ["API_NUM_PROXIES"]) if os.getenv("API_NUM_PROXIES") else None,
 }
 
 # SimpleJWT
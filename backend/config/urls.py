@@ -17,9 +17,13 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
+from core.views import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/auth/", include("users.urls")),
     path("api/categories/", include("categories.urls")),
     path("api/notes/", include("notes.urls")),
+    path("api/ops/", include("core.urls")),
+    path("metrics", metrics_view, name="metrics"),
 ]
@@ -1,7 +1,10 @@
 """Pytest fixtures and helpers for backend tests."""
 
+import importlib
+
 import pytest
 from django.contrib.auth import get_user_model
+from django.urls import clear_url_caches
 from rest_framework.test import APIClient
 
 from categories.models import Category
@@ -39,6 +42,43 @@ def login(client: APIClient, email: str, password: str):
     )
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Isolate tests from each other's cached responses and counters."""
+    from django.core.cache import cache
+
+    from core import metrics
+    from users.user_cache import clear_local
+
+    cache.clear()
+    clear_local()
+    metrics.reset()
+    yield
+    cache.clear()
+    clear_local()
+
+
+def _reload_urlconfs():
+    import categories.urls
+    import config.urls
+    import notes.urls
+
+    for module in (notes.urls, categories.urls, config.urls):
+        importlib.reload(module)
+    clear_url_caches()
+
+
+@pytest.fixture
+def async_views(settings):
+    """Route notes and categories through the async views (API_ASYNC_VIEWS) for one test."""
+    original = settings.API_ASYNC_VIEWS
+    settings.API_ASYNC_VIEWS = True
+    _reload_urlconfs()
+    yield
+    settings.API_ASYNC_VIEWS = original
+    _reload_urlconfs()
+
+
 @pytest.fixture
 def api_client():
     """DRF API client."""
@@ -0,0 +1,80 @@
+"""A minimal async counterpart of DRF's APIView.
+
+DRF views are synchronous, so under ASGI every request holds a worker thread
+while it waits on the database. AsyncAPIView subclasses are native Django
+async views that keep DRF's request parsing, cookie JWT authentication,
+IsAuthenticated permission and error format, and render JSON themselves.
+Handlers use the async ORM; work that needs a transaction (the async ORM
+has none) runs in one sync_to_async call.
+"""
+
+from django.http import Http404, HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+from core.renderers import FastJSONRenderer
+from users.authentication import CookieJWTAuthentication
+
+
+def json_response(data, status: int = 200, headers=None) -> HttpResponse:
+    """Render data the way DRF's JSONRenderer would."""
+    return HttpResponse(
+        FastJSONRenderer().render(data),
+        status=status,
+        content_type="application/json",
+        headers=headers,
+    )
+
+
+class AsyncAPIView(View):
+    """Async view with DRF-compatible authentication, permissions and error responses.
+
+    Subclasses define ``async def get/post/...`` handlers receiving a DRF
+    Request and returning a Django HttpResponse (see json_response).
+    """
+
+    allow_stateless_user = False
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Authentication is by JWT cookie only, as on the DRF views.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.authenticator = CookieJWTAuthentication()
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = Request(
+            request,
+            parsers=[parser() for parser in self.parser_classes],
+            parser_context={"view": self, "args": args, "kwargs": kwargs},
+        )
+        self.request = request
+        try:
+            await self.initial(request, *args, **kwargs)
+            return await super().dispatch(request, *args, **kwargs)
+        except (APIException, Http404) as exc:
+            return self.handle_exception(exc)
+
+    async def initial(self, request, *args, **kwargs):
+        """Authenticate and require a user; subclasses extend this to preload state."""
+        result = await self.authenticator.aauthenticate(request)
+        if result is None:
+            raise NotAuthenticated()
+        request.user, request.auth = result
+
+    def handle_exception(self, exc):
+        if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+            exc.auth_header = self.authenticator.authenticate_header(self.request)
+        response = exception_handler(exc, {"view": self, "request": self.request})
+        if response is None:
+            raise exc
+        # Keep WWW-Authenticate / Retry-After; the content type is json_response's own.
+        headers = {k: v for k, v in response.headers.items() if k.lower() != "content-type"}
+        return json_response(response.data, status=response.status_code, headers=headers)
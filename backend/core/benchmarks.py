@@ -0,0 +1,278 @@
+"""API benchmark runner: latency percentiles, query counts and response sizes.
+
+Requests go through Django's test client against whatever database is
+configured (normally one filled by ``manage.py seed_notes``), so numbers
+include middleware, authentication, serialization and SQL but not network
+or server overhead. Each scenario also reports what response compression
+(core.compression) would save on its body and the CPU it costs per
+encoding. Used by ``manage.py benchmark_api``.
+"""
+
+import math
+import statistics
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from categories.models import Category
+from core.compression import available_encodings, compress
+from notes.models import Note, NoteRevision
+from notes.revisions import start_history
+from users.authentication import ACCESS_COOKIE_NAME, REFRESH_COOKIE_NAME
+
+# URL namespaces and names that are intentionally not benchmarked (staff-only tooling,
+# and the live-update stream, which never completes).
+EXCLUDED_URL_NAMES = {"admin", "ops", "metrics", "notes:events"}
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values) -> dict:
+    return {
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "mean": statistics.fmean(values),
+        "max": max(values),
+    }
+
+
+@dataclass
+class Scenario:
+    """One benchmarked request.
+
+    ``prepare(ctx)`` returns (path, payload) for each iteration, so scenarios
+    that consume resources (e.g. DELETE) can create a fresh one first.
+    """
+
+    name: str
+    url_name: str
+    method: str
+    prepare: object
+    hashes_password: bool = False
+    extra_headers: dict = field(default_factory=dict)
+
+
+def _new_note(ctx) -> Note:
+    return Note.objects.create(user=ctx.user, category_id=ctx.category_id, title="bench", content="x")
+
+
+def _unique_email() -> str:
+    return f"bench-signup-{uuid.uuid4().hex[:12]}@example.com"
+
+
+def default_scenarios():
+    return [
+        Scenario("auth.signup", "users:signup", "post",
+                 lambda ctx: ("/api/auth/signup/", {"email": _unique_email(), "password": ctx.password}),
+                 hashes_password=True),
+        Scenario("auth.login", "users:login", "post",
+                 lambda ctx: ("/api/auth/login/", {"email": ctx.user.email, "password": ctx.password}),
+                 hashes_password=True),
+        Scenario("auth.refresh", "users:refresh", "post", lambda ctx: ("/api/auth/refresh/", None)),
+        Scenario("auth.me", "users:me", "get", lambda ctx: ("/api/auth/me/", None)),
+        Scenario("auth.logout", "users:logout", "post", lambda ctx: ("/api/auth/logout/", None)),
+        Scenario("categories.list", "categories:list", "get", lambda ctx: ("/api/categories/", None)),
+        Scenario("notes.list", "notes:list-create", "get", lambda ctx: ("/api/notes/", None)),
+        Scenario("notes.list.deep_page", "notes:list-create", "get", lambda ctx: (ctx.deep_page_url, None)),
+        Scenario("notes.list.category", "notes:list-create", "get",
+                 lambda ctx: (f"/api/notes/?category={ctx.category_id}", None)),
+        Scenario("notes.list.sparse", "notes:list-create", "get",
+                 lambda ctx: ("/api/notes/?fields=id,title,updated_at", None)),
+        Scenario("notes.create", "notes:list-create", "post",
+                 lambda ctx: ("/api/notes/", {"title": "bench", "content": "body"})),
+        Scenario("notes.search", "notes:search", "get", lambda ctx: ("/api/notes/search?q=meeting", None)),
+        Scenario("notes.changes", "notes:changes", "get",
+                 lambda ctx: (f"/api/notes/changes?since={ctx.sync_cursor}", None)),
+        Scenario("notes.bulk", "notes:bulk", "post",
+                 lambda ctx: ("/api/notes/bulk/", {
+                     "create": [{"title": f"bulk {i}", "category_id": ctx.category_id} for i in range(20)],
+                 })),
+        Scenario("notes.import", "notes:import", "post",
+                 lambda ctx: ("/api/notes/import?type=json", [
+                     {"title": f"import {i}", "content": "body", "category": "Imported"} for i in range(20)
+                 ])),
+        Scenario("notes.export", "notes:export", "get", lambda ctx: ("/api/notes/export", None)),
+        Scenario("notes.detail", "notes:detail", "get", lambda ctx: (f"/api/notes/{ctx.note_id}/", None)),
+        Scenario("notes.patch", "notes:detail", "patch",
+                 lambda ctx: (f"/api/notes/{ctx.note_id}/", {"content": f"edit {uuid.uuid4().hex}"})),
+        Scenario("notes.revisions", "notes:revisions", "get",
+                 lambda ctx: (f"/api/notes/{ctx.note_id}/revisions/", None)),
+        Scenario("notes.revision", "notes:revision", "get",
+                 lambda ctx: (f"/api/notes/{ctx.note_id}/revisions/{ctx.latest_revision()}/", None)),
+        Scenario("notes.delete", "notes:detail", "delete",
+                 lambda ctx: (f"/api/notes/{_new_note(ctx).pk}/", None)),
+    ]
+
+
+def covered_url_names(scenarios) -> set:
+    return {s.url_name for s in scenarios}
+
+
+def all_url_names() -> set:
+    """Named API routes from the root URLconf, ignoring '-no-slash' aliases."""
+    names = set()
+
+    def walk(patterns, namespace=""):
+        for pattern in patterns:
+            if hasattr(pattern, "url_patterns"):
+                ns = pattern.namespace or ""
+                if ns in EXCLUDED_URL_NAMES:
+                    continue
+                walk(pattern.url_patterns, f"{namespace}{ns}:" if ns else namespace)
+            elif (
+                pattern.name
+                and not pattern.name.endswith("-no-slash")
+                and f"{namespace}{pattern.name}" not in EXCLUDED_URL_NAMES
+            ):
+                names.add(f"{namespace}{pattern.name}")
+
+    walk(get_resolver().url_patterns)
+    return names
+
+
+class BenchmarkContext:
+    """Per-run fixtures: the benchmarked user, ids to hit and an authenticated client."""
+
+    def __init__(self, user, password):
+        self.user = user
+        self.password = password
+        self.category_id = (
+            Category.objects.filter(user=user).order_by("created_at").values_list("pk", flat=True).first()
+        )
+        self.note_id = (
+            Note.objects.filter(user=user).order_by("-updated_at").values_list("pk", flat=True).first()
+            or _new_note(self).pk
+        )
+        # Make sure notes.revision has a revision to rebuild.
+        start_history(Note.objects.get(pk=self.note_id))
+        self.client = Client(HTTP_HOST="localhost")
+        self.authenticate()
+        self.deep_page_url = self._deep_page_url()
+        self.sync_cursor = self.client.get("/api/notes/changes?fields=id").json()["cursor"]
+
+    def latest_revision(self) -> int:
+        revisions = NoteRevision.objects.filter(note_id=self.note_id).order_by("-number")
+        return revisions.values_list("number", flat=True).first()
+
+    def authenticate(self):
+        refresh = RefreshToken.for_user(self.user)
+        self.client.cookies[ACCESS_COOKIE_NAME] = str(refresh.access_token)
+        self.client.cookies[REFRESH_COOKIE_NAME] = str(refresh)
+
+    def _deep_page_url(self, hops: int = 5) -> str:
+        """Follow a few next cursors so deep pages are measured too."""
+        url = "/api/notes/?fields=id"
+        for _ in range(hops):
+            next_url = self.client.get(url).json().get("next")
+            if not next_url:
+                break
+            url = next_url
+        return url.replace("fields=id", "fields=id,title,content_preview,category,updated_at")
+
+
+def compression_stats(body: bytes, repeat: int = 5) -> dict:
+    """Compressed size, bytes saved and best-of-repeat CPU time per available encoding."""
+    stats = {}
+    for encoding in available_encodings():
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            compressed = compress(body, encoding)
+            best = min(best, time.perf_counter() - started)
+        stats[encoding] = {
+            "bytes": len(compressed),
+            "saved_bytes": len(body) - len(compressed),
+            "cpu_ms": best * 1000.0,
+        }
+    return stats
+
+
+def run_scenario(ctx, scenario, iterations: int, warmup: int) -> dict:
+    latencies, queries, sizes, statuses = [], [], [], set()
+    send = getattr(ctx.client, scenario.method)
+    for i in range(warmup + iterations):
+        path, payload = scenario.prepare(ctx)
+        kwargs = {"content_type": "application/json", **scenario.extra_headers}
+        if payload is not None:
+            kwargs["data"] = payload
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = send(path, **kwargs)
+            # Streaming responses run their queries while being consumed.
+            body = b"".join(response.streaming_content) if response.streaming else response.content
+            elapsed = time.perf_counter() - started
+        # Logout/refresh rewrite cookies; keep the client authenticated.
+        ctx.authenticate()
+        if i < warmup:
+            continue
+        statuses.add(response.status_code)
+        latencies.append(elapsed * 1000.0)
+        queries.append(len(captured.captured_queries))
+        sizes.append(len(body))
+    return {
+        "url_name": scenario.url_name,
+        "method": scenario.method.upper(),
+        "iterations": iterations,
+        "statuses": sorted(statuses),
+        "latency_ms": summarize(latencies),
+        "queries": {"mean": statistics.fmean(queries), "max": max(queries)},
+        "response_bytes": {"mean": statistics.fmean(sizes), "max": max(sizes)},
+        # Of the last body; the middleware skips bodies under RESPONSE_COMPRESSION_MIN_BYTES.
+        "compression": compression_stats(body),
+    }
+
+
+def run_benchmarks(user, password, iterations=50, warmup=5, hash_iterations=5, only=None):
+    """Run every scenario (or those whose name starts with one of ``only``)."""
+    scenarios = default_scenarios()
+    if only:
+        scenarios = [s for s in scenarios if any(s.name.startswith(prefix) for prefix in only)]
+    ctx = BenchmarkContext(user, password)
+    results = {}
+    # Repeated logins from one client would otherwise measure the 429 path.
+    with override_settings(AUTH_THROTTLE_ENABLED=False):
+        for scenario in scenarios:
+            count = hash_iterations if scenario.hashes_password else iterations
+            results[scenario.name] = run_scenario(
+                ctx, scenario, iterations=max(1, count), warmup=min(warmup, count)
+            )
+    return {
+        "meta": {
+            "vendor": connection.vendor,
+            "iterations": iterations,
+            "user_notes": Note.objects.filter(user=user).count(),
+            "uncovered_url_names": sorted(all_url_names() - covered_url_names(default_scenarios())),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.2) -> list:
+    """List regressions of p95 latency (relative threshold) or mean query count."""
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        old_p95 = before["latency_ms"]["p95"]
+        new_p95 = result["latency_ms"]["p95"]
+        if old_p95 > 0 and new_p95 > old_p95 * (1 + threshold):
+            regressions.append(f"{name}: p95 {old_p95:.2f}ms -> {new_p95:.2f}ms")
+        if result["queries"]["mean"] > before["queries"]["mean"]:
+            regressions.append(
+                f"{name}: queries {before['queries']['mean']:.1f} -> {result['queries']['mean']:.1f}"
+            )
+    return regressions
@@ -0,0 +1,171 @@
+"""Per-user read-through cache for serialized API responses.
+
+Every cache key embeds a per-user generation number. Writes bump the
+generation (after commit), which orphans all of that user's entries at once
+without having to enumerate them; orphaned entries simply expire.
+"""
+
+import asyncio
+import hashlib
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+from core import metrics
+
+
+def _cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def _generation_key(user_id) -> str:
+    return f"api:gen:{user_id}"
+
+
+def get_generation(user_id) -> int:
+    """Return the user's current cache generation, initialising it if missing."""
+    cache = _cache()
+    key = _generation_key(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        # Seed from the clock so an evicted counter never reuses an old generation.
+        cache.add(key, time.time_ns(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(user_id) -> None:
+    """Invalidate every cached response for user_id."""
+    cache = _cache()
+    key = _generation_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def bump_generation_on_commit(user_id) -> None:
+    """Bump now and, inside a transaction, again after commit.
+
+    The second bump discards anything a concurrent reader cached from the
+    pre-commit state between the first bump and the commit.
+    """
+    bump_generation(user_id)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: bump_generation(user_id))
+
+
+def response_key(namespace: str, user_id, variant: str) -> str:
+    """Cache key for one response variant (e.g. the full path with query string)."""
+    digest = hashlib.sha1(variant.encode()).hexdigest()
+    return f"api:{namespace}:{user_id}:{get_generation(user_id)}:{digest}"
+
+
+_POLL_INTERVAL = 0.02
+
+
+def _lookup(cache, key):
+    value = cache.get(key)
+    if value is not None:
+        metrics.increment("api_cache.hit")
+    return value
+
+
+def _acquire(cache, key) -> bool:
+    """Take key's build lock; False when another caller holds it."""
+    locked = cache.add(f"{key}:lock", 1, timeout=settings.API_CACHE_LOCK_TIMEOUT)
+    if not locked:
+        metrics.increment("api_cache.stampede_wait")
+    return locked
+
+
+def _stampede_polls():
+    """Yield until API_CACHE_LOCK_WAIT elapses; the caller sleeps _POLL_INTERVAL and polls each time."""
+    deadline = time.monotonic() + settings.API_CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        yield
+    # Only reached when the caller never found the value.
+    metrics.increment("api_cache.stampede_timeout")
+
+
+@contextmanager
+def _building(cache, key, locked):
+    """Around a build after a miss: release the build lock (if taken) however it ends."""
+    metrics.increment("api_cache.miss")
+    try:
+        yield
+    finally:
+        if locked:
+            cache.delete(f"{key}:lock")
+
+
+def get_or_build(key: str, builder):
+    """Return the cached value for key, building and storing it on a miss.
+
+    On a cold key only one caller builds the value; concurrent callers poll
+    for it briefly instead of all hitting the database at once.
+    """
+    if not settings.API_CACHE_ENABLED:
+        return builder()
+    cache = _cache()
+    value = _lookup(cache, key)
+    if value is not None:
+        return value
+    locked = _acquire(cache, key)
+    if not locked:
+        for _ in _stampede_polls():
+            time.sleep(_POLL_INTERVAL)
+            value = _lookup(cache, key)
+            if value is not None:
+                return value
+    with _building(cache, key, locked):
+        value = builder()
+        cache.set(key, value, timeout=settings.API_CACHE_TIMEOUT)
+    return value
+
+
+async def aget_or_build(key: str, builder):
+    """get_or_build() for async views: builder is a coroutine function.
+
+    Cache calls stay synchronous (they are in-memory or one short round trip);
+    only the stampede wait yields to the event loop instead of sleeping.
+    """
+    if not settings.API_CACHE_ENABLED:
+        return await builder()
+    cache = _cache()
+    value = _lookup(cache, key)
+    if value is not None:
+        return value
+    locked = _acquire(cache, key)
+    if not locked:
+        for _ in _stampede_polls():
+            await asyncio.sleep(_POLL_INTERVAL)
+            value = _lookup(cache, key)
+            if value is not None:
+                return value
+    with _building(cache, key, locked):
+        value = await builder()
+        cache.set(key, value, timeout=settings.API_CACHE_TIMEOUT)
+    return value
+
+
+class CachedListMixin:
+    """Serve a ListAPIView's GET from the per-user cache, keyed by path and query string."""
+
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        key = response_key(self.cache_namespace, request.user.pk, request.get_full_path())
+        data = get_or_build(key, lambda: self.list_data(request, *args, **kwargs))
+        response = Response(data)
+        # Lets core.compression store the compressed body next to the cached data.
+        response.api_cache_key = key
+        return response
+
+    def list_data(self, request, *args, **kwargs):
+        """The response data to cache; ListAPIView.list() by default."""
+        return super(CachedListMixin, self).list(request, *args, **kwargs).data
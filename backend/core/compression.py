@@ -0,0 +1,230 @@
+"""Response compression (gzip, and brotli when installed).
+
+CompressionMiddleware encodes a response in the best encoding that is both
+listed in RESPONSE_COMPRESSION_ENCODINGS and accepted by the client. It
+leaves a response alone when:
+
+* it is smaller than RESPONSE_COMPRESSION_MIN_BYTES,
+* it already has a Content-Encoding (the export gzips itself),
+* its media type is not text-like, or is an event stream,
+* it is streamed and RESPONSE_COMPRESSION_STREAMING is off,
+* the compressed body would not be smaller.
+
+Responses built from the per-user API cache (core.cache) carry their cache
+key as ``response.api_cache_key``. Their compressed bodies are stored next
+to the cached data, under that key plus the encoding and a digest of the
+body (which also covers renderer variants), so a hot list is compressed
+once per cache generation instead of on every hit.
+
+Like Django's GZipMiddleware, a strong ETag becomes weak on a compressed
+response (RFC 9110 section 8.8.1).
+"""
+
+import gzip
+import hashlib
+import time
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+
+from core import metrics
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/javascript", "application/xml", "image/svg+xml",
+)
+# Each event must reach the client as soon as it is written.
+NEVER_COMPRESSED_TYPES = ("text/event-stream",)
+
+
+class _GzipStream:
+    def __init__(self):
+        # wbits 31: a gzip header and trailer around the deflate stream.
+        level = settings.RESPONSE_COMPRESSION_GZIP_LEVEL
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        # Flush each chunk so streamed responses keep arriving as they are produced.
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=settings.RESPONSE_COMPRESSION_BROTLI_QUALITY)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def _gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=settings.RESPONSE_COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def _brotli(body: bytes) -> bytes:
+    return brotli.compress(body, quality=settings.RESPONSE_COMPRESSION_BROTLI_QUALITY)
+
+
+# Content-Encoding token -> (whole-body function, streaming compressor class).
+ENCODERS = {"gzip": (_gzip, _GzipStream)}
+if brotli is not None:  # pragma: no cover - optional dependency
+    ENCODERS["br"] = (_brotli, _BrotliStream)
+
+
+def available_encodings() -> list:
+    """RESPONSE_COMPRESSION_ENCODINGS that this install can produce, in preference order."""
+    return [name for name in settings.RESPONSE_COMPRESSION_ENCODINGS if name in ENCODERS]
+
+
+def accepted_encodings(header: str) -> set:
+    """Content codings an Accept-Encoding header allows (q > 0)."""
+    accepted, refused = set(), set()
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        (accepted if q > 0 else refused).add(name)
+    if "*" in accepted:
+        accepted |= set(ENCODERS) - refused
+    return accepted - refused
+
+
+def choose_encoding(request):
+    """The encoding to respond with, or None for identity."""
+    header = request.META.get("HTTP_ACCEPT_ENCODING", "")
+    if not header:
+        return None
+    accepted = accepted_encodings(header)
+    for name in available_encodings():
+        if name in accepted:
+            return name
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    return ENCODERS[encoding][0](body)
+
+
+def _compressible(response) -> bool:
+    media_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+    if media_type.startswith(NEVER_COMPRESSED_TYPES):
+        return False
+    return media_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def _compress_body(response, encoding: str):
+    """Compressed response.content, from the API cache when the response came from it."""
+    body = response.content
+    key = getattr(response, "api_cache_key", None)
+    cache = caches[settings.API_CACHE_ALIAS]
+    if key is not None and settings.API_CACHE_ENABLED:
+        key = f"{key}:{encoding}:{hashlib.blake2b(body, digest_size=16).hexdigest()}"
+        compressed = cache.get(key)
+        if compressed is not None:
+            metrics.increment("compression.cache.hit")
+            return compressed
+        metrics.increment("compression.cache.miss")
+    started = time.perf_counter()
+    compressed = compress(body, encoding)
+    metrics.observe(f"compression.{encoding}.cpu_ms", (time.perf_counter() - started) * 1000.0)
+    if key is not None and settings.API_CACHE_ENABLED:
+        cache.set(key, compressed, timeout=settings.API_CACHE_TIMEOUT)
+    return compressed
+
+
+def _stream(chunks, encoding: str):
+    compressor = ENCODERS[encoding][1]()
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def _astream(chunks, encoding: str):
+    compressor = ENCODERS[encoding][1]()
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def compress_response(request, response):
+    """Encode response in place for request's Accept-Encoding, when worthwhile."""
+    if response.has_header("Content-Encoding") or not _compressible(response):
+        return response
+    if response.streaming:
+        if not settings.RESPONSE_COMPRESSION_STREAMING:
+            return response
+    elif len(response.content) < settings.RESPONSE_COMPRESSION_MIN_BYTES:
+        return response
+
+    patch_vary_headers(response, ("Accept-Encoding",))
+    encoding = choose_encoding(request)
+    if encoding is None:
+        return response
+
+    if response.streaming:
+        if response.is_async:
+            response.streaming_content = _astream(response.streaming_content, encoding)
+        else:
+            response.streaming_content = _stream(response.streaming_content, encoding)
+        del response.headers["Content-Length"]
+    else:
+        size = len(response.content)
+        compressed = _compress_body(response, encoding)
+        if len(compressed) >= size:
+            return response
+        metrics.increment(f"compression.{encoding}.responses")
+        metrics.observe(f"compression.{encoding}.bytes_saved", size - len(compressed))
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(compressed))
+
+    etag = response.get("ETag")
+    if etag and etag.startswith('"'):
+        response.headers["ETag"] = "W/" + etag
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+class CompressionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if settings.RESPONSE_COMPRESSION_ENABLED:
+            compress_response(request, response)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if settings.RESPONSE_COMPRESSION_ENABLED:
+            compress_response(request, response)
+        return response
@@ -0,0 +1,109 @@
+"""Database connection instrumentation.
+
+The project's database engines (``core.backends.*``) wrap Django's built-in
+ones to count connections opened and closed per process and to time how long
+each request waits to acquire one: a full TCP + auth handshake without
+pooling, or the wait for a free slot when psycopg's pool is enabled. They
+also time every query run inside ``record_queries()``.
+"""
+
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+
+from core import metrics
+
+
+class QueryLog:
+    """Queries run inside one record_queries() block."""
+
+    __slots__ = ("count", "duration", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def add(self, sql: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements[sql] += 1
+
+    @property
+    def duplicates(self) -> int:
+        """Queries whose SQL (before parameters) already ran in this block, e.g. an N+1."""
+        return self.count - len(self.statements)
+
+
+# Context variables follow sync_to_async(), so async views are recorded too.
+_query_log = ContextVar("query_log", default=None)
+
+
+@contextmanager
+def record_queries():
+    """Collect every query run in this context, on any alias, into a QueryLog."""
+    log = QueryLog()
+    token = _query_log.set(log)
+    try:
+        yield log
+    finally:
+        _query_log.reset(token)
+
+
+def _record_query(execute, sql, params, many, context):
+    log = _query_log.get()
+    if log is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        log.add(sql, time.perf_counter() - started)
+
+
+class InstrumentedConnectionMixin:
+    """Mixed into a DatabaseWrapper to record connection and query metrics."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.execute_wrappers.append(_record_query)
+
+    def get_new_connection(self, conn_params):
+        started = time.perf_counter()
+        connection = super().get_new_connection(conn_params)
+        metrics.observe(f"db.{self.alias}.acquire_ms", (time.perf_counter() - started) * 1000.0)
+        metrics.increment(f"db.{self.alias}.connections_opened")
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            metrics.increment(f"db.{self.alias}.connections_closed")
+        return super()._close()
+
+
+def connection_stats() -> dict:
+    """Per-alias connection settings, opened/closed/open counts, acquire times and pool stats.
+
+    ``open`` is opened minus closed: it includes idle persistent connections.
+    """
+    counters = metrics.snapshot("db.")
+    timings = metrics.summaries("db.")
+    stats = {}
+    for alias in connections:
+        wrapper = connections[alias]
+        settings_dict = wrapper.settings_dict
+        opened = counters.get(f"db.{alias}.connections_opened", 0)
+        closed = counters.get(f"db.{alias}.connections_closed", 0)
+        pool = getattr(wrapper, "pool", None)
+        stats[alias] = {
+            "vendor": wrapper.vendor,
+            "conn_max_age": settings_dict["CONN_MAX_AGE"],
+            "conn_health_checks": settings_dict["CONN_HEALTH_CHECKS"],
+            "connections": {"opened": opened, "closed": closed, "open": opened - closed},
+            "acquire_ms": timings.get(f"db.{alias}.acquire_ms"),
+            "pool": pool.get_stats() if pool is not None else None,
+        }
+    return stats
@@ -0,0 +1,82 @@
+"""Closed-loop HTTP load generator for comparing servers.
+
+Each of ``concurrency`` threads keeps one persistent connection and issues
+requests back to back until the deadline, so throughput reflects how many
+requests the server completes rather than a fixed arrival rate. A
+``think_time`` makes each client pause between requests, modelling many slow,
+mostly idle clients that still hold a connection each.
+"""
+
+import http.client
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from core.benchmarks import summarize
+
+
+def _worker(url, headers, deadline, think_time, latencies, statuses, errors, lock):
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    conn = None
+    local_latencies, local_statuses, local_errors = [], Counter(), 0
+    while time.perf_counter() < deadline:
+        if conn is None:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+        started = time.perf_counter()
+        try:
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            local_errors += 1
+            conn.close()
+            conn = None
+            continue
+        local_latencies.append((time.perf_counter() - started) * 1000.0)
+        local_statuses[response.status] += 1
+        if response.will_close:
+            conn.close()
+            conn = None
+        if think_time:
+            time.sleep(max(0.0, min(think_time, deadline - time.perf_counter())))
+    if conn is not None:
+        conn.close()
+    with lock:
+        latencies.extend(local_latencies)
+        statuses.update(local_statuses)
+        errors.append(local_errors)
+
+
+def run_load(
+    url: str, headers=None, concurrency: int = 16, duration: float = 10.0, think_time: float = 0.0
+) -> dict:
+    """GET ``url`` from ``concurrency`` keep-alive clients for ``duration`` seconds."""
+    latencies, statuses, errors = [], Counter(), []
+    lock = threading.Lock()
+    started = time.perf_counter()
+    deadline = started + duration
+    threads = [
+        threading.Thread(
+            target=_worker,
+            args=(url, headers or {}, deadline, think_time, latencies, statuses, errors, lock),
+            daemon=True,
+        )
+        for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "think_time_s": think_time,
+        "duration_s": elapsed,
+        "requests": len(latencies),
+        "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "errors": sum(errors),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "latency_ms": summarize(latencies) if latencies else None,
+    }
@@ -0,0 +1,80 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+
+from core.benchmarks import compare, run_benchmarks
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every API endpoint against the configured database and print "
+        "latency percentiles, query counts and response sizes as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--email", help="User to benchmark as (default: the user with the most notes)."
+        )
+        parser.add_argument("--password", default="benchmark-password")
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument(
+            "--hash-iterations", type=int, default=5,
+            help="Iterations for scenarios that hash a password (signup, login).",
+        )
+        parser.add_argument(
+            "--only", action="append", help="Run only scenarios whose name starts with this prefix."
+        )
+        parser.add_argument("--output", help="Write results JSON to this file instead of stdout.")
+        parser.add_argument("--compare", help="Baseline results JSON to check for regressions.")
+        parser.add_argument("--threshold", type=float, default=0.2, help="Allowed p95 slowdown ratio.")
+        parser.add_argument(
+            "--commit", action="store_true",
+            help="Keep the rows written by the run (rolled back by default).",
+        )
+
+    def handle(self, *args, **options):
+        user = self.get_user(options["email"])
+        with transaction.atomic():
+            results = run_benchmarks(
+                user,
+                options["password"],
+                iterations=options["iterations"],
+                warmup=options["warmup"],
+                hash_iterations=options["hash_iterations"],
+                only=options["only"],
+            )
+            if not options["commit"]:
+                transaction.set_rollback(True)
+
+        payload = json.dumps(results, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                fh.write(payload + "\n")
+            self.stderr.write(f"Wrote {options['output']}")
+        else:
+            self.stdout.write(payload)
+
+        if options["compare"]:
+            with open(options["compare"]) as fh:
+                baseline = json.load(fh)
+            regressions = compare(baseline, results, options["threshold"])
+            if regressions:
+                raise CommandError("Regressions detected:\n  " + "\n  ".join(regressions))
+            self.stderr.write(self.style.SUCCESS("No regressions against baseline."))
+
+    def get_user(self, email):
+        if email:
+            user = User.objects.filter(email=email).first()
+        else:
+            user = (
+                User.objects.annotate(n=Count("notes")).order_by("-n", "pk").first()
+            )
+        if user is None:
+            raise CommandError("No user to benchmark; run `manage.py seed_notes` first.")
+        return user
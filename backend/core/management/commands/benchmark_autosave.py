@@ -0,0 +1,90 @@
+import json
+import random
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from categories.models import Category
+from notes.models import Note
+from users.authentication import ACCESS_COOKIE_NAME
+
+User = get_user_model()
+
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE")
+
+
+def autosaves(rng: random.Random, count: int, repeat: float, reorder: float) -> list:
+    """(sequence, content) PATCHes in the order they reach the server.
+
+    A fraction ``repeat`` re-send the previous content unchanged (blur, tab
+    switch), and a fraction ``reorder`` overtake the save sent before them.
+    """
+    sent, content = [], "Draft"
+    for sequence in range(1, count + 1):
+        if not sent or rng.random() >= repeat:
+            content += f" word{rng.getrandbits(16)}"
+        sent.append((sequence, content))
+    for i in range(1, len(sent)):
+        if rng.random() < reorder:
+            sent[i - 1], sent[i] = sent[i], sent[i - 1]
+    return sent
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay an editor's autosave PATCHes to one note, with and without "
+        "X-Write-Sequence, and report the INSERT/UPDATE/DELETE statements they "
+        "cause (with their SQL size, a proxy for the data written) and whether "
+        "the latest text survives, as JSON. Everything it writes is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--saves", type=int, default=200)
+        parser.add_argument("--repeat", type=float, default=0.3, help="Fraction of unchanged re-sends.")
+        parser.add_argument("--reorder", type=float, default=0.1, help="Fraction arriving out of order.")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        saves = autosaves(rng, options["saves"], options["repeat"], options["reorder"])
+        results = {"saves": len(saves), "distinct_contents": len({content for _, content in saves})}
+        for mode, sequenced in (("plain", False), ("sequenced", True)):
+            with transaction.atomic():
+                results[mode] = self.replay(saves, sequenced)
+                transaction.set_rollback(True)
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def replay(self, saves, sequenced: bool) -> dict:
+        user = User.objects.create_user(username="bench-autosave", email="bench-autosave@example.com")
+        category = Category.objects.create(user=user, name="Bench", color_hex="#000000")
+        note = Note.objects.create(user=user, category=category, title="Autosave", content="")
+        client = Client(HTTP_HOST="localhost")
+        client.cookies[ACCESS_COOKIE_NAME] = str(RefreshToken.for_user(user).access_token)
+
+        writes = {statement: 0 for statement in WRITE_STATEMENTS}
+        written_bytes = 0
+        statuses = set()
+        for sequence, content in saves:
+            headers = {"HTTP_X_WRITE_SEQUENCE": str(sequence)} if sequenced else {}
+            with CaptureQueriesContext(connection) as captured:
+                response = client.patch(
+                    f"/api/notes/{note.pk}/", {"content": content}, content_type="application/json", **headers
+                )
+            statuses.add(response.status_code)
+            for query in captured.captured_queries:
+                statement = query["sql"].lstrip().split(" ", 1)[0].upper()
+                if statement in writes:
+                    writes[statement] += 1
+                    written_bytes += len(query["sql"].encode())
+        note.refresh_from_db()
+        return {
+            "statuses": sorted(statuses),
+            "write_statements": {**writes, "total": sum(writes.values())},
+            "writes_per_save": round(sum(writes.values()) / len(saves), 3),
+            "write_sql_bytes": written_bytes,
+            "final_content_is_latest": note.content == max(saves)[1],
+        }
@@ -0,0 +1,85 @@
+import json
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models.functions import Substr
+from django.test import override_settings
+
+from categories.models import Category
+from core.benchmarks import summarize
+from notes.models import Note
+from notes.storage import fill_rows, offload_existing
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Time a full list scan of one user's notes and reads of their large bodies, "
+        "with every body inline and again after offloading the large ones "
+        "(notes.storage), as JSON. Everything it writes is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--notes", type=int, default=2000)
+        parser.add_argument("--large", type=float, default=0.02, help="Fraction of large notes.")
+        parser.add_argument("--size", type=int, default=500_000, help="Characters per large note.")
+        parser.add_argument("--threshold", type=int, default=100_000)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            results = self.run(options)
+            transaction.set_rollback(True)
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def run(self, options):
+        rng = random.Random(options["seed"])
+        user = User.objects.create_user(username="bench-large", email="bench-large@example.com")
+        category = Category.objects.create(user=user, name="Bench", color_hex="#000000")
+        line_count = max(1, options["size"] // 40)
+        notes = []
+        for i in range(options["notes"]):
+            if rng.random() < options["large"]:
+                content = "".join(f"Line {n}: {rng.getrandbits(96):024x}.\n" for n in range(line_count))
+            else:
+                content = f"Short note {i}."
+            notes.append(Note(user=user, category=category, title=f"Note {i}", content=content))
+        Note.objects.bulk_create(notes)
+        large_ids = [note.pk for note in notes if len(note.content) > options["threshold"]]
+
+        results = {
+            "notes": len(notes),
+            "large_notes": len(large_ids),
+            "inline": self.measure(user, large_ids, options),
+        }
+        with override_settings(NOTES_LARGE_CONTENT_THRESHOLD=options["threshold"]):
+            started = time.perf_counter()
+            offload_existing(batch_size=100)
+            results["offload_ms"] = (time.perf_counter() - started) * 1000.0
+            results["offloaded"] = self.measure(user, large_ids, options)
+        return results
+
+    def measure(self, user, large_ids, options):
+        scan_ms, detail_ms = [], []
+        for _ in range(options["repeat"]):
+            started = time.perf_counter()
+            list(
+                Note.objects.filter(user=user)
+                .order_by("-updated_at", "-id")
+                .annotate(content_preview=Substr("content", 1, 200))
+                .values_list("id", "title", "content_preview", "updated_at")
+            )
+            scan_ms.append((time.perf_counter() - started) * 1000.0)
+            for note_id in large_ids[:5]:
+                started = time.perf_counter()
+                fill_rows(list(Note.objects.filter(pk=note_id).values("id", "content", "content_offloaded")))
+                detail_ms.append((time.perf_counter() - started) * 1000.0)
+        return {
+            "list_scan_ms": summarize(scan_ms),
+            "large_detail_ms": summarize(detail_ms) if detail_ms else None,
+        }
@@ -0,0 +1,93 @@
+import json
+import random
+import time
+import zlib
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from categories.models import Category
+from core.benchmarks import summarize
+from notes.models import Note, NoteRevision
+from notes.revisions import rebuild, record_revision
+
+User = get_user_model()
+
+
+def edit(lines: list, rng: random.Random, changes: int) -> None:
+    """Replace, insert or delete a few lines, as a typical edit would."""
+    for _ in range(changes):
+        index = rng.randrange(len(lines))
+        action = rng.random()
+        if action < 0.6:
+            lines[index] = f"Edited line {rng.getrandbits(32):08x}, reworded a little.\n"
+        elif action < 0.85 or len(lines) < 2:
+            lines.insert(index, f"New sentence {rng.getrandbits(32):08x} added here.\n")
+        else:
+            del lines[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Edit one large note many times and report revision storage (deltas and "
+        "snapshots against full copies) and the latency of writing and rebuilding "
+        "revisions, as JSON. Everything it writes is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=50_000, help="Approximate note size in bytes.")
+        parser.add_argument("--revisions", type=int, default=200)
+        parser.add_argument("--changes", type=int, default=3, help="Lines changed per revision.")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            results = self.run(options)
+            transaction.set_rollback(True)
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def run(self, options):
+        rng = random.Random(options["seed"])
+        user = User.objects.create_user(username="bench-revisions", email="bench-revisions@example.com")
+        category = Category.objects.create(user=user, name="Bench", color_hex="#000000")
+        lines = [
+            f"Line {i}: the quick brown fox jumps over the lazy dog {rng.getrandbits(16)}.\n"
+            for i in range(max(1, options["size"] // 64))
+        ]
+        note = Note.objects.create(user=user, category=category, title="Large", content="".join(lines))
+
+        write_ms = []
+        full_bytes = compressed_full_bytes = 0
+        for _ in range(options["revisions"]):
+            previous = note.title, note.content
+            edit(lines, rng, options["changes"])
+            note.content = "".join(lines)
+            note.save()
+            started = time.perf_counter()
+            record_revision(note, *previous)
+            write_ms.append((time.perf_counter() - started) * 1000.0)
+
+        revisions = list(NoteRevision.objects.filter(note=note).order_by("number"))
+        rebuild_ms = []
+        for revision in revisions:
+            started = time.perf_counter()
+            _, content = rebuild(note.pk, revision.number)
+            rebuild_ms.append((time.perf_counter() - started) * 1000.0)
+            full_bytes += len(content.encode())
+            compressed_full_bytes += len(zlib.compress(content.encode()))
+
+        stored_bytes = sum(len(revision.data) for revision in revisions)
+        return {
+            "revisions": len(revisions),
+            "note_bytes": len(note.content.encode()),
+            "snapshots": sum(1 for revision in revisions if revision.depth == 0),
+            "storage_bytes": {
+                "full_copies": full_bytes,
+                "compressed_full_copies": compressed_full_bytes,
+                "stored": stored_bytes,
+                "stored_per_revision": round(stored_bytes / len(revisions), 1),
+            },
+            "write_ms": summarize(write_ms),
+            "rebuild_ms": summarize(rebuild_ms),
+        }
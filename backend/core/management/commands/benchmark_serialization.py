@@ -0,0 +1,98 @@
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import FastJSONRenderer
+from notes.models import Note
+from notes.serializers import (
+    NOTE_ROW_COLUMNS,
+    NoteListSerializer,
+    NoteSerializer,
+    note_list_row,
+    note_rows,
+)
+from notes.views import NoteListRepresentationMixin
+
+User = get_user_model()
+
+
+def per_note_us(function, notes: int, iterations: int) -> float:
+    """Best-of-iterations time of function(), in microseconds per note."""
+    best = float("inf")
+    for _ in range(iterations):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return round(best / max(notes, 1) * 1e6, 2)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-note cost of building and rendering note responses: "
+        "DRF serializers + JSONRenderer over model instances against row mappers + "
+        "FastJSONRenderer over values() rows. Prints JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--email", help="User whose notes to serialize (default: the user with the most notes)."
+        )
+        parser.add_argument("--limit", type=int, default=500, help="Notes per run.")
+        parser.add_argument("--iterations", type=int, default=20)
+
+    def handle(self, *args, **options):
+        user = self.get_user(options["email"])
+        notes = Note.objects.filter(user=user).order_by("-updated_at")[: options["limit"]]
+        fields = list(NoteListSerializer.Meta.fields)
+        list_qs = NoteListRepresentationMixin().restrict_columns(notes, fields)
+        columns, to_list_dicts = note_list_row(frozenset(fields))
+
+        # Rows are fetched once: this times building and rendering the bodies, not the queries.
+        list_instances = list(list_qs)
+        list_rows = list(list_qs.values(*columns))
+        instances = list(notes.select_related("category"))
+        rows = list(notes.values(*NOTE_ROW_COLUMNS))
+
+        def serializer_list():
+            return JSONRenderer().render(NoteListSerializer(list_instances, many=True).data)
+
+        def rows_list():
+            return FastJSONRenderer().render(to_list_dicts(list_rows))
+
+        def serializer_detail():
+            return JSONRenderer().render(NoteSerializer(instances, many=True).data)
+
+        def rows_detail():
+            return FastJSONRenderer().render(note_rows(rows))
+
+        if serializer_list() != rows_list() or serializer_detail() != rows_detail():
+            raise CommandError("Fast path output differs from the serializers.")
+
+        iterations = options["iterations"]
+        n = len(rows)
+        results = {"notes": n}
+        for name, before, after in (
+            ("list", serializer_list, rows_list),
+            ("detail", serializer_detail, rows_detail),
+        ):
+            before_us = per_note_us(before, n, iterations)
+            after_us = per_note_us(after, n, iterations)
+            results[name] = {
+                "serializer_us_per_note": before_us,
+                "fast_path_us_per_note": after_us,
+                "speedup": round(before_us / after_us, 2) if after_us else None,
+            }
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def get_user(self, email):
+        if email:
+            user = User.objects.filter(email=email).first()
+        else:
+            user = User.objects.annotate(n=Count("notes")).order_by("-n", "pk").first()
+        if user is None:
+            raise CommandError("No user to benchmark; run `manage.py seed_notes` first.")
+        return user
@@ -0,0 +1,156 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.loadtest import run_load
+from users.authentication import ACCESS_COOKIE_NAME
+
+User = get_user_model()
+
+SERVERS = ("runserver", "gunicorn", "gunicorn-async")
+
+# Environment each server profile runs with (--env values override it).
+SERVER_ENV = {
+    "gunicorn-async": {"SERVER_WORKER_CLASS": "uvicorn", "API_ASYNC_VIEWS": "true"},
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_command(server: str, port: int) -> list:
+    """Command line that serves the project on 127.0.0.1:<port>."""
+    if server == "runserver":
+        return [sys.executable, "manage.py", "runserver", "--noreload", f"127.0.0.1:{port}"]
+    if server in ("gunicorn", "gunicorn-async"):
+        return [
+            sys.executable, "-m", "gunicorn", "-c", "config/gunicorn_conf.py",
+            "--bind", f"127.0.0.1:{port}",
+        ]
+    raise CommandError(f"Unknown server {server!r}; choose from {', '.join(SERVERS)}.")
+
+
+def wait_until_ready(url: str, process, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError(f"Server exited with status {process.returncode} before serving.")
+        try:
+            urllib.request.urlopen(url, timeout=1)
+            return
+        except urllib.error.HTTPError:
+            return  # Any HTTP response (401 included) means it is serving.
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f"Server did not answer {url} within {timeout:.0f}s.")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure requests/second on an endpoint under runserver, the production "
+        "gunicorn profile (config/gunicorn_conf.py) and gunicorn with uvicorn workers "
+        "serving the async views. For many slow clients use e.g. "
+        "--concurrency 500 --think-time 0.5."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--servers", default=",".join(SERVERS), help=f"Comma-separated: {','.join(SERVERS)}."
+        )
+        parser.add_argument("--path", default="/api/notes/")
+        parser.add_argument(
+            "--email", help="User to authenticate as (default: the user with the most notes)."
+        )
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds per server.")
+        parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds first.")
+        parser.add_argument(
+            "--think-time", type=float, default=0.0,
+            help="Seconds each client idles between requests (slow clients).",
+        )
+        parser.add_argument(
+            "--env", action="append", default=[], metavar="KEY=VALUE",
+            help="Extra environment for the servers, e.g. SERVER_WORKERS=4 or API_CACHE_ENABLED=false.",
+        )
+        parser.add_argument("--output", help="Write results JSON to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        servers = [s.strip() for s in options["servers"].split(",") if s.strip()]
+        for server in servers:
+            server_command(server, 0)
+        overrides = {}
+        for item in options["env"]:
+            key, sep, value = item.partition("=")
+            if not sep:
+                raise CommandError(f"--env expects KEY=VALUE, got {item!r}.")
+            overrides[key] = value
+
+        headers = {"Cookie": f"{ACCESS_COOKIE_NAME}={self.access_token(options['email'])}"}
+        results = {}
+        for server in servers:
+            port = free_port()
+            url = f"http://127.0.0.1:{port}{options['path']}"
+            process = subprocess.Popen(
+                server_command(server, port),
+                cwd=settings.BASE_DIR,
+                env={**os.environ, **SERVER_ENV.get(server, {}), **overrides},
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                wait_until_ready(url, process)
+                load = (url, headers, options["concurrency"])
+                if options["warmup"] > 0:
+                    run_load(*load, options["warmup"], options["think_time"])
+                results[server] = run_load(*load, options["duration"], options["think_time"])
+            finally:
+                process.terminate()
+                try:
+                    process.wait(timeout=15)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            self.stderr.write(
+                f"{server:>14}: {results[server]['requests_per_second']:8.1f} req/s, "
+                f"{results[server]['errors']} errors, statuses {results[server]['statuses']}"
+            )
+
+        payload = json.dumps(
+            {
+                "meta": {
+                    "path": options["path"],
+                    "concurrency": options["concurrency"],
+                    "think_time": options["think_time"],
+                },
+                "results": results,
+            },
+            indent=2,
+            sort_keys=True,
+        )
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                fh.write(payload + "\n")
+        else:
+            self.stdout.write(payload)
+
+    def access_token(self, email):
+        if email:
+            user = User.objects.filter(email=email).first()
+        else:
+            user = User.objects.annotate(n=Count("notes")).order_by("-n", "pk").first()
+        if user is None:
+            raise CommandError("No user to authenticate as; run `manage.py seed_notes` first.")
+        return str(RefreshToken.for_user(user).access_token)
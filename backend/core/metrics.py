@@ -0,0 +1,118 @@
+"""In-process counters for operational metrics (cache hits, throttled requests, ...).
+
+Each process keeps its own; ``state()`` and ``merge()`` let core.prometheus
+combine the states of several worker processes.
+"""
+
+import threading
+from bisect import bisect_left
+from collections import Counter
+
+# Upper bounds of latency histogram buckets in milliseconds; one more bucket holds the rest.
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_lock = threading.Lock()
+_counters = Counter()
+# name -> [count, total, max]
+_observations = {}
+# name -> (bucket upper bounds, per-bucket counts)
+_histograms = {}
+
+
+def increment(name: str, value: int = 1) -> None:
+    """Add value to the named counter."""
+    with _lock:
+        _counters[name] += value
+
+
+def observe(name: str, value: float) -> None:
+    """Record one measurement (e.g. a duration) under name."""
+    with _lock:
+        stats = _observations.setdefault(name, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += value
+        stats[2] = max(stats[2], value)
+
+
+def histogram(name: str, value: float, buckets=LATENCY_BUCKETS_MS) -> None:
+    """Count value in the first bucket whose upper bound is >= value."""
+    with _lock:
+        entry = _histograms.get(name)
+        if entry is None:
+            entry = _histograms[name] = (tuple(buckets), [0] * (len(buckets) + 1))
+        entry[1][bisect_left(entry[0], value)] += 1
+
+
+def snapshot(prefix: str = "") -> dict:
+    """Return a copy of all counters, optionally only those starting with prefix."""
+    with _lock:
+        return {name: value for name, value in _counters.items() if name.startswith(prefix)}
+
+
+def summaries(prefix: str = "") -> dict:
+    """Return {name: {count, total, mean, max}} for observations starting with prefix."""
+    with _lock:
+        return {
+            name: {
+                "count": count,
+                "total": total,
+                "mean": total / count if count else 0.0,
+                "max": peak,
+            }
+            for name, (count, total, peak) in _observations.items()
+            if name.startswith(prefix)
+        }
+
+
+def histograms(prefix: str = "") -> dict:
+    """Return {name: {upper bound: count}} (not cumulative; "+Inf" last) for names starting with prefix."""
+    with _lock:
+        return {
+            name: {
+                **{str(bound): count for bound, count in zip(bounds, counts)},
+                "+Inf": counts[-1],
+            }
+            for name, (bounds, counts) in _histograms.items()
+            if name.startswith(prefix)
+        }
+
+
+def state() -> dict:
+    """A JSON-serialisable copy of every counter, observation and histogram."""
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "observations": {name: list(stats) for name, stats in _observations.items()},
+            "histograms": {
+                name: [list(bounds), list(counts)] for name, (bounds, counts) in _histograms.items()
+            },
+        }
+
+
+def merge(states) -> dict:
+    """Combine state() dicts: counters, counts, totals and buckets add up; maxima take the max."""
+    merged = {"counters": Counter(), "observations": {}, "histograms": {}}
+    for item in states:
+        merged["counters"].update(item.get("counters", {}))
+        for name, (count, total, peak) in item.get("observations", {}).items():
+            stats = merged["observations"].setdefault(name, [0, 0.0, 0.0])
+            stats[0] += count
+            stats[1] += total
+            stats[2] = max(stats[2], peak)
+        for name, (bounds, counts) in item.get("histograms", {}).items():
+            entry = merged["histograms"].get(name)
+            if entry is None or entry[0] != bounds:
+                # Bounds only differ across a deploy that changed them; the newest wins.
+                merged["histograms"][name] = [list(bounds), list(counts)]
+            else:
+                entry[1] = [a + b for a, b in zip(entry[1], counts)]
+    merged["counters"] = dict(merged["counters"])
+    return merged
+
+
+def reset() -> None:
+    """Clear every counter, observation and histogram (used by tests)."""
+    with _lock:
+        _counters.clear()
+        _observations.clear()
+        _histograms.clear()
@@ -0,0 +1,120 @@
+"""Per-request latency, query and size instrumentation.
+
+RequestMetricsMiddleware times each request, records the queries it runs
+(count, DB time, duplicated SQL) through ``core.db.record_queries`` and the
+size of the response, then:
+
+* adds a ``Server-Timing`` header (``app`` and ``db`` durations),
+* aggregates the numbers in ``core.metrics`` under the resolved view name
+  (e.g. ``notes:list-create``), readable by staff at ``/api/ops/requests/``,
+* logs one JSON line to the ``core.requests`` logger: at WARNING for
+  requests slower than REQUEST_SLOW_MS, at INFO otherwise.
+
+It works for sync and async views alike. Queries run while a streaming
+response is being sent are not included.
+"""
+
+import json
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from core import metrics
+from core.db import record_queries
+
+logger = logging.getLogger("core.requests")
+
+_FIELDS = ("wall_ms", "db_ms", "queries", "duplicate_queries", "response_bytes")
+
+
+def _view_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match is not None else "unresolved"
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.REQUEST_METRICS_ENABLED:
+            return self.get_response(request)
+        started = time.perf_counter()
+        with record_queries() as queries:
+            response = self.get_response(request)
+        self.record(request, response, started, queries)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.REQUEST_METRICS_ENABLED:
+            return await self.get_response(request)
+        started = time.perf_counter()
+        with record_queries() as queries:
+            response = await self.get_response(request)
+        self.record(request, response, started, queries)
+        return response
+
+    def record(self, request, response, started, queries) -> None:
+        wall_ms = (time.perf_counter() - started) * 1000.0
+        db_ms = queries.duration * 1000.0
+        view = _view_name(request)
+        sample = {
+            "wall_ms": wall_ms,
+            "db_ms": db_ms,
+            "queries": queries.count,
+            "duplicate_queries": queries.duplicates,
+        }
+        if not response.streaming:
+            sample["response_bytes"] = len(response.content)
+
+        for field, value in sample.items():
+            metrics.observe(f"request.{view}.{field}", value)
+        metrics.histogram(f"request.{view}.wall_ms", wall_ms)
+        metrics.increment(f"request.{view}.status.{response.status_code // 100}xx")
+
+        if settings.REQUEST_SERVER_TIMING:
+            response["Server-Timing"] = (
+                f'app;dur={wall_ms:.1f}, '
+                f'db;dur={db_ms:.1f};desc="{queries.count} queries, {queries.duplicates} duplicated"'
+            )
+
+        level = logging.WARNING if wall_ms >= settings.REQUEST_SLOW_MS else logging.INFO
+        if logger.isEnabledFor(level):
+            record = {
+                "method": request.method,
+                "path": request.path,
+                "view": view,
+                "status": response.status_code,
+                **{field: round(value, 2) for field, value in sample.items()},
+            }
+            logger.log(level, json.dumps(record), extra={"request_metrics": record})
+
+
+def request_stats() -> dict:
+    """Aggregates recorded by RequestMetricsMiddleware, keyed by view name."""
+    counters = metrics.snapshot("request.")
+    timings = metrics.summaries("request.")
+    histograms = metrics.histograms("request.")
+    stats = {}
+    for name, summary in timings.items():
+        view, _, field = name[len("request."):].rpartition(".")
+        if field in _FIELDS:
+            stats.setdefault(view, {"status": {}})[field] = summary
+    for name, count in counters.items():
+        view, _, status_class = name[len("request."):].rpartition(".status.")
+        if view in stats:
+            stats[view]["status"][status_class] = count
+    for name, buckets in histograms.items():
+        view = name[len("request."):].rpartition(".")[0]
+        if view in stats:
+            stats[view]["wall_ms_histogram"] = buckets
+    return stats
@@ -0,0 +1,304 @@
+"""Prometheus text exposition of core.metrics across worker processes.
+
+core.metrics only sees its own process, and a scrape of ``/metrics`` reaches
+one gunicorn worker. With METRICS_DIR set (config/gunicorn_conf.py sets one
+up), every worker writes its metrics state to ``worker-<pid>.json`` there
+from a background thread every METRICS_FLUSH_INTERVAL seconds and once more
+on exit; the master folds the files of exited workers into
+``archive.json`` so their counts are not lost. A scrape merges the live
+state of the scraped worker with the files of the others, so requests never
+wait on metrics I/O, and other workers' numbers are at most one flush
+interval old.
+
+Counters, summaries and histograms add up across processes. Open database
+connections only count live workers. Object counts come from one
+``count()`` per model, cached for METRICS_OBJECT_COUNTS_TTL seconds.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+
+from categories.models import Category
+from core import metrics
+from notes.models import Note
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+ARCHIVE_FILE = "archive.json"
+_WORKER_FILE = re.compile(r"worker-(\d+)\.json$")
+_CONNECTIONS = r"db\.(?P<alias>[^.]+)\.connections_(?P<event>opened|closed)"
+
+# (pattern on the core.metrics name, metric family, help); named groups become labels.
+_COUNTERS = (
+    (r"request\.(?P<view>.+)\.status\.(?P<status>\w+)", "http_requests_total",
+     "Requests served, by view and status class."),
+    (_CONNECTIONS, "db_connections_total",
+     "Database connections opened and closed."),
+    (r"api_cache\.(?P<result>\w+)", "api_cache_lookups_total",
+     "API response cache lookups by result."),
+    (r"auth_user_cache\.(?P<result>\w+)", "auth_user_cache_lookups_total",
+     "Authenticated-user cache lookups by result."),
+    (r"auth\.(?P<event>login|signup|refresh|token)\.(?P<outcome>\w+)", "auth_events_total",
+     "Logins, signups and token refreshes by outcome, and rejected access tokens."),
+    (r"auth\.password_hashes", "auth_password_hashes_total",
+     "Password hashes computed."),
+    (r"auth_throttle\.rejected\.(?P<scope>\w+)", "auth_throttle_rejections_total",
+     "Login/signup requests rejected by each throttle."),
+    (r"auth_throttle\.hashes_avoided", "auth_password_hashes_avoided_total",
+     "Password hashes not computed because the request was throttled."),
+)
+# Same, for observations, with the factor that converts them to base units.
+_SUMMARIES = (
+    (r"request\.(?P<view>.+)\.db_ms", "http_request_db_seconds", 0.001,
+     "Time spent in database queries per request."),
+    (r"request\.(?P<view>.+)\.queries", "http_request_queries", 1,
+     "Database queries per request."),
+    (r"request\.(?P<view>.+)\.duplicate_queries", "http_request_duplicate_queries", 1,
+     "Queries per request whose SQL already ran in the same request."),
+    (r"request\.(?P<view>.+)\.response_bytes", "http_response_bytes", 1,
+     "Response body size (streamed responses excluded)."),
+    (r"db\.(?P<alias>[^.]+)\.acquire_ms", "db_connection_acquire_seconds", 0.001,
+     "Time to open or check out a database connection."),
+    (r"auth\.hash_queue_ms", "auth_password_hash_queue_seconds", 0.001,
+     "Time password hashes waited for a hashing thread."),
+)
+_HISTOGRAMS = (
+    (r"request\.(?P<view>.+)\.wall_ms", "http_request_duration_seconds", 0.001,
+     "Request latency, from the first middleware to the response."),
+)
+
+
+def _compile(rules):
+    return tuple((re.compile(pattern + "$"), *rest) for pattern, *rest in rules)
+
+
+_COUNTERS, _SUMMARIES, _HISTOGRAMS = map(_compile, (_COUNTERS, _SUMMARIES, _HISTOGRAMS))
+_CONNECTIONS = re.compile(_CONNECTIONS + "$")
+
+
+# -- Per-process state files ------------------------------------------------
+
+
+def _write_json(path: str, data) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(data, fh)
+    os.replace(tmp, path)
+
+
+def _read_json(path: str):
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def clear_directory() -> None:
+    """Remove the previous run's files (gunicorn on_starting)."""
+    directory = settings.METRICS_DIR
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        if name.endswith((".json", ".tmp")):
+            os.remove(os.path.join(directory, name))
+
+
+def write_process_state() -> None:
+    """Write this process's metrics to METRICS_DIR (flusher thread, gunicorn worker_exit)."""
+    if settings.METRICS_DIR:
+        path = os.path.join(settings.METRICS_DIR, f"worker-{os.getpid()}.json")
+        _write_json(path, metrics.state())
+
+
+_flusher = None
+
+
+def start_flusher() -> None:
+    """Write this process's state every METRICS_FLUSH_INTERVAL seconds (gunicorn post_fork)."""
+    global _flusher
+    if not settings.METRICS_DIR or _flusher is not None:
+        return
+
+    def run():
+        while True:
+            try:
+                write_process_state()
+            except OSError:
+                logger.exception("Could not write metrics to %s", settings.METRICS_DIR)
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+
+    _flusher = threading.Thread(target=run, name="metrics-flusher", daemon=True)
+    _flusher.start()
+
+
+def archive_process(pid: int) -> None:
+    """Fold an exited worker's file into the archive (gunicorn child_exit, in the master)."""
+    directory = settings.METRICS_DIR
+    if not directory:
+        return
+    path = os.path.join(directory, f"worker-{pid}.json")
+    state = _read_json(path)
+    if state is None:
+        return
+    archive_path = os.path.join(directory, ARCHIVE_FILE)
+    archived = _read_json(archive_path) or {}
+    _write_json(archive_path, metrics.merge([archived, state]))
+    os.remove(path)
+
+
+def collect() -> tuple:
+    """(all processes' merged state, live processes' states) as of the last flushes."""
+    live = [metrics.state()]
+    archived = []
+    directory = settings.METRICS_DIR
+    if directory and os.path.isdir(directory):
+        for name in os.listdir(directory):
+            match = _WORKER_FILE.match(name)
+            if match and int(match.group(1)) == os.getpid():
+                continue
+            if match or name == ARCHIVE_FILE:
+                state = _read_json(os.path.join(directory, name))
+                if state is not None:
+                    (live if match else archived).append(state)
+    return metrics.merge(live + archived), live
+
+
+def object_counts() -> dict:
+    """Rows per model: one count() each, shared through the cache between scrapes."""
+    cache = caches[settings.API_CACHE_ALIAS]
+    counts = cache.get("metrics:object_counts")
+    if counts is None:
+        counts = {
+            "user": get_user_model().objects.count(),
+            "category": Category.objects.count(),
+            "note": Note.objects.count(),
+        }
+        cache.set("metrics:object_counts", counts, settings.METRICS_OBJECT_COUNTS_TTL)
+    return counts
+
+
+# -- Exposition -------------------------------------------------------------
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _sample(name: str, labels: dict, value) -> str:
+    if labels:
+        rendered = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+        name = f"{name}{{{rendered}}}"
+    return f"{name} {value if isinstance(value, int) else repr(float(value))}"
+
+
+def _match(rules, name: str):
+    for pattern, family, *rest in rules:
+        match = pattern.match(name)
+        if match:
+            return family, match.groupdict(), rest
+    return None
+
+
+def _fallback_name(name: str) -> str:
+    return "app_" + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+class _Families:
+    def __init__(self):
+        self.families = {}
+
+    def add(self, family: str, kind: str, help_text: str, line: str) -> None:
+        self.families.setdefault(family, (kind, help_text, []))[2].append(line)
+
+    def render(self) -> str:
+        out = []
+        for family, (kind, help_text, lines) in sorted(self.families.items()):
+            out.append(f"# HELP {family} {help_text}")
+            out.append(f"# TYPE {family} {kind}")
+            out.extend(sorted(lines))
+        return "\n".join(out) + "\n"
+
+
+def render() -> str:
+    """The text exposition format for a /metrics scrape."""
+    merged, live = collect()
+    out = _Families()
+
+    for name, value in merged["counters"].items():
+        found = _match(_COUNTERS, name)
+        family, labels, (help_text,) = found or (
+            _fallback_name(name) + "_total", {}, (f"core.metrics counter {name}.",)
+        )
+        out.add(family, "counter", help_text, _sample(family, labels, value))
+
+    observations = merged["observations"]
+    for name, (bounds, counts) in merged["histograms"].items():
+        found = _match(_HISTOGRAMS, name)
+        family, labels, (scale, help_text) = found or (
+            _fallback_name(name), {}, (1, f"core.metrics histogram {name}.")
+        )
+        cumulative = 0
+        for bound, count in zip([*bounds, "+Inf"], counts):
+            cumulative += count
+            le = bound if bound == "+Inf" else f"{bound * scale:g}"
+            out.add(family, "histogram", help_text,
+                    _sample(f"{family}_bucket", {**labels, "le": le}, cumulative))
+        total = observations.get(name, [0, 0.0, 0.0])[1]
+        out.add(family, "histogram", help_text, _sample(f"{family}_sum", labels, total * scale))
+        out.add(family, "histogram", help_text, _sample(f"{family}_count", labels, cumulative))
+
+    for name, (count, total, _peak) in observations.items():
+        if name in merged["histograms"]:
+            continue
+        found = _match(_SUMMARIES, name)
+        family, labels, (scale, help_text) = found or (
+            _fallback_name(name), {}, (1, f"core.metrics observation {name}.")
+        )
+        out.add(family, "summary", help_text, _sample(f"{family}_sum", labels, total * scale))
+        out.add(family, "summary", help_text, _sample(f"{family}_count", labels, count))
+
+    _add_gauges(out, merged, live)
+    return out.render()
+
+
+def _add_gauges(out: _Families, merged: dict, live: list) -> None:
+    out.add("metrics_processes", "gauge", "Worker processes whose metrics are included.",
+            _sample("metrics_processes", {}, len(live)))
+
+    open_connections = {}
+    for state in live:
+        for name, value in state.get("counters", {}).items():
+            match = _CONNECTIONS.match(name)
+            if match:
+                sign = 1 if match["event"] == "opened" else -1
+                open_connections[match["alias"]] = open_connections.get(match["alias"], 0) + sign * value
+    for alias, value in open_connections.items():
+        out.add("db_connections_open", "gauge", "Database connections held by live workers.",
+                _sample("db_connections_open", {"alias": alias}, value))
+
+    counters = merged["counters"]
+    for family, prefix, help_text in (
+        ("api_cache_hit_ratio", "api_cache.", "Share of API response cache lookups that hit."),
+        ("auth_user_cache_hit_ratio", "auth_user_cache.",
+         "Share of authenticated-user lookups served from the cache."),
+    ):
+        lookups = {name: value for name, value in counters.items() if name.startswith(prefix)}
+        hits = sum(value for name, value in lookups.items() if name.endswith("hit"))
+        total = hits + lookups.get(prefix + "miss", 0)
+        if total:
+            out.add(family, "gauge", help_text, _sample(family, {}, hits / total))
+
+    for model, count in object_counts().items():
+        out.add("app_objects", "gauge", "Rows per model (cached between scrapes).",
+                _sample("app_objects", {"model": model}, count))
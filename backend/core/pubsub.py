@@ -0,0 +1,142 @@
+"""Fan-out of messages to async subscribers, per channel.
+
+Publishers are ordinary sync code (signal handlers, after commit);
+subscribers are coroutines on an event loop, such as server-sent event
+streams, each holding a bounded queue rather than a thread.
+
+``LocalBroker`` only reaches subscribers in the same process, which is
+enough for a single worker. ``RedisBroker`` publishes through Redis and runs
+one pattern subscription per process that feeds its local subscribers, so
+a message reaches every worker no matter which one served the write.
+settings.PUBSUB_BACKEND picks the class.
+"""
+
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One subscriber's queue; must be created and read on its event loop."""
+
+    def __init__(self, broker, channel: str, maxsize: int):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        # Set when messages were dropped because the subscriber fell behind.
+        self.overflowed = False
+
+    def deliver(self, message) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout: float):
+        """Next message; raises TimeoutError after timeout seconds without one."""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """In-process fan-out."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, channel: str, maxsize: int = 100) -> Subscription:
+        subscription = Subscription(self, channel, maxsize)
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.channel]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def publish(self, channel: str, message) -> None:
+        self.dispatch(channel, message)
+
+    def dispatch(self, channel: str, message) -> None:
+        """Hand message to this process's subscribers of channel, from any thread."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+            except RuntimeError:
+                # The subscriber's loop has closed; it is going away anyway.
+                pass
+
+
+class RedisBroker(LocalBroker):
+    """Fan-out across processes through Redis pub/sub (settings.PUBSUB_REDIS_URL)."""
+
+    prefix = "pubsub:"
+
+    def __init__(self, url=None):
+        super().__init__()
+        self.url = url or settings.PUBSUB_REDIS_URL
+        self._client = None
+        self._listener = None
+
+    def publish(self, channel: str, message: str) -> None:
+        if self._client is None:
+            import redis
+
+            self._client = redis.Redis.from_url(self.url)
+        self._client.publish(self.prefix + channel, message)
+
+    def subscribe(self, channel: str, maxsize: int = 100) -> Subscription:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        return super().subscribe(channel, maxsize)
+
+    async def _listen(self) -> None:
+        import redis.asyncio
+
+        while True:
+            try:
+                client = redis.asyncio.Redis.from_url(self.url)
+                async with client.pubsub() as pubsub:
+                    await pubsub.psubscribe(self.prefix + "*")
+                    async for item in pubsub.listen():
+                        if item["type"] == "pmessage":
+                            channel = item["channel"].decode()[len(self.prefix):]
+                            self.dispatch(channel, item["data"].decode())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Redis pub/sub listener failed; reconnecting")
+                await asyncio.sleep(1)
+
+
+_broker = None
+_broker_path = None
+
+
+def get_broker() -> LocalBroker:
+    """The process-wide broker of class settings.PUBSUB_BACKEND."""
+    global _broker, _broker_path
+    if _broker is None or _broker_path != settings.PUBSUB_BACKEND:
+        _broker_path = settings.PUBSUB_BACKEND
+        _broker = import_string(_broker_path)()
+    return _broker
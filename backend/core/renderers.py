@@ -0,0 +1,47 @@
+"""JSON rendering with orjson when it is installed.
+
+FastJSONRenderer produces the same bytes as DRF's JSONRenderer with the
+default settings (compact, UTF-8, U+2028/U+2029 escaped). orjson encodes
+strings, ints and containers natively. Everything else goes through DRF's
+encoder (datetimes, decimals, UUIDs, lazy strings), so it is formatted as
+before. The one difference is that floats which Python would write in
+exponent form come out as orjson writes them (``1e16``, not ``1e+16``).
+The API's payloads do not contain such floats. Whatever orjson cannot
+encode (huge ints, lone surrogates), indented output, and installs without
+orjson use the stdlib path.
+"""
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+_default = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or not self.compact
+            or self.ensure_ascii
+            or self.encoder_class is not JSONEncoder
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=_default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # JSONRenderer escapes these for JavaScript (they end a line in JS string literals).
+        if b"\xe2\x80" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
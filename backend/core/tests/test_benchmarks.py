@@ -0,0 +1,82 @@
+"""Tests for the seed and benchmark management commands."""
+
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from categories.models import Category
+from core.benchmarks import all_url_names, compare, covered_url_names, default_scenarios, percentile
+from notes.models import Note
+
+
+def _result(p95, queries):
+    return {"latency_ms": {"p95": p95}, "queries": {"mean": queries}}
+
+
+class TestSeedNotes:
+    def test_seeds_users_categories_and_notes_with_counts(self, db):
+        call_command(
+            "seed_notes", "--users", "2", "--categories", "2", "--notes", "5",
+            "--batch-size", "3", stdout=StringIO(),
+        )
+        assert Note.objects.filter(user__email__startswith="bench").count() == 10
+        categories = Category.objects.filter(user__email="bench0@example.com")
+        assert sum(c.notes_count for c in categories) == 5
+
+    def test_refuses_to_reuse_existing_prefix(self, db):
+        call_command("seed_notes", "--users", "1", "--notes", "1", stdout=StringIO())
+        with pytest.raises(CommandError):
+            call_command("seed_notes", "--users", "1", "--notes", "1", stdout=StringIO())
+
+
+class TestBenchmarkApi:
+    def test_every_api_route_has_a_scenario(self):
+        assert all_url_names() <= covered_url_names(default_scenarios())
+
+    def test_runs_scenarios_and_reports_json(self, db, tmp_path):
+        call_command("seed_notes", "--users", "1", "--notes", "60", stdout=StringIO())
+        output = tmp_path / "results.json"
+        call_command(
+            "benchmark_api", "--iterations", "2", "--warmup", "0", "--hash-iterations", "1",
+            "--output", str(output), stderr=StringIO(),
+        )
+        data = json.loads(output.read_text())
+        assert data["meta"]["uncovered_url_names"] == []
+        for name, result in data["results"].items():
+            assert all(code < 400 for code in result["statuses"]), name
+        assert data["results"]["notes.list"]["queries"]["max"] <= 3
+        assert data["results"]["notes.list"]["compression"]["gzip"]["saved_bytes"] > 0
+        # Writes made by the run are rolled back unless --commit is passed.
+        assert Note.objects.count() == 60
+
+    def test_compare_fails_on_regression(self, db, tmp_path):
+        call_command("seed_notes", "--users", "1", "--notes", "3", stdout=StringIO())
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text(json.dumps({"results": {"categories.list": _result(0.000001, 0)}}))
+        with pytest.raises(CommandError, match="categories.list"):
+            call_command(
+                "benchmark_api", "--only", "categories", "--iterations", "2",
+                "--compare", str(baseline), stdout=StringIO(), stderr=StringIO(),
+            )
+
+    def test_requires_a_user(self, db):
+        with pytest.raises(CommandError):
+            call_command("benchmark_api", "--email", "nobody@example.com", stdout=StringIO())
+
+
+class TestHelpers:
+    def test_percentile_is_nearest_rank(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile([7], 99) == 7
+
+    def test_compare_reports_latency_and_query_regressions(self):
+        baseline = {"results": {"a": _result(10, 2), "b": _result(10, 2)}}
+        current = {"results": {"a": _result(11, 2), "b": _result(20, 3), "c": _result(1, 1)}}
+        regressions = compare(baseline, current, threshold=0.2)
+        assert len(regressions) == 2
+        assert all(r.startswith("b:") for r in regressions)
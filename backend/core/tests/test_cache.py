@@ -0,0 +1,124 @@
+"""Tests for the per-user response cache."""
+
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+
+from conftest import create_category, create_note
+from core import metrics
+from core.cache import aget_or_build, bump_generation, get_generation, get_or_build, response_key
+
+
+class TestGenerations:
+    def test_bump_changes_generation_and_keys(self):
+        before = get_generation(42)
+        key = response_key("notes", 42, "/api/notes/")
+        bump_generation(42)
+        assert get_generation(42) == before + 1
+        assert response_key("notes", 42, "/api/notes/") != key
+
+    def test_bump_without_existing_generation_seeds_one(self):
+        cache.delete("api:gen:7")
+        bump_generation(7)
+        assert get_generation(7) is not None
+
+
+class TestGetOrBuild:
+    def test_second_call_is_a_hit(self):
+        calls = []
+
+        def build():
+            calls.append(1)
+            return {"value": 1}
+
+        assert get_or_build("k", build) == {"value": 1}
+        assert get_or_build("k", build) == {"value": 1}
+        assert len(calls) == 1
+        assert metrics.snapshot("api_cache.") == {"api_cache.miss": 1, "api_cache.hit": 1}
+
+    def test_waiter_uses_value_built_by_lock_holder(self):
+        cache.add("cold:lock", 1)
+        timer = threading.Timer(0.05, lambda: cache.set("cold", {"built": "elsewhere"}))
+        timer.start()
+        try:
+            value = get_or_build("cold", lambda: pytest.fail("should not rebuild"))
+        finally:
+            timer.cancel()
+        assert value == {"built": "elsewhere"}
+        assert metrics.snapshot("api_cache.stampede_wait") == {"api_cache.stampede_wait": 1}
+
+    def test_waiter_builds_itself_after_lock_wait_expires(self, settings):
+        settings.API_CACHE_LOCK_WAIT = 0.05
+        cache.add("stuck:lock", 1)
+        assert get_or_build("stuck", lambda: {"v": 2}) == {"v": 2}
+        assert metrics.snapshot("api_cache.stampede_timeout") == {"api_cache.stampede_timeout": 1}
+        # The lock belongs to the other builder and must survive.
+        assert cache.get("stuck:lock") == 1
+
+    def test_disabled_cache_always_builds(self, settings):
+        settings.API_CACHE_ENABLED = False
+        calls = []
+        get_or_build("k", lambda: calls.append(1) or {"v": 1})
+        get_or_build("k", lambda: calls.append(1) or {"v": 1})
+        assert len(calls) == 2
+
+
+class TestAsyncGetOrBuild:
+    def test_builds_once_then_hits(self):
+        calls = []
+
+        async def build():
+            calls.append(1)
+            return {"value": 1}
+
+        assert async_to_sync(aget_or_build)("k", build) == {"value": 1}
+        assert async_to_sync(aget_or_build)("k", build) == {"value": 1}
+        assert len(calls) == 1
+        assert metrics.snapshot("api_cache.") == {"api_cache.miss": 1, "api_cache.hit": 1}
+
+    def test_waiter_builds_itself_after_lock_wait_expires(self, settings):
+        settings.API_CACHE_LOCK_WAIT = 0.05
+        cache.add("stuck:lock", 1)
+
+        async def build():
+            return {"v": 2}
+
+        assert async_to_sync(aget_or_build)("stuck", build) == {"v": 2}
+        assert metrics.snapshot("api_cache.stampede") == {
+            "api_cache.stampede_wait": 1,
+            "api_cache.stampede_timeout": 1,
+        }
+        assert cache.get("stuck:lock") == 1
+
+
+@pytest.mark.django_db
+class TestCachedListViews:
+    def test_notes_list_is_served_from_cache_until_a_write(self, auth_client, user1):
+        cat = create_category(user1, "C", "#F00")
+        create_note(user1, cat, "First", "")
+
+        auth_client.get("/api/notes/")
+        auth_client.get("/api/notes/")
+        assert metrics.snapshot("api_cache.hit") == {"api_cache.hit": 1}
+
+        create_note(user1, cat, "Second", "")
+        response = auth_client.get("/api/notes/")
+        assert {n["title"] for n in response.data["results"]} == {"First", "Second"}
+
+    def test_cache_key_includes_query_string(self, auth_client, user1):
+        cat1 = create_category(user1, "C1", "#F00")
+        cat2 = create_category(user1, "C2", "#0F0")
+        create_note(user1, cat1, "One", "")
+        create_note(user1, cat2, "Two", "")
+
+        auth_client.get(f"/api/notes/?category={cat1.id}")
+        response = auth_client.get(f"/api/notes/?category={cat2.id}")
+        assert [n["title"] for n in response.data["results"]] == ["Two"]
+
+    def test_bulk_write_invalidates_category_counts(self, auth_client, user1):
+        cat = create_category(user1, "C", "#F00")
+        assert auth_client.get("/api/categories/").data[0]["notes_count"] == 0
+        auth_client.post("/api/notes/bulk/", {"create": [{"title": "x"}]}, format="json")
+        assert auth_client.get("/api/categories/").data[0]["notes_count"] == 1
@@ -0,0 +1,152 @@
+"""Tests for response compression (core.compression)."""
+
+import gzip
+import zlib
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+from conftest import create_category, create_note
+from core import compression, metrics
+from core.compression import accepted_encodings, choose_encoding, compress_response
+
+
+@pytest.fixture
+def many_notes(user1):
+    category = create_category(user1, "Work", "#F00")
+    for i in range(30):
+        create_note(user1, category, f"Note {i}", "Some repetitive content. " * 20)
+
+
+def _request(accept_encoding=None):
+    headers = {"HTTP_ACCEPT_ENCODING": accept_encoding} if accept_encoding else {}
+    return RequestFactory().get("/", **headers)
+
+
+class TestNegotiation:
+    def test_accepted_encodings_honours_q_values_and_wildcards(self):
+        assert accepted_encodings("gzip, deflate, br") == {"gzip", "deflate", "br"}
+        assert accepted_encodings("gzip;q=0, br;q=0.5") == {"br"}
+        assert "gzip" in accepted_encodings("*")
+        assert "gzip" not in accepted_encodings("*, gzip;q=0")
+
+    def test_server_preference_order_wins(self, settings, monkeypatch):
+        monkeypatch.setitem(compression.ENCODERS, "br", (lambda body: b"br", None))
+        settings.RESPONSE_COMPRESSION_ENCODINGS = ["br", "gzip"]
+        assert choose_encoding(_request("gzip, br")) == "br"
+        assert choose_encoding(_request("gzip")) == "gzip"
+        settings.RESPONSE_COMPRESSION_ENCODINGS = ["gzip"]
+        assert choose_encoding(_request("br")) is None
+        assert choose_encoding(_request()) is None
+
+    def test_unavailable_encodings_are_skipped(self, settings, monkeypatch):
+        monkeypatch.delitem(compression.ENCODERS, "br", raising=False)
+        settings.RESPONSE_COMPRESSION_ENCODINGS = ["br", "gzip"]
+        assert choose_encoding(_request("br, gzip")) == "gzip"
+
+
+class TestCompressResponse:
+    def test_skips_small_encoded_and_binary_responses(self, settings):
+        settings.RESPONSE_COMPRESSION_MIN_BYTES = 100
+        request = _request("gzip")
+        small = compress_response(request, HttpResponse(b"x" * 99, content_type="application/json"))
+        assert not small.has_header("Content-Encoding")
+        binary = compress_response(request, HttpResponse(b"x" * 500, content_type="image/png"))
+        assert not binary.has_header("Content-Encoding")
+        encoded = HttpResponse(b"x" * 500, content_type="text/plain")
+        encoded["Content-Encoding"] = "identity"
+        assert compress_response(request, encoded)["Content-Encoding"] == "identity"
+
+    def test_compresses_and_weakens_etag(self, settings):
+        body = b'{"a": "' + b"x" * 2000 + b'"}'
+        response = HttpResponse(body, content_type="application/json")
+        response["ETag"] = '"abc"'
+        compress_response(_request("gzip"), response)
+        assert response["Content-Encoding"] == "gzip"
+        assert gzip.decompress(response.content) == body
+        assert response["Content-Length"] == str(len(response.content))
+        assert response["ETag"] == 'W/"abc"'
+        assert "Accept-Encoding" in response["Vary"]
+        assert metrics.snapshot("compression.")["compression.gzip.responses"] == 1
+
+    def test_streaming_only_when_enabled_and_never_event_streams(self, settings):
+        chunks = [b"line %d\n" % i * 50 for i in range(20)]
+        response = StreamingHttpResponse(iter(chunks), content_type="application/x-ndjson")
+        assert not compress_response(_request("gzip"), response).has_header("Content-Encoding")
+
+        settings.RESPONSE_COMPRESSION_STREAMING = True
+        response = StreamingHttpResponse(iter(chunks), content_type="text/plain")
+        compress_response(_request("gzip"), response)
+        assert response["Content-Encoding"] == "gzip"
+        assert zlib.decompress(b"".join(response.streaming_content), 31) == b"".join(chunks)
+
+        events = StreamingHttpResponse(iter(chunks), content_type="text/event-stream")
+        assert not compress_response(_request("gzip"), events).has_header("Content-Encoding")
+
+    def test_async_streaming(self, settings):
+        settings.RESPONSE_COMPRESSION_STREAMING = True
+        chunks = [b"chunk %d " % i * 40 for i in range(10)]
+
+        async def produce():
+            for chunk in chunks:
+                yield chunk
+
+        async def run():
+            response = StreamingHttpResponse(produce(), content_type="text/plain")
+            compress_response(_request("gzip"), response)
+            return response["Content-Encoding"], b"".join([c async for c in response.streaming_content])
+
+        encoding, body = async_to_sync(run)()
+        assert encoding == "gzip"
+        assert zlib.decompress(body, 31) == b"".join(chunks)
+
+
+@pytest.mark.django_db
+class TestCompressedEndpoints:
+    def test_list_is_compressed_and_cached_compressed(self, auth_client, many_notes):
+        plain = auth_client.get("/api/notes/")
+        assert not plain.has_header("Content-Encoding")
+        first = auth_client.get("/api/notes/", HTTP_ACCEPT_ENCODING="gzip")
+        second = auth_client.get("/api/notes/", HTTP_ACCEPT_ENCODING="gzip")
+        assert first["Content-Encoding"] == "gzip"
+        assert gzip.decompress(first.content) == plain.content
+        assert second.content == first.content
+        counters = metrics.snapshot("compression.")
+        assert counters["compression.cache.miss"] == 1
+        assert counters["compression.cache.hit"] == 1
+
+    def test_compressed_cache_follows_the_response_cache(self, auth_client, user1, many_notes):
+        auth_client.get("/api/notes/", HTTP_ACCEPT_ENCODING="gzip")
+        create_note(user1, user1.categories.first(), "New", "")
+        response = auth_client.get("/api/notes/", HTTP_ACCEPT_ENCODING="gzip")
+        assert b"New" in gzip.decompress(response.content)
+        assert metrics.snapshot("compression.")["compression.cache.miss"] == 2
+
+    def test_weak_etag_from_compressed_get_is_accepted_by_if_match(self, auth_client, user1):
+        note = create_note(user1, create_category(user1, "C", "#000"), "T", "body " * 500)
+        response = auth_client.get(f"/api/notes/{note.pk}/", HTTP_ACCEPT_ENCODING="gzip")
+        assert response["ETag"].startswith("W/")
+        updated = auth_client.patch(
+            f"/api/notes/{note.pk}/", {"title": "T2"}, format="json", HTTP_IF_MATCH=response["ETag"]
+        )
+        assert updated.status_code == 200
+
+    def test_export_is_not_encoded_twice(self, auth_client, many_notes):
+        export = auth_client.get("/api/notes/export", HTTP_ACCEPT_ENCODING="gzip")
+        # The export compresses itself; the middleware must not encode it twice.
+        assert export["Content-Encoding"] == "gzip"
+        gzip.decompress(b"".join(export.streaming_content))
+
+    def test_disabled(self, settings, auth_client, many_notes):
+        settings.RESPONSE_COMPRESSION_ENABLED = False
+        response = auth_client.get("/api/notes/", HTTP_ACCEPT_ENCODING="gzip")
+        assert not response.has_header("Content-Encoding")
+
+    @pytest.mark.usefixtures("async_views")
+    def test_async_views(self, auth_client, many_notes):
+        plain = auth_client.get("/api/notes/")
+        response = auth_client.get("/api/notes/", HTTP_ACCEPT_ENCODING="gzip")
+        assert response["Content-Encoding"] == "gzip"
+        assert gzip.decompress(response.content) == plain.content
@@ -0,0 +1,57 @@
+"""Tests for database connection metrics and the ops endpoint."""
+
+import pytest
+from django.db import connections
+
+from conftest import create_user, login
+from core import metrics
+from core.db import connection_stats
+
+
+class TestConnectionMetrics:
+    def test_opening_and_closing_is_counted_and_timed(self, db):
+        # The test connection to in-memory SQLite is never really closed; use a fresh wrapper.
+        wrapper = connections.create_connection("default")
+        wrapper.ensure_connection()
+        wrapper._close()
+        stats = connection_stats()["default"]
+        assert stats["connections"]["closed"] >= 1
+        assert stats["connections"]["opened"] >= 1
+        counts = stats["connections"]
+        assert counts["open"] == counts["opened"] - counts["closed"]
+        assert stats["acquire_ms"]["count"] == stats["connections"]["opened"]
+        assert stats["acquire_ms"]["max"] >= stats["acquire_ms"]["mean"] >= 0
+        assert stats["pool"] is None
+        assert "conn_max_age" in stats and "conn_health_checks" in stats
+
+    def test_observe_summarizes_values(self):
+        metrics.observe("t.x", 2.0)
+        metrics.observe("t.x", 4.0)
+        assert metrics.summaries("t.") == {
+            "t.x": {"count": 2, "total": 6.0, "mean": 3.0, "max": 4.0}
+        }
+
+
+class TestDatabaseStatsView:
+    def test_requires_staff(self, api_client, user1, user_password):
+        login(api_client, user1.email, user_password)
+        assert api_client.get("/api/ops/db/").status_code == 403
+
+    def test_staff_sees_connection_stats(self, db, api_client, user_password):
+        admin = create_user("ops@example.com", user_password)
+        admin.is_staff = True
+        admin.save()
+        login(api_client, admin.email, user_password)
+        response = api_client.get("/api/ops/db/")
+        assert response.status_code == 200
+        assert response.json()["default"]["vendor"] == "sqlite"
+
+
+@pytest.mark.parametrize("engine", ["core.backends.postgresql", "core.backends.sqlite3"])
+def test_backends_wrap_django_engines(engine):
+    from importlib import import_module
+
+    from core.db import InstrumentedConnectionMixin
+
+    wrapper = import_module(f"{engine}.base").DatabaseWrapper
+    assert issubclass(wrapper, InstrumentedConnectionMixin)
@@ -0,0 +1,100 @@
+"""Tests for per-request instrumentation and its ops endpoint."""
+
+import json
+import logging
+
+import pytest
+
+from conftest import create_user, login
+from core import metrics
+from core.db import record_queries
+from core.middleware import request_stats
+from notes.models import Note
+
+
+@pytest.fixture
+def staff_client(api_client, db, user_password):
+    admin = create_user("ops@example.com", user_password)
+    admin.is_staff = True
+    admin.save()
+    login(api_client, admin.email, user_password)
+    return api_client
+
+
+class TestRecordQueries:
+    def test_counts_queries_and_duplicates(self, db):
+        with record_queries() as log:
+            list(Note.objects.filter(pk=1))
+            list(Note.objects.filter(pk=2))
+            Note.objects.count()
+        assert log.count == 3
+        assert log.duplicates == 1
+        assert log.duration > 0
+
+    def test_queries_outside_a_block_are_not_recorded(self, db):
+        with record_queries() as log:
+            pass
+        Note.objects.count()
+        assert log.count == 0
+
+
+def test_histogram_buckets_values():
+    metrics.histogram("t.h", 3, buckets=(5, 10))
+    metrics.histogram("t.h", 10, buckets=(5, 10))
+    metrics.histogram("t.h", 11, buckets=(5, 10))
+    assert metrics.histograms("t.") == {"t.h": {"5": 1, "10": 1, "+Inf": 1}}
+
+
+@pytest.mark.django_db
+class TestRequestMetricsMiddleware:
+    def test_records_per_view_aggregates_and_server_timing(self, auth_client):
+        response = auth_client.get("/api/notes/")
+        assert response.status_code == 200
+        assert response["Server-Timing"].startswith("app;dur=")
+        assert "db;dur=" in response["Server-Timing"]
+
+        stats = request_stats()["notes:list-create"]
+        assert stats["queries"]["count"] == 1
+        assert stats["queries"]["total"] >= 1
+        assert stats["response_bytes"]["total"] == len(response.content)
+        assert stats["status"] == {"2xx": 1}
+        assert sum(stats["wall_ms_histogram"].values()) == 1
+
+    def test_async_views_record_queries(self, auth_client, async_views):
+        auth_client.get("/api/notes/")
+        assert request_stats()["notes:list-create"]["queries"]["total"] >= 1
+
+    def test_unresolved_paths_are_grouped(self, api_client):
+        api_client.get("/does-not-exist/")
+        assert request_stats()["unresolved"]["status"] == {"4xx": 1}
+
+    def test_slow_requests_are_logged_as_json(self, auth_client, settings, caplog):
+        settings.REQUEST_SLOW_MS = 0
+        logger = logging.getLogger("core.requests")
+        logger.addHandler(caplog.handler)
+        try:
+            auth_client.get("/api/categories/")
+        finally:
+            logger.removeHandler(caplog.handler)
+        record = json.loads(caplog.records[-1].getMessage())
+        assert caplog.records[-1].levelno == logging.WARNING
+        assert record["view"] == "categories:list"
+        assert record["status"] == 200
+        assert {"wall_ms", "db_ms", "queries", "duplicate_queries", "response_bytes"} <= set(record)
+
+    def test_can_be_disabled(self, auth_client, settings):
+        settings.REQUEST_METRICS_ENABLED = False
+        response = auth_client.get("/api/notes/")
+        assert "Server-Timing" not in response
+        assert "notes:list-create" not in request_stats()
+
+
+class TestRequestStatsView:
+    def test_requires_staff(self, auth_client):
+        assert auth_client.get("/api/ops/requests/").status_code == 403
+
+    def test_staff_reads_aggregates(self, staff_client):
+        staff_client.get("/api/notes/")
+        response = staff_client.get("/api/ops/requests/")
+        assert response.status_code == 200
+        assert "notes:list-create" in response.json()
@@ -0,0 +1,130 @@
+"""Tests for the /metrics exposition and its multi-process merging."""
+
+import json
+import os
+
+import pytest
+
+from conftest import login
+from core import metrics, prometheus
+
+
+def _worker_state(**counters):
+    return {
+        "counters": counters,
+        "observations": {"request.notes:list-create.wall_ms": [2, 30.0, 20.0]},
+        "histograms": {"request.notes:list-create.wall_ms": [[10, 50], [1, 1, 0]]},
+    }
+
+
+def test_merge_adds_counts_and_keeps_maxima():
+    merged = metrics.merge(
+        [
+            {"counters": {"a": 1}, "observations": {"o": [1, 2.0, 2.0]}, "histograms": {"h": [[5], [1, 0]]}},
+            {"counters": {"a": 2, "b": 1}, "observations": {"o": [2, 3.0, 1.5]}, "histograms": {"h": [[5], [0, 3]]}},
+        ]
+    )
+    assert merged == {
+        "counters": {"a": 3, "b": 1},
+        "observations": {"o": [3, 5.0, 2.0]},
+        "histograms": {"h": [[5], [1, 3]]},
+    }
+
+
+@pytest.mark.django_db
+class TestRender:
+    def test_exposes_requests_auth_and_object_counts(self, auth_client, user_password):
+        auth_client.get("/api/notes/")
+        auth_client.post(
+            "/api/auth/login/", {"email": "user1@example.com", "password": "nope"}, format="json"
+        )
+
+        text = prometheus.render()
+
+        assert "# TYPE http_requests_total counter" in text
+        assert 'http_requests_total{view="notes:list-create",status="2xx"} 1' in text
+        assert 'http_request_duration_seconds_bucket{view="notes:list-create",le="+Inf"} 1' in text
+        assert 'http_request_queries_count{view="notes:list-create"} 1' in text
+        assert 'auth_events_total{event="login",outcome="success"} 1' in text
+        assert 'auth_events_total{event="login",outcome="failure"} 1' in text
+        assert 'app_objects{model="user"} 1' in text
+        assert "metrics_processes 1" in text
+
+    def test_invalid_access_tokens_are_counted(self, api_client):
+        api_client.cookies["access_token"] = "not-a-token"
+        api_client.get("/api/notes/")
+        assert 'auth_events_total{event="token",outcome="invalid"} 1' in prometheus.render()
+
+    def test_unknown_metrics_use_a_fallback_name(self, db):
+        metrics.increment("custom.thing-done")
+        assert "app_custom_thing_done_total 1" in prometheus.render()
+
+    def test_object_counts_are_cached_between_scrapes(self, db, django_assert_num_queries):
+        prometheus.render()
+        with django_assert_num_queries(0):
+            prometheus.render()
+
+
+@pytest.mark.django_db
+class TestMultiProcess:
+    @pytest.fixture(autouse=True)
+    def metrics_dir(self, settings, tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        return tmp_path
+
+    def test_scrape_merges_other_workers_files(self, metrics_dir):
+        other = _worker_state(**{"request.notes:list-create.status.2xx": 2, "db.default.connections_opened": 3})
+        (metrics_dir / "worker-999991.json").write_text(json.dumps(other))
+        metrics.increment("request.notes:list-create.status.2xx")
+
+        text = prometheus.render()
+
+        assert 'http_requests_total{view="notes:list-create",status="2xx"} 3' in text
+        assert 'db_connections_open{alias="default"} 3' in text
+        assert 'http_request_duration_seconds_bucket{view="notes:list-create",le="0.01"} 1' in text
+        assert 'http_request_duration_seconds_sum{view="notes:list-create"} 0.03' in text
+        assert "metrics_processes 2" in text
+
+    def test_exited_workers_are_archived_without_gauges(self, metrics_dir):
+        for pid in (999991, 999992):
+            state = _worker_state(**{"auth.login.success": 1, "db.default.connections_opened": 1})
+            (metrics_dir / f"worker-{pid}.json").write_text(json.dumps(state))
+            prometheus.archive_process(pid)
+
+        assert os.listdir(metrics_dir) == [prometheus.ARCHIVE_FILE]
+        text = prometheus.render()
+        assert 'auth_events_total{event="login",outcome="success"} 2' in text
+        assert 'db_connections_total{alias="default",event="opened"} 2' in text
+        assert "db_connections_open" not in text
+        assert "metrics_processes 1" in text
+
+    def test_own_file_is_replaced_by_live_state(self, metrics_dir):
+        metrics.increment("auth.login.success")
+        prometheus.write_process_state()
+        metrics.increment("auth.login.success")
+        assert 'auth_events_total{event="login",outcome="success"} 2' in prometheus.render()
+
+    def test_clear_directory_removes_previous_run(self, metrics_dir):
+        (metrics_dir / prometheus.ARCHIVE_FILE).write_text("{}")
+        prometheus.clear_directory()
+        assert os.listdir(metrics_dir) == []
+
+
+@pytest.mark.django_db
+class TestMetricsView:
+    def test_disabled_without_a_token(self, api_client):
+        assert api_client.get("/metrics").status_code == 404
+
+    def test_requires_the_bearer_token(self, api_client, settings, user1, user_password):
+        settings.METRICS_TOKEN = "scrape-secret"
+        login(api_client, user1.email, user_password)
+        response = api_client.get("/metrics")
+        assert response.status_code == 401
+        assert response["WWW-Authenticate"].startswith("Bearer")
+
+    def test_serves_text_format(self, api_client, settings):
+        settings.METRICS_TOKEN = "scrape-secret"
+        response = api_client.get("/metrics", HTTP_AUTHORIZATION="Bearer scrape-secret")
+        assert response.status_code == 200
+        assert response["Content-Type"] == prometheus.CONTENT_TYPE
+        assert b"# TYPE app_objects gauge" in response.content
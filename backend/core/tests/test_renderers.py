@@ -0,0 +1,98 @@
+"""Tests for FastJSONRenderer and the core.rows mappers."""
+
+import datetime
+import decimal
+import json
+import uuid
+import zoneinfo
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from django.utils.functional import lazy
+from rest_framework.fields import DateTimeField
+from rest_framework.renderers import JSONRenderer
+
+from core import renderers
+from core.renderers import FastJSONRenderer
+from core.rows import DateTime, datetime_formatter, row_columns, rows_mapper
+
+PAYLOADS = [
+    {"text": 'a "quoted" \\ line\nbreak   é 日本 🎉 \x00\x1f', "n": None},
+    [1, -2, 3.5, 0.1, 123456.789, True, False, 2**63 - 1, {"nested": [[], {}]}],
+    {
+        "when": datetime.datetime(2024, 5, 1, 12, 30, 1, 123456, tzinfo=datetime.timezone.utc),
+        "day": datetime.date(2024, 5, 1),
+        "price": decimal.Decimal("12.50"),
+        "uuid": uuid.UUID(int=1),
+        "lazy": lazy(lambda: "translated", str)(),
+        1: "int key",
+    },
+]
+
+
+class TestFastJSONRenderer:
+    @pytest.mark.parametrize("data", PAYLOADS)
+    def test_matches_json_renderer(self, data):
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_falls_back_for_what_orjson_rejects(self):
+        assert FastJSONRenderer().render({"big": 2**70}) == JSONRenderer().render({"big": 2**70})
+        # Lone surrogates fail the same way as with JSONRenderer.
+        with pytest.raises(UnicodeEncodeError):
+            FastJSONRenderer().render({"surrogate": "\ud800"})
+
+    def test_exponent_floats_differ_only_in_notation(self):
+        data = [1e16, 1e-7]
+        assert FastJSONRenderer().render(data) == b"[1e16,1e-7]"
+        assert json.loads(FastJSONRenderer().render(data)) == json.loads(JSONRenderer().render(data))
+
+    def test_indent_and_none(self):
+        media_type = "application/json; indent=2"
+        data = PAYLOADS[0]
+        assert FastJSONRenderer().render(data, media_type) == JSONRenderer().render(data, media_type)
+        assert FastJSONRenderer().render(None) == b""
+
+    def test_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(renderers, "orjson", None)
+        assert FastJSONRenderer().render(PAYLOADS[0]) == JSONRenderer().render(PAYLOADS[0])
+
+
+class TestRowsMapper:
+    SPEC = {"id": "id", "when": DateTime("at"), "inner": {"x": "x_col"}}
+
+    def test_columns_and_output(self):
+        at = datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+        assert row_columns(self.SPEC) == ["id", "at", "x_col"]
+        rows = [{"id": 1, "at": at, "x_col": "v"}, {"id": 2, "at": None, "x_col": None}]
+        assert rows_mapper(self.SPEC)(rows) == [
+            {"id": 1, "when": "2024-01-02T03:04:05Z", "inner": {"x": "v"}},
+            {"id": 2, "when": None, "inner": {"x": None}},
+        ]
+
+    @pytest.mark.parametrize("tz", ["UTC", "America/Bogota", "Asia/Kolkata"])
+    def test_datetime_formatter_matches_drf(self, tz):
+        values = [
+            timezone.now(),
+            datetime.datetime(2024, 3, 10, 7, 30, tzinfo=datetime.timezone.utc),
+            datetime.datetime(2024, 3, 10, 7, 30),
+            "2024-03-10T07:30:00Z",
+            None,
+        ]
+        with timezone.override(zoneinfo.ZoneInfo(tz)):
+            expected = [DateTimeField().to_representation(value) for value in values]
+            assert [datetime_formatter()(value) for value in values] == expected
+
+    def test_datetime_formatter_honours_custom_format(self, settings):
+        settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, "DATETIME_FORMAT": "%Y/%m/%d"}
+        value = datetime.datetime(2024, 3, 10, tzinfo=datetime.timezone.utc)
+        assert datetime_formatter()(value) == "2024/03/10"
+
+
+@pytest.mark.django_db
+def test_benchmark_serialization_command():
+    call_command("seed_notes", "--users", "1", "--notes", "5", stdout=StringIO())
+    out = StringIO()
+    call_command("benchmark_serialization", "--iterations", "1", stdout=out)
+    assert '"fast_path_us_per_note"' in out.getvalue()
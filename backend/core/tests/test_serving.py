@@ -0,0 +1,109 @@
+"""Tests for the production serving profile, startup warm-up and load generator."""
+
+import importlib
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from django.core.management.base import CommandError
+
+from core.loadtest import run_load
+from core.management.commands.benchmark_serving import SERVER_ENV, server_command
+from core.warmup import warm_up
+
+
+def load_gunicorn_conf():
+    sys.modules.pop("config.gunicorn_conf", None)
+    return importlib.import_module("config.gunicorn_conf")
+
+
+class TestGunicornConf:
+    def test_defaults_to_threaded_wsgi(self, settings):
+        settings.SERVER_WORKER_CLASS = "gthread"
+        settings.SERVER_WORKERS = 3
+        settings.SERVER_KEEPALIVE = 7
+        conf = load_gunicorn_conf()
+        assert (conf.worker_class, conf.wsgi_app) == ("gthread", "config.wsgi:application")
+        assert conf.workers == 3
+        assert conf.keepalive == 7
+
+    def test_uvicorn_workers_serve_asgi_and_workers_default_from_cpus(self, settings):
+        settings.SERVER_WORKER_CLASS = "uvicorn"
+        settings.SERVER_WORKERS = 0
+        conf = load_gunicorn_conf()
+        assert conf.wsgi_app == "config.asgi:application"
+        assert conf.workers >= 3
+
+    def test_rejects_unknown_worker_class(self, settings):
+        settings.SERVER_WORKER_CLASS = "eventlet"
+        with pytest.raises(RuntimeError):
+            load_gunicorn_conf()
+
+
+class TestWarmUp:
+    def test_warms_resolvers_and_project_serializers(self):
+        counts = warm_up()
+        assert counts["url_patterns"] > 10
+        assert counts["serializers"] >= 8
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps({"cookie": self.headers.get("Cookie")}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestLoadTest:
+    def test_run_load_reports_throughput_and_latency(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_port}/api/notes/"
+            result = run_load(url, {"Cookie": "a=b"}, concurrency=2, duration=0.3)
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert result["requests"] > 0
+        assert result["errors"] == 0
+        assert result["statuses"] == {"200": result["requests"]}
+        assert result["latency_ms"]["p50"] > 0
+
+    def test_think_time_paces_each_client(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_port}/"
+            result = run_load(url, concurrency=2, duration=0.5, think_time=0.2)
+        finally:
+            server.shutdown()
+            server.server_close()
+        # Each client fits at most three requests into half a second.
+        assert 2 <= result["requests"] <= 6
+        assert result["think_time_s"] == 0.2
+
+    def test_unreachable_server_counts_errors(self):
+        result = run_load("http://127.0.0.1:9/", concurrency=1, duration=0.1)
+        assert result["requests"] == 0
+        assert result["errors"] > 0
+        assert result["latency_ms"] is None
+
+    def test_server_commands(self):
+        assert "runserver" in server_command("runserver", 8001)
+        assert "config/gunicorn_conf.py" in server_command("gunicorn", 8001)
+        assert server_command("gunicorn-async", 8001) == server_command("gunicorn", 8001)
+        assert SERVER_ENV["gunicorn-async"]["API_ASYNC_VIEWS"] == "true"
+        with pytest.raises(CommandError):
+            server_command("waitress", 8001)
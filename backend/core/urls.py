@@ -0,0 +1,11 @@
+from django.urls import path
+
+from core.views import AuthStatsView, DatabaseStatsView, RequestStatsView
+
+app_name = "ops"
+
+urlpatterns = [
+    path("db/", DatabaseStatsView.as_view(), name="db-stats"),
+    path("auth/", AuthStatsView.as_view(), name="auth-stats"),
+    path("requests/", RequestStatsView.as_view(), name="request-stats"),
+]
@@ -0,0 +1,54 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core import metrics, prometheus
+from core.db import connection_stats
+from core.middleware import request_stats
+
+
+class DatabaseStatsView(APIView):
+    """GET /api/ops/db/ - Connection and pool metrics for this worker process (staff only)."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(connection_stats())
+
+
+class AuthStatsView(APIView):
+    """GET /api/ops/auth/ - Password hashing and login/signup throttle counters for this worker process (staff only)."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(
+            {
+                "counters": metrics.snapshot("auth"),
+                "timings": metrics.summaries("auth"),
+            }
+        )
+
+
+class RequestStatsView(APIView):
+    """GET /api/ops/requests/ - Latency, query and response size aggregates per view for this worker process (staff only)."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(request_stats())
+
+
+def metrics_view(request):
+    """GET /metrics - Prometheus text format for all worker processes (bearer METRICS_TOKEN)."""
+    token = settings.METRICS_TOKEN
+    if not token:
+        raise Http404
+    header = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(header.encode(), f"Bearer {token}".encode()):
+        return HttpResponse(status=401, headers={"WWW-Authenticate": 'Bearer realm="metrics"'})
+    return HttpResponse(prometheus.render(), content_type=prometheus.CONTENT_TYPE)
@@ -0,0 +1,68 @@
+"""Startup warm-up: build lazily populated state before the first request.
+
+Django compiles URL patterns and DRF builds serializer fields on first use,
+which otherwise lands on whichever requests each new worker serves first.
+Nothing here touches the database, so it is safe to run before forking.
+"""
+
+import inspect
+from importlib import import_module
+
+from django.apps import apps
+from django.conf import settings
+from django.urls import get_resolver
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+
+def _walk_patterns(patterns):
+    for pattern in patterns:
+        if hasattr(pattern, "url_patterns"):
+            yield from _walk_patterns(pattern.url_patterns)
+        else:
+            yield pattern
+
+
+def warm_url_resolvers() -> int:
+    resolver = get_resolver()
+    # Accessing reverse_dict compiles and indexes every pattern.
+    resolver.reverse_dict
+    count = 0
+    for pattern in _walk_patterns(resolver.url_patterns):
+        pattern.pattern.regex
+        count += 1
+    return count
+
+
+def _project_serializers():
+    for app_config in apps.get_app_configs():
+        if not app_config.path.startswith(str(settings.BASE_DIR)):
+            continue
+        try:
+            module = import_module(f"{app_config.name}.serializers")
+        except ModuleNotFoundError:
+            continue
+        for _, obj in inspect.getmembers(module, inspect.isclass):
+            if issubclass(obj, serializers.Serializer) and obj.__module__ == module.__name__:
+                yield obj
+
+
+def warm_serializers() -> int:
+    count = 0
+    for serializer_class in _project_serializers():
+        # ModelSerializer introspects the model here; nested serializers recurse.
+        serializer_class().fields
+        count += 1
+    return count
+
+
+def warm_up() -> dict:
+    """Warm URL resolvers, DRF settings and project serializers; return counts."""
+    for name in (
+        "DEFAULT_RENDERER_CLASSES",
+        "DEFAULT_PARSER_CLASSES",
+        "DEFAULT_AUTHENTICATION_CLASSES",
+        "DEFAULT_PERMISSION_CLASSES",
+    ):
+        getattr(api_settings, name)
+    return {"url_patterns": warm_url_resolvers(), "serializers": warm_serializers()}
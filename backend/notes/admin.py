@@ -1,5 +1,18 @@
 from django.contrib import admin
 
-from .models import Note
+from .models import Note, NoteRevision, NoteTombstone
+from .storage import load_content
 
-admin.site.register(Note)
+
+@admin.register(Note)
+class NoteAdmin(admin.ModelAdmin):
+    def get_object(self, request, object_id, from_field=None):
+        note = super().get_object(request, object_id, from_field)
+        if note is not None:
+            # Edit the whole body, not the head kept in the notes table.
+            load_content(note)
+        return note
+
+
+admin.site.register(NoteTombstone)
+admin.site.register(NoteRevision)
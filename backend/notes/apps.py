@@ -5,3 +5,6 @@ class NotesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "notes"
     verbose_name = "Notes"
+
+    def ready(self):
+        from notes import signals  # noqa: F401
@@ -0,0 +1,261 @@
+"""Batched note operations: many creates, updates, moves and deletes in one transaction."""
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+
+from categories.models import Category
+from notes.models import Note
+from notes.serializers import (
+    BulkNoteCreateSerializer,
+    BulkNoteMoveSerializer,
+    BulkNoteUpdateSerializer,
+)
+from notes.signals import (
+    deferred_note_changes,
+    record_notes_count_deltas,
+    record_user_change,
+)
+from notes.storage import split_bodies, store_bodies
+from notes.sync import record_tombstones
+
+# Item field -> model field written for it by bulk_update.
+UPDATABLE_FIELDS = {"title": "title", "content": "content", "category_id": "category"}
+
+
+def _validate_items(serializer_class, items):
+    """Validate each item on its own; returns [(index, data or None, errors or None)]."""
+    results = []
+    for index, item in enumerate(items):
+        serializer = serializer_class(data=item)
+        if serializer.is_valid():
+            results.append((index, serializer.validated_data, None))
+        else:
+            results.append((index, None, serializer.errors))
+    return results
+
+
+class BulkNoteProcessor:
+    """Apply a validated bulk request for one user with a fixed number of queries.
+
+    Category ownership and note existence are each resolved with a single
+    query up front, which locks the notes; writes use bulk_create, one
+    bulk_update per set of changed fields and one queryset update or delete
+    per operation type.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    def run(self, operations):
+        creates = _validate_items(BulkNoteCreateSerializer, operations["create"])
+        updates = _validate_items(BulkNoteUpdateSerializer, operations["update"])
+        moves = _validate_items(BulkNoteMoveSerializer, operations["move"])
+        deletes = operations["delete"]
+
+        with transaction.atomic(), deferred_note_changes():
+            # bulk_create, bulk_update and queryset.update() send no signals.
+            record_user_change(self.user.pk)
+            self.owned_categories = self._owned_categories(creates, updates, moves)
+            self.owned_notes = self._owned_notes(updates, moves, deletes)
+            return {
+                "create": self._create(creates),
+                "update": self._update(updates),
+                "move": self._move(moves),
+                "delete": self._delete(deletes),
+            }
+
+    def _owned_categories(self, creates, updates, moves):
+        """Return the ids of the user's categories referenced by the request (one query)."""
+        self.default_category_id = None
+        wanted = {
+            data["category_id"]
+            for _, data, _ in creates + updates + moves
+            if data is not None and data.get("category_id") is not None
+        }
+        needs_default = any(
+            data is not None and data.get("category_id") is None for _, data, _ in creates
+        )
+        if not wanted and not needs_default:
+            return set()
+        rows = Category.objects.filter(user=self.user).order_by("created_at", "id")
+        if not needs_default:
+            rows = rows.filter(pk__in=wanted)
+        owned = list(rows.values_list("pk", flat=True))
+        if needs_default and owned:
+            self.default_category_id = owned[0]
+        return set(owned)
+
+    def _owned_notes(self, updates, moves, deletes):
+        """Load and lock the user's notes referenced by the request (one query).
+
+        Only the columns some update actually writes are loaded, so moves and
+        deletes never pull note bodies. The rows stay locked until the
+        transaction ends, so concurrent writes cannot slip in between.
+        """
+        wanted = set(deletes)
+        self.update_fields = set()
+        for _, data, _ in updates:
+            if data is not None:
+                wanted.add(data["id"])
+                self.update_fields.update(f for f in ("title", "content") if f in data)
+        for _, data, _ in moves:
+            if data is not None:
+                wanted.update(data["ids"])
+        if not wanted:
+            return {}
+        if "content" in self.update_fields:
+            self.update_fields.add("content_offloaded")
+        notes = (
+            Note.objects.filter(user=self.user, pk__in=wanted)
+            .select_for_update()
+            .only("id", "category", *self.update_fields)
+        )
+        return {note.pk: note for note in notes}
+
+    def _unknown_category(self, category_id):
+        return category_id is not None and category_id not in self.owned_categories
+
+    def _create(self, items):
+        results = [None] * len(items)
+        pending = []
+        for index, data, errors in items:
+            if errors is not None:
+                results[index] = {"status": status.HTTP_400_BAD_REQUEST, "errors": errors}
+                continue
+            category_id = data.get("category_id")
+            if self._unknown_category(category_id):
+                results[index] = {
+                    "status": status.HTTP_400_BAD_REQUEST,
+                    "errors": {"category_id": ["Invalid category."]},
+                }
+                continue
+            if category_id is None:
+                category_id = self.default_category_id
+            if category_id is None:
+                results[index] = {
+                    "status": status.HTTP_400_BAD_REQUEST,
+                    "errors": {"category_id": ["No category available."]},
+                }
+                continue
+            note = Note(
+                user=self.user,
+                category_id=category_id,
+                title=data["title"],
+                content=data["content"],
+            )
+            pending.append((index, note))
+
+        bodies = split_bodies(note for _, note in pending)
+        created = Note.objects.bulk_create([note for _, note in pending])
+        store_bodies(bodies)
+        deltas = {}
+        for (index, _), note in zip(pending, created):
+            deltas[note.category_id] = deltas.get(note.category_id, 0) + 1
+            results[index] = {"status": status.HTTP_201_CREATED, "id": note.pk}
+        record_notes_count_deltas(deltas)
+        return results
+
+    def _update(self, items):
+        results = [None] * len(items)
+        changed = {}
+        deltas = {}
+        now = timezone.now()
+        for index, data, errors in items:
+            if errors is not None:
+                results[index] = {"status": status.HTTP_400_BAD_REQUEST, "errors": errors}
+                continue
+            note = self.owned_notes.get(data["id"])
+            if note is None:
+                results[index] = {"id": data["id"], "status": status.HTTP_404_NOT_FOUND}
+                continue
+            if self._unknown_category(data.get("category_id")):
+                results[index] = {
+                    "id": note.pk,
+                    "status": status.HTTP_400_BAD_REQUEST,
+                    "errors": {"category_id": ["Invalid category."]},
+                }
+                continue
+            previous_category = note.category_id
+            fields = changed.get(note.pk, set())
+            for field, model_field in UPDATABLE_FIELDS.items():
+                # An offloaded note has only its head loaded; rewrite its body when given.
+                if field in data and (
+                    getattr(note, field) != data[field]
+                    or (field == "content" and note.content_offloaded)
+                ):
+                    setattr(note, field, data[field])
+                    fields.add(model_field)
+            if note.category_id != previous_category:
+                deltas[previous_category] = deltas.get(previous_category, 0) - 1
+                deltas[note.category_id] = deltas.get(note.category_id, 0) + 1
+            if fields:
+                note.updated_at = now
+                changed[note.pk] = fields
+            results[index] = {"id": note.pk, "status": status.HTTP_200_OK}
+
+        # Write each note's changed columns only, one bulk_update per set of them.
+        groups = {}
+        for pk, fields in changed.items():
+            groups.setdefault(frozenset(fields), []).append(self.owned_notes[pk])
+        for fields, notes in groups.items():
+            columns = sorted(fields)
+            bodies = []
+            if "content" in fields:
+                bodies = split_bodies(notes)
+                columns.append("content_offloaded")
+            Note.objects.bulk_update(notes, [*columns, "updated_at"])
+            store_bodies(bodies)
+        record_notes_count_deltas(deltas)
+        return results
+
+    def _move(self, items):
+        results = [None] * len(items)
+        now = timezone.now()
+        for index, data, errors in items:
+            if errors is not None:
+                results[index] = {"status": status.HTTP_400_BAD_REQUEST, "errors": errors}
+                continue
+            target = data["category_id"]
+            if self._unknown_category(target):
+                results[index] = {
+                    "status": status.HTTP_400_BAD_REQUEST,
+                    "errors": {"category_id": ["Invalid category."]},
+                }
+                continue
+            found = [pk for pk in dict.fromkeys(data["ids"]) if pk in self.owned_notes]
+            missing = [pk for pk in dict.fromkeys(data["ids"]) if pk not in self.owned_notes]
+            deltas = {}
+            for pk in found:
+                note = self.owned_notes[pk]
+                if note.category_id != target:
+                    deltas[note.category_id] = deltas.get(note.category_id, 0) - 1
+                    deltas[target] = deltas.get(target, 0) + 1
+                    note.category_id = target
+            if found:
+                Note.objects.filter(user=self.user, pk__in=found).update(
+                    category_id=target, updated_at=now
+                )
+            record_notes_count_deltas(deltas)
+            results[index] = {
+                "status": status.HTTP_200_OK,
+                "category_id": target,
+                "moved": found,
+                "not_found": missing,
+            }
+        return results
+
+    def _delete(self, ids):
+        ids = list(dict.fromkeys(ids))
+        found = [pk for pk in ids if pk in self.owned_notes]
+        if found:
+            Note.objects.filter(user=self.user, pk__in=found).delete()
+            record_tombstones(self.user.pk, found)
+        return [
+            {
+                "id": pk,
+                "status": status.HTTP_204_NO_CONTENT if pk in self.owned_notes
+                else status.HTTP_404_NOT_FOUND,
+            }
+            for pk in ids
+        ]
@@ -0,0 +1,173 @@
+"""Conditional request support (ETag / Last-Modified) for notes and categories.
+
+Versions are derived from one cheap indexed aggregate per user so a matching
+If-None-Match can be answered with 304 before any serialization happens.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from categories.models import Category
+from notes.models import Note
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "The resource has been modified since the supplied ETag."
+    default_code = "precondition_failed"
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha1(":".join(str(p) for p in parts).encode()).hexdigest()
+
+
+def user_notes_version(request):
+    """Return (latest updated_at, note count) for request.user, memoized per request."""
+    cached = getattr(request, "_notes_version", None)
+    if cached is None:
+        row = Note.objects.filter(user=request.user).aggregate(
+            latest=Max("updated_at"), total=Count("id")
+        )
+        cached = (row["latest"], row["total"])
+        request._notes_version = cached
+    return cached
+
+
+def user_categories_version(request):
+    """Return (latest created_at, category count) for request.user, memoized per request."""
+    cached = getattr(request, "_categories_version", None)
+    if cached is None:
+        row = Category.objects.filter(user=request.user).aggregate(
+            latest=Max("created_at"), total=Count("id")
+        )
+        cached = (row["latest"], row["total"])
+        request._categories_version = cached
+    return cached
+
+
+async def aload_versions(request, notes=True, categories=False):
+    """Memoize the version aggregates with the async ORM before the ETag functions run.
+
+    The ETag/Last-Modified functions stay synchronous (Django's ``condition``
+    decorator calls them that way); on async views they then only read the memo.
+    """
+    if notes and getattr(request, "_notes_version", None) is None:
+        row = await Note.objects.filter(user=request.user).aaggregate(
+            latest=Max("updated_at"), total=Count("id")
+        )
+        request._notes_version = (row["latest"], row["total"])
+    if categories and getattr(request, "_categories_version", None) is None:
+        row = await Category.objects.filter(user=request.user).aaggregate(
+            latest=Max("created_at"), total=Count("id")
+        )
+        request._categories_version = (row["latest"], row["total"])
+
+
+def _latest(*timestamps):
+    present = [ts for ts in timestamps if ts is not None]
+    return max(present) if present else None
+
+
+def note_list_etag(request, *args, **kwargs):
+    latest, total = user_notes_version(request)
+    # The query string selects the page, filter and fieldset, so it is part of the tag.
+    return _digest("notes", request.user.pk, total, latest, request.get_full_path())
+
+
+def note_list_last_modified(request, *args, **kwargs):
+    return user_notes_version(request)[0]
+
+
+def category_list_etag(request, *args, **kwargs):
+    notes_latest, notes_total = user_notes_version(request)
+    cats_latest, cats_total = user_categories_version(request)
+    return _digest(
+        "categories", request.user.pk, cats_total, cats_latest, notes_total, notes_latest,
+        request.get_full_path(),
+    )
+
+
+def category_list_last_modified(request, *args, **kwargs):
+    return _latest(user_notes_version(request)[0], user_categories_version(request)[0])
+
+
+def note_etag(note) -> str:
+    """Strong, quoted ETag for a single note."""
+    return quote_etag(_digest("note", note.pk, note.updated_at.isoformat()))
+
+
+def _note_updated_at(request, pk):
+    """Return the note's updated_at (None if missing or not owned), memoized per request."""
+    cached = getattr(request, "_note_updated_at", None)
+    if cached is None or cached[0] != pk:
+        updated_at = (
+            Note.objects.filter(pk=pk, user=request.user)
+            .values_list("updated_at", flat=True)
+            .first()
+        )
+        cached = (pk, updated_at)
+        request._note_updated_at = cached
+    return cached[1]
+
+
+async def aload_note_updated_at(request, pk):
+    """Async counterpart of _note_updated_at's query, filling the same per-request memo."""
+    updated_at = await (
+        Note.objects.filter(pk=pk, user=request.user)
+        .values_list("updated_at", flat=True)
+        .afirst()
+    )
+    request._note_updated_at = (pk, updated_at)
+
+
+def note_detail_etag(request, pk, *args, **kwargs):
+    updated_at = _note_updated_at(request, pk)
+    if updated_at is None:
+        return None
+    return _digest("note", pk, updated_at.isoformat())
+
+
+def note_detail_last_modified(request, pk, *args, **kwargs):
+    return _note_updated_at(request, pk)
+
+
+def check_if_match(request, note) -> None:
+    """Raise PreconditionFailed unless If-Match (when sent) matches the note's ETag."""
+    header = request.META.get("HTTP_IF_MATCH")
+    if not header:
+        return
+    etags = parse_etags(header)
+    if "*" in etags:
+        return
+    etag = note_etag(note)
+    # Compressed GET responses carry the weak form of the same tag (core.compression).
+    if etag not in etags and f"W/{etag}" not in etags:
+        raise PreconditionFailed()
+
+
+WRITE_SEQUENCE_HEADER = "X-Write-Sequence"
+_MAX_WRITE_SEQUENCE = 2**63 - 1
+
+
+def request_write_sequence(request):
+    """The X-Write-Sequence sent with a write, or None when absent or disabled."""
+    header = request.META.get("HTTP_X_WRITE_SEQUENCE")
+    if header is None or not settings.NOTES_WRITE_SEQUENCES_ENABLED:
+        return None
+    try:
+        sequence = int(header)
+    except ValueError:
+        sequence = -1
+    if not 0 <= sequence <= _MAX_WRITE_SEQUENCE:
+        raise ValidationError({WRITE_SEQUENCE_HEADER: ["Must be a non-negative integer."]})
+    return sequence
+
+
+def is_stale_write(note, sequence) -> bool:
+    """True when a write with sequence is not newer than the last one applied to note."""
+    return sequence is not None and note.write_sequence is not None and sequence <= note.write_sequence
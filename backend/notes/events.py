@@ -0,0 +1,100 @@
+"""Live note and category changes as server-sent events.
+
+Model signals publish one event per change to the owner's channel on the
+core.pubsub broker, after the transaction commits. Each event is encoded once
+as a complete SSE frame whose ``id`` is a sync cursor (see notes.sync).
+Writes made inside deferred_note_changes() (bulk updates, imports) publish a
+single ``notes.changed`` event instead of one per note.
+
+``event_stream`` serves one client: events as they are published, a
+keep-alive comment every NOTES_EVENTS_HEARTBEAT seconds, and an end after
+NOTES_EVENTS_MAX_AGE seconds, when EventSource reconnects by itself with
+Last-Event-ID. On reconnect, the notes changed and deleted since that cursor
+are replayed first, so nothing published in between is lost. A ``resync``
+event tells the client to fall back to /api/notes/changes: its cursor
+expired, more than NOTES_CHANGES_MAX notes changed since it, or it read
+too slowly and events were dropped.
+"""
+
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.fields import DateTimeField
+
+from core.pubsub import get_broker
+from notes.models import Note
+from notes.sync import CursorExpired, changes_since, encode_sync_cursor
+
+_datetime = DateTimeField()
+
+
+def sse_frame(event: str, data: dict, event_id=None) -> str:
+    lines = [f"id: {event_id}"] if event_id else []
+    lines += [f"event: {event}", f"data: {json.dumps(data, separators=(',', ':'))}"]
+    return "\n".join(lines) + "\n\n"
+
+
+def publish_user_event(user_id, event: str, data: dict) -> None:
+    """Publish event to user_id's stream once the current transaction commits."""
+
+    def publish():
+        frame = sse_frame(event, data, encode_sync_cursor(timezone.now()))
+        get_broker().publish(str(user_id), frame)
+
+    # robust: a broker outage must not fail the write that already committed.
+    transaction.on_commit(publish, robust=True)
+
+
+def note_event_data(note) -> dict:
+    return {
+        "id": note.pk,
+        "category_id": note.category_id,
+        "updated_at": _datetime.to_representation(note.updated_at),
+    }
+
+
+def catch_up_frames(user, since) -> list:
+    """Frames for the notes changed and deleted since the cursor, or a resync frame."""
+    notes = Note.objects.filter(user=user).only("id", "category_id", "updated_at")
+    try:
+        changed, deleted, cursor, has_more = changes_since(
+            user, notes, since, limit=settings.NOTES_CHANGES_MAX
+        )
+    except CursorExpired:
+        return [sse_frame("resync", {"reason": "cursor_expired"})]
+    if has_more:
+        return [sse_frame("resync", {"reason": "too_many_changes"})]
+    frames = [sse_frame("note.updated", note_event_data(note)) for note in changed]
+    frames += [sse_frame("note.deleted", {"id": note_id}) for note_id in deleted]
+    if frames:
+        # Give the last replayed frame the new cursor so a later reconnect resumes here.
+        frames[-1] = f"id: {cursor}\n" + frames[-1]
+    return frames
+
+
+async def event_stream(user, since=None):
+    """Yield SSE text for user until NOTES_EVENTS_MAX_AGE elapses or the client leaves."""
+    subscription = get_broker().subscribe(str(user.pk), settings.NOTES_EVENTS_QUEUE_SIZE)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.NOTES_EVENTS_MAX_AGE
+    try:
+        yield f"retry: {settings.NOTES_EVENTS_RETRY_MS}\n\n"
+        if since is not None:
+            for frame in await sync_to_async(catch_up_frames)(user, since):
+                yield frame
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                frame = await subscription.get(min(settings.NOTES_EVENTS_HEARTBEAT, remaining))
+            except TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if subscription.overflowed:
+                subscription.overflowed = False
+                yield sse_frame("resync", {"reason": "overflow"})
+            yield frame
+    finally:
+        subscription.close()
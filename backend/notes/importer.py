@@ -0,0 +1,221 @@
+"""Streaming import of notes from NDJSON or a JSON array.
+
+Input is parsed incrementally and written in batches of NOTES_IMPORT_BATCH_SIZE:
+each batch resolves (or creates) the categories it names with a constant
+number of queries and inserts its notes with one bulk_create, in its own
+transaction. Memory is
+bounded by the batch size and the capped error list, not by the input size.
+"""
+
+import codecs
+import json
+from dataclasses import asdict, dataclass, field
+
+from django.conf import settings
+from django.db import transaction
+
+from categories.models import Category
+from notes.models import Note
+from notes.serializers import NoteImportSerializer
+from notes.signals import deferred_note_changes, record_notes_count_deltas, record_user_change
+from notes.storage import split_bodies, store_bodies
+
+IMPORT_FORMATS = ("ndjson", "json")
+
+# Colour of categories created by an import when the row does not give one.
+DEFAULT_CATEGORY_COLOR = "#F3C6A3"
+
+_READ_SIZE = 64 * 1024
+
+
+class ImportFormatError(ValueError):
+    """The input is not valid NDJSON / a JSON array; rows before it were imported."""
+
+
+def iter_ndjson(stream):
+    """Yield (row number, parsed value or ValueError) for each non-blank line of a byte stream."""
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as exc:
+            yield number, exc
+
+
+def iter_json_array(stream):
+    """Yield (row number, value) for each element of a top-level JSON array, reading incrementally."""
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    buffer, eof, started, number = "", False, False, 0
+
+    def fill():
+        nonlocal buffer, eof
+        chunk = stream.read(_READ_SIZE)
+        eof = not chunk
+        try:
+            buffer += text.decode(chunk or b"", final=eof)
+        except UnicodeDecodeError:
+            raise ImportFormatError("Input is not valid UTF-8.") from None
+
+    while True:
+        buffer = buffer.lstrip()
+        if not buffer:
+            if eof:
+                raise ImportFormatError("Unexpected end of input; expected a JSON array.")
+            fill()
+            continue
+        if not started:
+            if buffer[0] != "[":
+                raise ImportFormatError("Expected a JSON array.")
+            buffer, started = buffer[1:], True
+            continue
+        if buffer[0] == "]":
+            if buffer[1:].strip():
+                raise ImportFormatError("Unexpected data after the JSON array.")
+            return
+        if number and buffer[0] == ",":
+            buffer = buffer[1:]
+            continue
+        try:
+            value, end = decoder.raw_decode(buffer)
+        except ValueError:
+            value, end = None, None
+        # A value ending exactly at the buffer end may be cut short (e.g. a number).
+        if end is None or (end == len(buffer) and not eof):
+            if eof:
+                raise ImportFormatError(f"Invalid JSON at element {number + 1}.")
+            fill()
+            continue
+        number += 1
+        buffer = buffer[end:].lstrip()
+        if buffer and buffer[0] not in ",]":
+            raise ImportFormatError(f"Expected ',' or ']' after element {number}.")
+        yield number, value
+
+
+@dataclass
+class ImportStats:
+    rows: int = 0
+    created: int = 0
+    failed: int = 0
+    categories_created: int = 0
+    batches: int = 0
+    errors: list = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class NoteImporter:
+    """Import parsed rows for one user in batches; see the module docstring."""
+
+    def __init__(self, user, batch_size=None, max_errors=None, on_batch=None):
+        self.user = user
+        self.batch_size = batch_size or settings.NOTES_IMPORT_BATCH_SIZE
+        self.max_errors = settings.NOTES_IMPORT_MAX_ERRORS if max_errors is None else max_errors
+        self.on_batch = on_batch
+        self.stats = ImportStats()
+        self.category_ids = {}
+        self.default_category_id = None
+
+    def run(self, rows) -> ImportStats:
+        """Consume (row number, value) pairs from iter_ndjson or iter_json_array."""
+        batch = []
+        try:
+            for number, value in rows:
+                self.stats.rows += 1
+                if isinstance(value, ValueError):
+                    self.add_error(number, {"non_field_errors": [f"Invalid JSON: {value}"]})
+                    continue
+                serializer = NoteImportSerializer(data=value)
+                if not serializer.is_valid():
+                    self.add_error(number, serializer.errors)
+                    continue
+                batch.append((number, serializer.validated_data))
+                if len(batch) >= self.batch_size:
+                    self.write_batch(batch)
+                    batch = []
+        except ImportFormatError:
+            # Keep every row read before the malformed input; self.stats has the totals.
+            if batch:
+                self.write_batch(batch)
+            raise
+        if batch:
+            self.write_batch(batch)
+        return self.stats
+
+    def add_error(self, number, errors) -> None:
+        self.stats.failed += 1
+        if len(self.stats.errors) < self.max_errors:
+            self.stats.errors.append({"row": number, "errors": dict(errors)})
+
+    def write_batch(self, batch) -> None:
+        with transaction.atomic(), deferred_note_changes():
+            # bulk_create sends no signals; do the cache and count bookkeeping here.
+            record_user_change(self.user.pk)
+            self.resolve_categories(data["category"] for _, data in batch if data.get("category"))
+            notes, deltas = [], {}
+            for number, data in batch:
+                category_id = self.category_id_for(data.get("category"))
+                if category_id is None:
+                    self.add_error(number, {"category": ["No category available."]})
+                    continue
+                notes.append(
+                    Note(
+                        user=self.user,
+                        category_id=category_id,
+                        title=data["title"],
+                        content=data["content"],
+                    )
+                )
+                deltas[category_id] = deltas.get(category_id, 0) + 1
+            bodies = split_bodies(notes)
+            Note.objects.bulk_create(notes)
+            store_bodies(bodies)
+            record_notes_count_deltas(deltas)
+        self.stats.created += len(notes)
+        self.stats.batches += 1
+        if self.on_batch is not None:
+            self.on_batch(self.stats)
+
+    def resolve_categories(self, categories) -> None:
+        """Load, and create where missing, the batch's categories by name (at most three queries)."""
+        wanted = {}
+        for name, color_hex in categories:
+            if name not in self.category_ids:
+                wanted.setdefault(name, color_hex)
+        if not wanted:
+            return
+        owned = Category.objects.filter(user=self.user, name__in=wanted)
+        self.category_ids.update(owned.values_list("name", "pk"))
+        missing = [name for name in wanted if name not in self.category_ids]
+        if not missing:
+            return
+        Category.objects.bulk_create(
+            [
+                Category(user=self.user, name=name, color_hex=wanted[name] or DEFAULT_CATEGORY_COLOR)
+                for name in missing
+            ],
+            ignore_conflicts=True,
+        )
+        created = Category.objects.filter(user=self.user, name__in=missing)
+        self.category_ids.update(created.values_list("name", "pk"))
+        self.stats.categories_created += len(missing)
+
+    def category_id_for(self, category):
+        if category:
+            return self.category_ids.get(category[0])
+        if self.default_category_id is None:
+            self.default_category_id = (
+                Category.objects.filter(user=self.user)
+                .order_by("created_at", "id")
+                .values_list("pk", flat=True)
+                .first()
+            )
+        return self.default_category_id
+
+
+def iter_rows(stream, import_format: str):
+    """Parse a byte stream in import_format ("ndjson" or "json")."""
+    return iter_ndjson(stream) if import_format == "ndjson" else iter_json_array(stream)
@@ -0,0 +1,60 @@
+import sys
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.importer import IMPORT_FORMATS, ImportFormatError, NoteImporter, iter_rows
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream-import notes for a user from an NDJSON file or JSON array (e.g. an "
+        "/api/notes/export download), creating categories by name as needed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for stdin.")
+        parser.add_argument("--email", required=True, help="User who will own the notes.")
+        parser.add_argument(
+            "--type", choices=IMPORT_FORMATS, help="Input format (default: from the file extension)."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.NOTES_IMPORT_BATCH_SIZE,
+            help="Notes per bulk insert (default: NOTES_IMPORT_BATCH_SIZE).",
+        )
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(email__iexact=options["email"]).first()
+        if user is None:
+            raise CommandError(f"No user with email {options['email']!r}.")
+        path = options["path"]
+        import_format = options["type"] or ("json" if path.endswith(".json") else "ndjson")
+        importer = NoteImporter(user, batch_size=options["batch_size"], on_batch=self.progress)
+
+        stream = sys.stdin.buffer if path == "-" else open(path, "rb")
+        try:
+            stats = importer.run(iter_rows(stream, import_format))
+        except ImportFormatError as exc:
+            raise CommandError(f"{exc} ({importer.stats.created} notes imported before it).")
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+
+        for error in stats.errors:
+            self.stderr.write(f"row {error['row']}: {error['errors']}")
+        if stats.failed > len(stats.errors):
+            self.stderr.write(f"... and {stats.failed - len(stats.errors)} more failed rows.")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {stats.created} of {stats.rows} notes ({stats.failed} failed, "
+                f"{stats.categories_created} categories created)."
+            )
+        )
+
+    def progress(self, stats):
+        self.stderr.write(f"batch {stats.batches}: {stats.created} imported, {stats.failed} failed")
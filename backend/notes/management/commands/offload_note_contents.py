@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.storage import offload_existing
+
+
+class Command(BaseCommand):
+    help = (
+        "Move note bodies longer than NOTES_LARGE_CONTENT_THRESHOLD out of the notes "
+        "table (or back in with --inline), one transaction per batch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="Notes moved per transaction.")
+        parser.add_argument(
+            "--inline",
+            action="store_true",
+            help="Move every offloaded body back into the notes table (before turning the tier off).",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        if not options["inline"] and settings.NOTES_LARGE_CONTENT_THRESHOLD <= 0:
+            raise CommandError("NOTES_LARGE_CONTENT_THRESHOLD is not set; nothing would be offloaded.")
+        moved = offload_existing(
+            options["batch_size"],
+            inline=options["inline"],
+            on_batch=lambda total: self.stdout.write(f"{total} notes moved"),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Moved {moved} notes."))
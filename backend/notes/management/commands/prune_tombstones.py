@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from notes.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = "Delete note tombstones older than the sync retention window."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.NOTES_TOMBSTONE_RETENTION_DAYS,
+            help="Keep tombstones from the last N days (default: NOTES_TOMBSTONE_RETENTION_DAYS).",
+        )
+
+    def handle(self, *args, **options):
+        removed = prune_tombstones(timezone.now() - timedelta(days=options["days"]))
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} tombstones."))
@@ -0,0 +1,123 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from categories.models import Category
+from notes.models import Note
+from notes.signals import recompute_notes_count
+
+User = get_user_model()
+
+WORDS = (
+    "meeting idea project garden recipe travel budget reading list call draft "
+    "review weekend plan school exam lecture notes coffee friend birthday gift "
+    "shopping deadline report summary question answer thought memory music film "
+    "walk run workout doctor appointment invoice email follow up todo later"
+).split()
+
+COLORS = ["#F3C6A3", "#B7CCC3", "#FBE6BB", "#C9D7F2", "#E8C5E5", "#D5E8C5"]
+
+
+def realistic_length(rng: random.Random, mean: int) -> int:
+    """Log-normal note length: most notes are short, a few are very long."""
+    if mean <= 0:
+        return 0
+    return min(int(rng.lognormvariate(0, 1.0) * mean / 1.65), mean * 40)
+
+
+def make_text(rng: random.Random, length: int) -> str:
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:length]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed benchmark data: N users, each with M categories and K notes of "
+        "realistic sizes, written with bulk inserts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--categories", type=int, default=3, help="Categories per user.")
+        parser.add_argument("--notes", type=int, default=1000, help="Notes per user.")
+        parser.add_argument(
+            "--content-size", type=int, default=800, help="Mean note content length in characters."
+        )
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--prefix", default="bench", help="Email prefix for seeded users.")
+        parser.add_argument("--password", default="benchmark-password")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for reproducible data.")
+
+    def handle(self, *args, **options):
+        if options["categories"] < 1:
+            raise CommandError("--categories must be at least 1.")
+        rng = random.Random(options["seed"])
+        prefix = options["prefix"]
+        batch_size = options["batch_size"]
+        # Hash once: PBKDF2 per seeded user would dominate the run.
+        password_hash = make_password(options["password"])
+
+        emails = [f"{prefix}{i}@example.com" for i in range(options["users"])]
+        existing = set(User.objects.filter(email__in=emails).values_list("email", flat=True))
+        if existing:
+            raise CommandError(
+                f"{len(existing)} seed users already exist; use a different --prefix."
+            )
+
+        with transaction.atomic():
+            users = User.objects.bulk_create(
+                [User(username=email, email=email, password=password_hash) for email in emails],
+                batch_size=batch_size,
+            )
+            categories = Category.objects.bulk_create(
+                [
+                    Category(
+                        user=user,
+                        name=f"Category {c + 1}",
+                        color_hex=COLORS[c % len(COLORS)],
+                    )
+                    for user in users
+                    for c in range(options["categories"])
+                ],
+                batch_size=batch_size,
+            )
+            by_user = {}
+            for category in categories:
+                by_user.setdefault(category.user_id, []).append(category.pk)
+
+            total = 0
+            batch = []
+            for user in users:
+                for _ in range(options["notes"]):
+                    batch.append(
+                        Note(
+                            user=user,
+                            category_id=rng.choice(by_user[user.pk]),
+                            title=make_text(rng, rng.randint(5, 60)).capitalize(),
+                            content=make_text(rng, realistic_length(rng, options["content_size"])),
+                        )
+                    )
+                    if len(batch) >= batch_size:
+                        Note.objects.bulk_create(batch)
+                        total += len(batch)
+                        batch = []
+                        self.stdout.write(f"  {total} notes inserted")
+            if batch:
+                Note.objects.bulk_create(batch)
+                total += len(batch)
+            recompute_notes_count(Category.objects.filter(user__in=users))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(users)} users, {len(categories)} categories and {total} notes "
+                f"(password: {options['password']})."
+            )
+        )
@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from notes.search import install_search_index, remove_search_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, remove_search_index),
+    ]
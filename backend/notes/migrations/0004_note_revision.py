@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_note_tombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('title', models.CharField(blank=True, default='', max_length=200)),
+                ('depth', models.PositiveSmallIntegerField()),
+                ('data', models.BinaryField()),
+                ('content_length', models.PositiveIntegerField()),
+                ('content_hash', models.CharField(max_length=32)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('note', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='notes.note')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('note', 'number'), name='notes_revision_unique_number')],
+            },
+        ),
+    ]
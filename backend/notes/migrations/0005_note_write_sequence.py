@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0004_note_revision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='write_sequence',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from notes.search import reinstall_sqlite_triggers
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0005_note_write_sequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='content_offloaded',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(reinstall_sqlite_triggers, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='NoteContentChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveIntegerField()),
+                ('data', models.BinaryField()),
+                ('note', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='content_chunks', to='notes.note')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('note', 'index'), name='notes_content_chunk_unique_index')],
+            },
+        ),
+    ]
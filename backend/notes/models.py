@@ -4,6 +4,12 @@ from django.db import models
 from categories.models import Category
 
 
+def mark_content_loaded(note) -> None:
+    """Remember the content just read from the row (only a head when offloaded)."""
+    note._stored_content = note.__dict__.get("content")
+    note._body_loaded = note.__dict__.get("content_offloaded") is False
+
+
 class Note(models.Model):
     """Note belonging to a user and a category."""
 
@@ -21,6 +27,10 @@ class Note(models.Model):
     content = models.TextField(blank=True, default="")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Highest X-Write-Sequence applied to this note; older writes are dropped.
+    write_sequence = models.BigIntegerField(null=True, blank=True, editable=False)
+    # The body lives in NoteContentChunk rows and content holds only its head (notes.storage).
+    content_offloaded = models.BooleanField(default=False, editable=False)
 
     class Meta:
         indexes = [
@@ -28,7 +38,87 @@ class Note(models.Model):
             models.Index(fields=["user", "category"]),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored category so signals can detect moves.
+        instance._loaded_category_id = instance.__dict__.get("category_id")
+        mark_content_loaded(instance)
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        if fields is None or "content" in fields:
+            mark_content_loaded(self)
+
+    def save(self, *args, **kwargs):
+        # notes.storage imports this module.
+        from notes.storage import save_note
+
+        save_note(self, super().save, *args, **kwargs)
+
     def __str__(self):
         title_preview = (self.title[:30] + "…") if len(self.title) > 30 else self.title or "(untitled)"
         pk_str = self.pk if self.pk is not None else "unsaved"
         return f"Note #{pk_str}: {title_preview}"
+
+
+class NoteTombstone(models.Model):
+    """Deletion log entry so sync clients can learn which notes disappeared."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="note_tombstones",
+    )
+    note_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "deleted_at"]),
+        ]
+
+    def __str__(self):
+        return f"Tombstone for note #{self.note_id}"
+
+
+class NoteRevision(models.Model):
+    """One saved version of a note's title and content (see notes.revisions).
+
+    ``data`` is the zlib-compressed content when ``depth`` is 0 (a snapshot),
+    otherwise a compressed delta against revision ``number - 1``.
+    """
+
+    note = models.ForeignKey(Note, on_delete=models.CASCADE, related_name="revisions")
+    number = models.PositiveIntegerField()
+    title = models.CharField(max_length=200, blank=True, default="")
+    depth = models.PositiveSmallIntegerField()
+    data = models.BinaryField()
+    content_length = models.PositiveIntegerField()
+    content_hash = models.CharField(max_length=32)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["note", "number"], name="notes_revision_unique_number"),
+        ]
+
+    def __str__(self):
+        return f"Revision {self.number} of note #{self.note_id}"
+
+
+class NoteContentChunk(models.Model):
+    """One piece of an offloaded note body: zlib-compressed UTF-8, split in order (notes.storage)."""
+
+    note = models.ForeignKey(Note, on_delete=models.CASCADE, related_name="content_chunks")
+    index = models.PositiveIntegerField()
+    data = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["note", "index"], name="notes_content_chunk_unique_index"),
+        ]
+
+    def __str__(self):
+        return f"Content chunk {self.index} of note #{self.note_id}"
@@ -0,0 +1,217 @@
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from datetime import datetime
+from urllib import parse
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetCursorPagination(BasePagination):
+    """Opaque-cursor keyset pagination over (updated_at, id), newest first.
+
+    Each page is fetched with a seek predicate on the last row seen instead of
+    an OFFSET, so deep pages cost the same as the first one and can be served
+    from the (user, updated_at) index.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request)
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async paginate_queryset() for core.async_views, fetching rows with the async ORM."""
+        queryset = self.page_queryset(queryset, request)
+        return self.set_page([row async for row in queryset.aiterator()])
+
+    def page_queryset(self, queryset, request):
+        """Return the sliced queryset for the requested page (one extra row to detect more)."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor[2]
+
+        if self.cursor is None:
+            queryset = queryset.order_by("-updated_at", "-id")
+        else:
+            updated_at, pk, _ = self.cursor
+            if reverse:
+                queryset = queryset.filter(updated_at__gte=updated_at).filter(
+                    Q(updated_at__gt=updated_at) | Q(id__gt=pk)
+                ).order_by("updated_at", "id")
+            else:
+                queryset = queryset.filter(updated_at__lte=updated_at).filter(
+                    Q(updated_at__lt=updated_at) | Q(id__lt=pk)
+                ).order_by("-updated_at", "-id")
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, results):
+        """Trim the fetched rows to the page and work out which links exist."""
+        reverse = self.cursor is not None and self.cursor[2]
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+
+        if reverse:
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        return OrderedDict(
+            [
+                ("next", self.get_next_link()),
+                ("previous", self.get_previous_link()),
+                ("results", data),
+            ]
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw and raw.isdecimal() and int(raw) > 0:
+            return min(int(raw), self.max_page_size)
+        return self.page_size
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            return self.encode_cursor(*self.seek_key(self.page[-1]), reverse=False)
+        # An empty page reached backwards still has the cursor row ahead of it.
+        updated_at, pk, _ = self.cursor
+        return self.encode_cursor(updated_at, pk, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            return self.encode_cursor(*self.seek_key(self.page[0]), reverse=True)
+        updated_at, pk, _ = self.cursor
+        return self.encode_cursor(updated_at, pk, reverse=True)
+
+    @staticmethod
+    def seek_key(item):
+        """(updated_at, pk) of a page item: a model instance or a values() row."""
+        if isinstance(item, dict):
+            return item["updated_at"], item["id"]
+        return item.updated_at, item.pk
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            querystring = b64decode(encoded.encode("ascii")).decode("ascii")
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            updated_at = datetime.fromisoformat(tokens["t"][0])
+            pk = int(tokens["i"][0])
+            reverse = bool(int(tokens.get("r", ["0"])[0]))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return updated_at, pk, reverse
+
+    def encode_cursor(self, updated_at, pk, reverse):
+        tokens = {"t": updated_at.isoformat(), "i": pk}
+        if reverse:
+            tokens["r"] = "1"
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = b64encode(querystring.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+
+class RevisionCursorPagination(CursorPagination):
+    """A note's revisions, newest first, paged on the revision number."""
+
+    ordering = "-number"
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class RankedOffsetPagination(BasePagination):
+    """Offset pagination for relevance-ordered results, without a COUNT query.
+
+    Ranked search results have no stable seek key, and users rarely page deep
+    into them, so one extra row is fetched to decide whether a next page exists.
+    Offsets above max_offset are rejected.
+    """
+
+    offset_query_param = "offset"
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    max_offset = 10_000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        raw_offset = request.query_params.get(self.offset_query_param, "")
+        self.offset = int(raw_offset) if raw_offset.isdecimal() else 0
+        if self.offset > self.max_offset:
+            raise ValidationError(
+                {self.offset_query_param: f"Must be at most {self.max_offset}."}, code="invalid"
+            )
+
+        results = list(queryset[self.offset : self.offset + self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        return results[: self.page_size]
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_page_size(self, request):
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw and raw.isdecimal() and int(raw) > 0:
+            return min(int(raw), self.max_page_size)
+        return self.page_size
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.base_url, self.offset_query_param, self.offset + self.page_size
+        )
+
+    def get_previous_link(self):
+        if self.offset <= 0:
+            return None
+        previous = self.offset - self.page_size
+        if previous <= 0:
+            return remove_query_param(self.base_url, self.offset_query_param)
+        return replace_query_param(self.base_url, self.offset_query_param, previous)
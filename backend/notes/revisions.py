@@ -0,0 +1,131 @@
+"""Revision history of note edits, stored as compressed line deltas.
+
+Each edit through the detail endpoint records a NoteRevision with the new
+title and content, in the transaction that saves the note. The first edit
+also records the version it replaced as revision 1. A revision stores
+either the whole content (a snapshot, ``depth`` 0) or a delta against the
+revision before it, both zlib-compressed. Every
+NOTES_REVISION_SNAPSHOT_INTERVAL revisions a snapshot is written again, so
+rebuilding any revision applies fewer than that many deltas to the
+snapshot it starts from.
+
+A delta is a JSON list of ``[start, end]`` ranges of the previous
+version's lines to copy and strings to insert. Each revision keeps a hash
+of its content. When the note changed without a revision being recorded
+(bulk updates, imports), the next revision is a snapshot rather than a
+delta against content the history never saw.
+"""
+
+import difflib
+import hashlib
+import json
+import zlib
+
+from django.conf import settings
+
+from notes.models import NoteRevision
+from notes.storage import load_content
+
+
+def content_hash(content: str) -> str:
+    return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+
+def encode_delta(base: str, content: str) -> bytes:
+    """Compressed delta that turns base into content."""
+    old, new = base.splitlines(keepends=True), content.splitlines(keepends=True)
+    # Edits are usually local: only diff what lies between the common first and last lines.
+    limit = min(len(old), len(new))
+    prefix = 0
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    ops = [[0, prefix]] if prefix else []
+    matcher = difflib.SequenceMatcher(None, old[prefix:len(old) - suffix], new[prefix:len(new) - suffix])
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([prefix + i1, prefix + i2])
+        elif j2 > j1:
+            ops.append("".join(new[prefix + j1:prefix + j2]))
+    if suffix:
+        ops.append([len(old) - suffix, len(old)])
+    return zlib.compress(json.dumps(ops, ensure_ascii=False, separators=(",", ":")).encode())
+
+
+def apply_delta(base: str, data: bytes) -> str:
+    lines = base.splitlines(keepends=True)
+    parts = []
+    for op in json.loads(zlib.decompress(data)):
+        parts.extend(lines[op[0]:op[1]] if isinstance(op, list) else (op,))
+    return "".join(parts)
+
+
+def _snapshot(content: str) -> bytes:
+    return zlib.compress(content.encode())
+
+
+def _write(note_id, number, title, content, previous=None, previous_content=None) -> NoteRevision:
+    depth, data = 0, _snapshot(content)
+    if (
+        previous is not None
+        and previous.depth + 1 < settings.NOTES_REVISION_SNAPSHOT_INTERVAL
+        and previous.content_hash == content_hash(previous_content)
+    ):
+        delta = encode_delta(previous_content, content)
+        if len(delta) < len(data):
+            depth, data = previous.depth + 1, delta
+    return NoteRevision.objects.create(
+        note_id=note_id,
+        number=number,
+        title=title,
+        depth=depth,
+        data=data,
+        content_length=len(content),
+        content_hash=content_hash(content),
+    )
+
+
+def _latest(note_id):
+    return (
+        NoteRevision.objects.filter(note_id=note_id)
+        .only("number", "depth", "content_hash")
+        .order_by("-number")
+        .first()
+    )
+
+
+def start_history(note):
+    """Record the note's current version as its first revision, unless it has one."""
+    latest = _latest(note.pk)
+    if latest is None:
+        latest = _write(note.pk, 1, note.title, load_content(note))
+    return latest
+
+
+def record_revision(note, previous_title: str, previous_content: str):
+    """Record note's saved title and content as a new revision (inside its transaction).
+
+    The caller holds the note's row lock, which also serializes revision
+    numbers. Returns the revision, or None when nothing it tracks changed.
+    """
+    if not settings.NOTES_REVISIONS_ENABLED:
+        return None
+    if note.title == previous_title and note.content == previous_content:
+        return None
+    latest = _latest(note.pk)
+    if latest is None:
+        latest = _write(note.pk, 1, previous_title, previous_content)
+    return _write(note.pk, latest.number + 1, note.title, note.content, latest, previous_content)
+
+
+def rebuild(note_id, number):
+    """(revision, content) for revision number of note_id; raises NoteRevision.DoesNotExist."""
+    revisions = NoteRevision.objects.filter(note_id=note_id)
+    depth = revisions.values_list("depth", flat=True).get(number=number)
+    chain = list(revisions.filter(number__gte=number - depth, number__lte=number).order_by("number"))
+    content = zlib.decompress(chain[0].data).decode()
+    for revision in chain[1:]:
+        content = apply_delta(content, revision.data)
+    return chain[-1], content
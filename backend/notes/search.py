@@ -0,0 +1,165 @@
+"""Full-text search over note titles and content.
+
+PostgreSQL keeps a generated, weighted ``tsvector`` column on ``notes_note``
+with a GIN index on ``(user_id, search_vector)`` so matching is scoped to the
+user inside the index. SQLite keeps an FTS5 external-content table in sync
+with triggers. Neither column is declared on the model; queries reach them
+through raw SQL expressions.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "notes_note_fts"
+
+POSTGRES_INSTALL = [
+    "CREATE EXTENSION IF NOT EXISTS btree_gin",
+    """
+    ALTER TABLE notes_note ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'B')
+    ) STORED
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS notes_note_user_search_idx
+    ON notes_note USING GIN (user_id, search_vector)
+    """,
+]
+
+POSTGRES_REMOVE = [
+    "DROP INDEX IF EXISTS notes_note_user_search_idx",
+    "ALTER TABLE notes_note DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS notes_note_fts_ai AFTER INSERT ON notes_note BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS notes_note_fts_ad AFTER DELETE ON notes_note BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS notes_note_fts_au AFTER UPDATE OF title, content ON notes_note BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+]
+
+SQLITE_INSTALL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, content, content='notes_note', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    *SQLITE_TRIGGERS,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_REMOVE = [
+    "DROP TRIGGER IF EXISTS notes_note_fts_ai",
+    "DROP TRIGGER IF EXISTS notes_note_fts_ad",
+    "DROP TRIGGER IF EXISTS notes_note_fts_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def _execute_all(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def install_search_index(apps, schema_editor):
+    """Migration operation: create the backend-specific search index."""
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        _execute_all(schema_editor, POSTGRES_INSTALL)
+    elif vendor == "sqlite":
+        _execute_all(schema_editor, SQLITE_INSTALL)
+
+
+def remove_search_index(apps, schema_editor):
+    """Migration operation: drop the backend-specific search index."""
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        _execute_all(schema_editor, POSTGRES_REMOVE)
+    elif vendor == "sqlite":
+        _execute_all(schema_editor, SQLITE_REMOVE)
+
+
+def reinstall_sqlite_triggers(apps, schema_editor):
+    """Migration operation: restore FTS triggers after SQLite rebuilds notes_note.
+
+    SQLite applies most schema changes by copying the table, which drops its
+    triggers; any migration that alters notes_note must run this afterwards.
+    """
+    if schema_editor.connection.vendor == "sqlite":
+        _execute_all(schema_editor, SQLITE_TRIGGERS)
+
+
+def _fts5_match_expression(query: str) -> str:
+    """Quote each word so user input can never be parsed as FTS5 syntax."""
+    terms = re.findall(r"\w+", query)
+    return " ".join('"%s"' % term for term in terms)
+
+
+def search_notes(queryset, query: str):
+    """Filter a Note queryset to full-text matches, best match first."""
+    vendor = connection.vendor
+    if vendor == "postgresql":
+        tsquery = "websearch_to_tsquery('english', %s)"
+        return (
+            queryset.alias(
+                matches=RawSQL(
+                    f'"notes_note"."search_vector" @@ {tsquery}',
+                    [query],
+                    output_field=BooleanField(),
+                )
+            )
+            .filter(matches=True)
+            .annotate(
+                rank=RawSQL(
+                    f'ts_rank_cd("notes_note"."search_vector", {tsquery})',
+                    [query],
+                    output_field=FloatField(),
+                )
+            )
+            .order_by("-rank", "-id")
+        )
+    if vendor == "sqlite":
+        match = _fts5_match_expression(query)
+        if not match:
+            return queryset.none()
+        return (
+            queryset.filter(
+                id__in=RawSQL(
+                    f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+                    [match],
+                )
+            )
+            .annotate(
+                # bm25() is lower-is-better; negate it so both backends sort descending.
+                rank=RawSQL(
+                    f"(SELECT -bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} "
+                    f'WHERE {FTS_TABLE} MATCH %s AND rowid = "notes_note"."id")',
+                    [match],
+                    output_field=FloatField(),
+                )
+            )
+            .order_by("-rank", "-id")
+        )
+    # Unindexed fallback for other backends.
+    return queryset.filter(Q(title__icontains=query) | Q(content__icontains=query)).order_by(
+        "-updated_at", "-id"
+    )
@@ -1,7 +1,11 @@
+from functools import lru_cache
+
+from django.conf import settings
 from rest_framework import serializers
 
 from categories.models import Category
-from notes.models import Note
+from core.rows import DateTime, row_columns, rows_mapper
+from notes.models import Note, NoteRevision
 
 
 class CategoryNestedSerializer(serializers.ModelSerializer):
@@ -34,3 +38,187 @@ class NoteSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         if request and request.user:
             self.fields["category_id"].queryset = Category.objects.filter(user=request.user)
+
+    def update(self, instance, validated_data):
+        """Save only the columns whose value changed; write nothing when none did.
+
+        A ``write_sequence`` passed to save() is stored with the changes, or on
+        its own (without touching updated_at, so the ETag stays) when there are
+        none. The changed field names are left in ``changed_fields``.
+        """
+        sequence = validated_data.pop("write_sequence", None)
+        changed = []
+        for attr, value in validated_data.items():
+            field = Note._meta.get_field(attr)
+            new = value.pk if field.is_relation else value
+            if getattr(instance, field.attname) != new:
+                setattr(instance, attr, value)
+                changed.append(attr)
+        self.changed_fields = changed
+        if changed:
+            update_fields = [*changed, "updated_at"]
+            if sequence is not None:
+                instance.write_sequence = sequence
+                update_fields.append("write_sequence")
+            instance.save(update_fields=update_fields)
+        elif sequence is not None:
+            instance.write_sequence = sequence
+            Note.objects.filter(pk=instance.pk).update(write_sequence=sequence)
+        return instance
+
+
+class NoteListSerializer(serializers.ModelSerializer):
+    """Read-only list representation with a database-truncated content preview.
+
+    Pass ``fields`` to restrict the output to a sparse fieldset.
+    """
+
+    category = CategoryNestedSerializer(read_only=True)
+    content_preview = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = Note
+        fields = ["id", "title", "content_preview", "category", "updated_at"]
+        read_only_fields = fields
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class NoteRevisionSerializer(serializers.ModelSerializer):
+    """Revision metadata for the history list (content is only served per revision)."""
+
+    class Meta:
+        model = NoteRevision
+        fields = ["number", "title", "content_length", "created_at"]
+        read_only_fields = fields
+
+
+class NoteRevisionDetailSerializer(NoteRevisionSerializer):
+    """One revision with its rebuilt content (set as ``revision.content``)."""
+
+    content = serializers.CharField(read_only=True)
+
+    class Meta(NoteRevisionSerializer.Meta):
+        fields = ["number", "title", "content", "content_length", "created_at"]
+        read_only_fields = fields
+
+
+# Read fast path (core.rows): the representations above, built from .values() rows.
+CATEGORY_NESTED_ROW = {
+    "id": "category_id",
+    "name": "category__name",
+    "color_hex": "category__color_hex",
+}
+NOTE_ROW = {
+    "id": "id",
+    "title": "title",
+    "content": "content",
+    "category": CATEGORY_NESTED_ROW,
+    "updated_at": DateTime("updated_at"),
+}
+NOTE_LIST_ROW = {
+    "id": "id",
+    "title": "title",
+    "content_preview": "content_preview",
+    "category": CATEGORY_NESTED_ROW,
+    "updated_at": DateTime("updated_at"),
+}
+
+NOTE_ROW_COLUMNS = row_columns(NOTE_ROW)
+note_rows = rows_mapper(NOTE_ROW)
+
+
+@lru_cache(maxsize=None)
+def note_list_row(fields: frozenset):
+    """(columns, mapper) giving NoteListSerializer(fields=...) output from values() rows.
+
+    The columns always include id and updated_at, which cursor pagination needs.
+    """
+    spec = {key: source for key, source in NOTE_LIST_ROW.items() if key in fields}
+    columns = list(dict.fromkeys(["id", "updated_at", *row_columns(spec)]))
+    return columns, rows_mapper(spec)
+
+
+class BulkNoteCreateSerializer(serializers.Serializer):
+    """One item of a bulk create; category ownership is checked in bulk by the caller."""
+
+    title = serializers.CharField(max_length=200, required=False, allow_blank=True, default="")
+    content = serializers.CharField(required=False, allow_blank=True, default="")
+    category_id = serializers.IntegerField(required=False)
+
+
+class BulkNoteUpdateSerializer(serializers.Serializer):
+    """One item of a bulk update."""
+
+    id = serializers.IntegerField()
+    title = serializers.CharField(max_length=200, required=False, allow_blank=True)
+    content = serializers.CharField(required=False, allow_blank=True)
+    category_id = serializers.IntegerField(required=False)
+
+
+class BulkNoteMoveSerializer(serializers.Serializer):
+    """Move a group of notes to one category."""
+
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+    category_id = serializers.IntegerField()
+
+
+class ImportCategoryField(serializers.Field):
+    """A category name, or an exported ``{"name": ..., "color_hex": ...}`` object.
+
+    Returns a (name, color_hex or None) tuple.
+    """
+
+    default_error_messages = {
+        "invalid": "Expected a category name or an object with a name.",
+        "max_length": "Ensure the category name has no more than 60 characters.",
+    }
+
+    def to_internal_value(self, data):
+        color_hex = None
+        if isinstance(data, dict):
+            color_hex = data.get("color_hex")
+            data = data.get("name")
+        if not isinstance(data, str) or not data.strip():
+            self.fail("invalid")
+        if len(data.strip()) > 60:
+            self.fail("max_length")
+        if not (isinstance(color_hex, str) and len(color_hex) <= 7):
+            color_hex = None
+        return data.strip(), color_hex
+
+
+class NoteImportSerializer(serializers.Serializer):
+    """One imported note; categories are matched (or created) by name."""
+
+    title = serializers.CharField(max_length=200, required=False, allow_blank=True, default="")
+    content = serializers.CharField(required=False, allow_blank=True, default="")
+    category = ImportCategoryField(required=False, allow_null=True)
+
+
+class BulkNoteOperationsSerializer(serializers.Serializer):
+    """Envelope of a bulk request; items are validated one by one for per-item errors."""
+
+    create = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    update = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    move = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    delete = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+
+    def validate(self, attrs):
+        total = (
+            len(attrs["create"])
+            + len(attrs["update"])
+            + sum(len(group.get("ids") or []) for group in attrs["move"])
+            + len(attrs["delete"])
+        )
+        if total == 0:
+            raise serializers.ValidationError("At least one operation is required.")
+        if total > settings.NOTES_BULK_MAX_ITEMS:
+            raise serializers.ValidationError(
+                f"At most {settings.NOTES_BULK_MAX_ITEMS} items per request."
+            )
+        return attrs
@@ -0,0 +1,112 @@
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from categories.models import Category
+from core.cache import bump_generation_on_commit
+from notes.events import note_event_data, publish_user_event
+from notes.models import Note
+
+_state = threading.local()
+
+
+def apply_notes_count_deltas(deltas) -> None:
+    """Apply {category_id: delta} to Category.notes_count in a single UPDATE."""
+    deltas = {pk: delta for pk, delta in deltas.items() if pk is not None and delta}
+    if not deltas:
+        return
+    delta_expr = Case(
+        *[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    Category.objects.filter(pk__in=deltas).update(
+        notes_count=Greatest(F("notes_count") + delta_expr, Value(0))
+    )
+
+
+def recompute_notes_count(categories) -> int:
+    """Rebuild notes_count from the notes table for a Category queryset."""
+    counts = (
+        Note.objects.filter(category=OuterRef("pk"))
+        .order_by()
+        .values("category")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return categories.update(notes_count=Coalesce(Subquery(counts), 0))
+
+
+def record_notes_count_deltas(deltas) -> None:
+    """Apply count deltas now, or buffer them inside deferred_note_changes()."""
+    pending = getattr(_state, "count_deltas", None)
+    if pending is None:
+        apply_notes_count_deltas(deltas)
+    else:
+        pending.update(deltas)
+
+
+def record_user_change(user_id) -> None:
+    """Invalidate the user's cached responses, once per deferred batch."""
+    pending = getattr(_state, "changed_users", None)
+    if pending is None:
+        bump_generation_on_commit(user_id)
+    else:
+        pending.add(user_id)
+
+
+def record_note_event(user_id, event: str, data: dict) -> None:
+    """Publish a live-update event, unless a deferred batch will send notes.changed."""
+    if getattr(_state, "changed_users", None) is None:
+        publish_user_event(user_id, event, data)
+
+
+@contextmanager
+def deferred_note_changes():
+    """Batch bookkeeping from many note writes into one flush on exit.
+
+    Bulk code paths wrap their writes in this so per-row signals only
+    accumulate state instead of issuing one UPDATE (or cache bump, or live
+    event) per note.
+    """
+    if getattr(_state, "count_deltas", None) is not None:
+        yield
+        return
+    _state.count_deltas = Counter()
+    _state.changed_users = set()
+    try:
+        yield
+        apply_notes_count_deltas(_state.count_deltas)
+        for user_id in _state.changed_users:
+            bump_generation_on_commit(user_id)
+            publish_user_event(user_id, "notes.changed", {})
+    finally:
+        _state.count_deltas = None
+        _state.changed_users = None
+
+
+@receiver(post_save, sender=Note, dispatch_uid="notes_note_saved")
+def note_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_loaded_category_id", None)
+    if created:
+        record_notes_count_deltas({instance.category_id: 1})
+    elif previous is not None and previous != instance.category_id:
+        record_notes_count_deltas({previous: -1, instance.category_id: 1})
+    instance._loaded_category_id = instance.category_id
+    record_user_change(instance.user_id)
+    event = "note.created" if created else "note.updated"
+    record_note_event(instance.user_id, event, note_event_data(instance))
+
+
+@receiver(post_delete, sender=Note, dispatch_uid="notes_note_deleted")
+def note_deleted(sender, instance, **kwargs):
+    record_notes_count_deltas({instance.category_id: -1})
+    record_user_change(instance.user_id)
+    record_note_event(instance.user_id, "note.deleted", {"id": instance.pk})
@@ -0,0 +1,223 @@
+"""Large-content storage tier: note bodies kept compressed outside the notes table.
+
+With NOTES_LARGE_CONTENT_THRESHOLD set, a note whose content is longer than
+that many characters keeps only its first NOTES_LARGE_CONTENT_HEAD_CHARS
+(at least NOTES_PREVIEW_LENGTH) in ``notes_note.content`` and is flagged
+``content_offloaded``. The full body is stored in NoteContentChunk rows:
+the zlib-compressed UTF-8 text cut into NOTES_LARGE_CONTENT_CHUNK_BYTES
+pieces. Scans over notes (list, changes, search, counts) then only ever
+read the short head; the body is read where the API returns or edits
+content: the detail endpoint, updates, the export and the admin.
+
+Note.save() stores bodies itself, so code writing a note through the
+model does not change. A note loaded from the database has only its head
+in ``content`` until ``load_content(note)``; saving it unchanged leaves the
+stored body alone, and assigning new content replaces it. bulk_create and
+bulk_update go through ``split_bodies`` and ``store_bodies``.
+``manage.py offload_note_contents`` moves existing notes either way.
+
+Search indexes the stored column, so it only matches the head of an
+offloaded note.
+"""
+
+import zlib
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.functions import Length
+
+from notes.models import Note, NoteContentChunk, mark_content_loaded
+
+
+def head_chars() -> int:
+    return max(settings.NOTES_LARGE_CONTENT_HEAD_CHARS, settings.NOTES_PREVIEW_LENGTH)
+
+
+def is_large(content: str) -> bool:
+    threshold = settings.NOTES_LARGE_CONTENT_THRESHOLD
+    return threshold > 0 and len(content) > threshold
+
+
+def _chunks(content: str) -> list:
+    data = zlib.compress(content.encode())
+    size = settings.NOTES_LARGE_CONTENT_CHUNK_BYTES
+    return [data[start:start + size] for start in range(0, len(data), size)] or [data]
+
+
+def write_bodies(bodies) -> None:
+    """Replace the stored bodies of {note_id: content}; a None content deletes it."""
+    if not bodies:
+        return
+    NoteContentChunk.objects.filter(note_id__in=bodies).delete()
+    NoteContentChunk.objects.bulk_create(
+        NoteContentChunk(note_id=note_id, index=index, data=data)
+        for note_id, content in bodies.items()
+        if content is not None
+        for index, data in enumerate(_chunks(content))
+    )
+
+
+def _chunk_rows(note_ids):
+    return (
+        NoteContentChunk.objects.filter(note_id__in=note_ids)
+        .order_by("note_id", "index")
+        .values_list("note_id", "data")
+    )
+
+
+def _join(rows) -> dict:
+    decompressors = {}
+    parts = {}
+    for note_id, data in rows:
+        if note_id not in decompressors:
+            decompressors[note_id] = zlib.decompressobj()
+            parts[note_id] = []
+        parts[note_id].append(decompressors[note_id].decompress(bytes(data)))
+    return {note_id: b"".join(chunks).decode() for note_id, chunks in parts.items()}
+
+
+def load_bodies(note_ids) -> dict:
+    """{note_id: content} for the given offloaded notes, in one query."""
+    return _join(_chunk_rows(note_ids)) if note_ids else {}
+
+
+async def aload_bodies(note_ids) -> dict:
+    return _join([row async for row in _chunk_rows(note_ids)]) if note_ids else {}
+
+
+def _offloaded_ids(rows) -> list:
+    return [row["id"] for row in rows if row.get("content_offloaded")]
+
+
+def _fill(rows, bodies):
+    for row in rows:
+        if row.get("content_offloaded"):
+            row["content"] = bodies[row["id"]]
+    return rows
+
+
+def fill_rows(rows):
+    """Put full bodies into values() rows that have id, content and content_offloaded."""
+    return _fill(rows, load_bodies(_offloaded_ids(rows)))
+
+
+async def afill_rows(rows):
+    return _fill(rows, await aload_bodies(_offloaded_ids(rows)))
+
+
+def load_content(note) -> str:
+    """note.content, after replacing a loaded head with the full body."""
+    if getattr(note, "_body_loaded", True) or not note.content_offloaded:
+        return note.content
+    note.content = load_bodies([note.pk])[note.pk]
+    note._stored_content = note.content
+    note._body_loaded = True
+    return note.content
+
+
+def save_note(note, save, *args, update_fields=None, **kwargs) -> None:
+    """Note.save(): write the row with a head instead of a large body, and store the body."""
+    content = note.__dict__.get("content")
+    if content is None or (update_fields is not None and "content" not in update_fields):
+        save(*args, update_fields=update_fields, **kwargs)
+        return
+    was_offloaded = note.content_offloaded
+    changed = content is not getattr(note, "_stored_content", None)
+    offload = is_large(content) if changed else was_offloaded
+    if not (offload or was_offloaded):
+        save(*args, update_fields=update_fields, **kwargs)
+        mark_content_loaded(note)
+        return
+    if update_fields is not None:
+        update_fields = {*update_fields, "content_offloaded"}
+    note.content_offloaded = offload
+    note.content = content[:head_chars()] if offload else content
+    try:
+        with transaction.atomic():
+            save(*args, update_fields=update_fields, **kwargs)
+            if changed:
+                write_bodies({note.pk: content if offload else None})
+    finally:
+        note.content = content
+    note._stored_content = content
+    note._body_loaded = True
+
+
+def split_bodies(notes) -> list:
+    """Before a bulk write: put heads in place of large bodies in notes (flagging them).
+
+    Returns (note, body) pairs, with a None body where a stored one must go,
+    for store_bodies() once the notes are written. Loaded notes must include
+    content_offloaded; those whose content was not reassigned are skipped.
+    """
+    bodies = []
+    for note in notes:
+        if note.content is getattr(note, "_stored_content", None):
+            continue
+        if is_large(note.content):
+            bodies.append((note, note.content))
+            note.content = note.content[:head_chars()]
+            note.content_offloaded = True
+        elif note.content_offloaded:
+            bodies.append((note, None))
+            note.content_offloaded = False
+    return bodies
+
+
+def store_bodies(bodies) -> None:
+    """After a bulk write: store what split_bodies() took out, and restore it on the notes."""
+    write_bodies({note.pk: body for note, body in bodies})
+    for note, body in bodies:
+        if body is not None:
+            note.content = body
+        mark_content_loaded(note)
+        note._body_loaded = True
+
+
+def offload_existing(batch_size: int, inline: bool = False, on_batch=None) -> int:
+    """Move stored notes to match the current threshold, batch_size notes per transaction.
+
+    Long inline bodies are offloaded; with ``inline``, offloaded bodies are
+    moved back into the table instead (before turning the mode off).
+    Rows keep their updated_at. A note written between the batch read and
+    its update is skipped: its own save() already stored its body. Returns
+    the number of notes moved.
+    """
+    if inline:
+        candidates = Note.objects.filter(content_offloaded=True)
+    else:
+        threshold = settings.NOTES_LARGE_CONTENT_THRESHOLD
+        if threshold <= 0:
+            return 0
+        candidates = (
+            Note.objects.filter(content_offloaded=False)
+            .annotate(content_length=Length("content"))
+            .filter(content_length__gt=threshold)
+        )
+    moved, last_id = 0, 0
+    while True:
+        with transaction.atomic():
+            notes = list(
+                candidates.filter(pk__gt=last_id)
+                .order_by("pk")
+                .only("id", "content", "content_offloaded", "updated_at")[:batch_size]
+            )
+            if not notes:
+                return moved
+            inline_bodies = load_bodies([note.pk for note in notes]) if inline else {}
+            bodies = {}
+            for note in notes:
+                if inline:
+                    content, offloaded = inline_bodies[note.pk], False
+                else:
+                    content, offloaded = note.content[:head_chars()], True
+                # Only if unchanged since read; the UPDATE holds the row until commit.
+                if Note.objects.filter(
+                    pk=note.pk, updated_at=note.updated_at, content_offloaded=note.content_offloaded
+                ).update(content=content, content_offloaded=offloaded):
+                    bodies[note.pk] = None if inline else note.content
+            write_bodies(bodies)
+        moved += len(bodies)
+        last_id = notes[-1].pk
+        if on_batch is not None:
+            on_batch(moved)
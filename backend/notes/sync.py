@@ -0,0 +1,127 @@
+"""Delta sync: note changes and deletions since an opaque server cursor."""
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from notes.models import NoteTombstone
+
+
+class CursorExpired(Exception):
+    """The cursor predates the retained deletion log; the client must resync fully."""
+
+
+@dataclass(frozen=True)
+class SyncPage:
+    """Where a capped sync stopped: its window (start, until] and the last (updated_at, id) sent."""
+
+    start: datetime  # None for a full sync
+    until: datetime
+    updated_at: datetime
+    note_id: int
+
+
+def _encode(text: str) -> str:
+    return urlsafe_b64encode(text.encode("ascii")).decode("ascii")
+
+
+def _parse_moment(text: str) -> datetime:
+    moment = datetime.fromisoformat(text)
+    if timezone.is_naive(moment):
+        raise ValueError("Cursor is missing a timezone.")
+    return moment
+
+
+def encode_sync_cursor(moment: datetime) -> str:
+    return _encode(moment.isoformat())
+
+
+def encode_page_cursor(page: SyncPage) -> str:
+    start = page.start.isoformat() if page.start else ""
+    return _encode(f"{start}|{page.until.isoformat()}|{page.updated_at.isoformat()}|{page.note_id}")
+
+
+def decode_sync_cursor(cursor: str):
+    """Parse a cursor into a moment or a SyncPage; raises ValueError when malformed."""
+    text = urlsafe_b64decode(cursor.encode("ascii")).decode("ascii")
+    if "|" not in text:
+        return _parse_moment(text)
+    start, until, updated_at, note_id = text.split("|")
+    return SyncPage(
+        _parse_moment(start) if start else None,
+        _parse_moment(until),
+        _parse_moment(updated_at),
+        int(note_id),
+    )
+
+
+def record_tombstones(user_id, note_ids) -> None:
+    """Log deleted note ids for user_id in a single INSERT."""
+    NoteTombstone.objects.bulk_create(
+        [NoteTombstone(user_id=user_id, note_id=note_id) for note_id in note_ids]
+    )
+
+
+def _position(row):
+    if isinstance(row, dict):
+        return row["updated_at"], row["id"]
+    return row.updated_at, row.pk
+
+
+def changes_since(user, notes_queryset, since, limit=None):
+    """Return (changed notes, deleted note ids, new cursor, has_more) for user.
+
+    ``since`` is a decoded cursor: None for a full sync, a moment, or a
+    SyncPage. Rows are re-sent from a short overlap window before a moment
+    so writes whose timestamp was taken just before a previous sync
+    committed are not missed; clients apply changes idempotently by id.
+
+    With ``limit``, at most that many notes (a list of the queryset's rows,
+    which must have id and updated_at) are returned. When more are left,
+    has_more is set and the cursor is a page cursor resuming after the last
+    row, still bounded by the first page's window; deletions all come with
+    the first page. The last page returns a regular cursor.
+    """
+    if isinstance(since, SyncPage):
+        start, until, deleted = since.start, since.until, []
+        notes_queryset = notes_queryset.filter(
+            Q(updated_at__gt=since.updated_at) | Q(updated_at=since.updated_at, id__gt=since.note_id)
+        )
+    else:
+        until = timezone.now()
+        if since is None:
+            start, deleted = None, []
+        else:
+            horizon = until - timedelta(days=settings.NOTES_TOMBSTONE_RETENTION_DAYS)
+            if since < horizon:
+                raise CursorExpired()
+            start = since - timedelta(seconds=settings.NOTES_SYNC_OVERLAP_SECONDS)
+            deleted = list(
+                NoteTombstone.objects.filter(user=user, deleted_at__gt=start, deleted_at__lte=until)
+                .order_by("deleted_at", "id")
+                .values_list("note_id", flat=True)
+            )
+
+    notes = notes_queryset.filter(updated_at__lte=until)
+    if start is not None:
+        notes = notes.filter(updated_at__gt=start)
+    notes = notes.order_by("updated_at", "id")
+    if not limit:
+        return notes, deleted, encode_sync_cursor(until), False
+
+    notes = list(notes[:limit + 1])
+    if len(notes) <= limit:
+        return notes, deleted, encode_sync_cursor(until), False
+    del notes[limit:]
+    updated_at, note_id = _position(notes[-1])
+    return notes, deleted, encode_page_cursor(SyncPage(start, until, updated_at, note_id)), True
+
+
+def prune_tombstones(older_than: datetime) -> int:
+    """Delete tombstones logged before older_than; returns the number removed."""
+    deleted, _ = NoteTombstone.objects.filter(deleted_at__lt=older_than).delete()
+    return deleted
@@ -0,0 +1,101 @@
+"""Tests for the async notes views (settings.API_ASYNC_VIEWS)."""
+
+import pytest
+from django.urls import resolve
+
+from conftest import create_category, create_note, login
+from notes.models import NoteTombstone
+from notes.views import AsyncNoteDetailView, AsyncNoteListCreateView
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("async_views")
+class TestAsyncNotesViews:
+    def test_setting_routes_to_async_views(self):
+        assert resolve("/api/notes/").func.view_class is AsyncNoteListCreateView
+        assert resolve("/api/notes/1/").func.view_class is AsyncNoteDetailView
+        assert AsyncNoteListCreateView.view_is_async
+
+    def test_requires_authentication(self, api_client):
+        response = api_client.get("/api/notes/")
+        assert response.status_code == 401
+        assert "WWW-Authenticate" in response.headers
+
+    def test_list_paginates_filters_and_trims_content(self, api_client, user1, user2, user_password):
+        cat1 = create_category(user1, "C1", "#F00")
+        cat2 = create_category(user1, "C2", "#0F0")
+        for i in range(3):
+            create_note(user1, cat1, f"N{i}", "x" * 500)
+        create_note(user1, cat2, "Other", "")
+        create_note(user2, create_category(user2, "C", "#00F"), "Theirs", "")
+        login(api_client, user1.email, user_password)
+
+        first = api_client.get(f"/api/notes/?category={cat1.id}&page_size=2").json()
+        assert [n["title"] for n in first["results"]] == ["N2", "N1"]
+        assert len(first["results"][0]["content_preview"]) == 200
+        assert "content" not in first["results"][0]
+        second = api_client.get(first["next"]).json()
+        assert [n["title"] for n in second["results"]] == ["N0"]
+        assert second["next"] is None and second["previous"]
+
+        sparse = api_client.get("/api/notes/?fields=id,title").json()
+        assert set(sparse["results"][0]) == {"id", "title"}
+        assert api_client.get("/api/notes/?category=abc").status_code == 400
+        assert api_client.get("/api/notes/?fields=nope").status_code == 400
+
+    def test_list_matches_sync_view_and_shares_its_cache(
+        self, auth_client, user1, settings, django_assert_num_queries
+    ):
+        create_note(user1, create_category(user1, "C", "#F00"), "Cached", "body")
+        settings.API_CACHE_ENABLED = True
+        first = auth_client.get("/api/notes/")
+        # Versions for the ETag are one query; the cached page needs no more.
+        with django_assert_num_queries(1):
+            second = auth_client.get("/api/notes/")
+        assert first.json() == second.json()
+        assert first["ETag"] == second["ETag"]
+
+    def test_list_returns_304_when_etag_matches(self, auth_client, user1):
+        create_note(user1, create_category(user1, "C", "#F00"), "A", "")
+        etag = auth_client.get("/api/notes/")["ETag"]
+        response = auth_client.get("/api/notes/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_create_uses_default_or_owned_category(self, api_client, user1, user2, user_password):
+        default = create_category(user1, "Default", "#F00")
+        theirs = create_category(user2, "Theirs", "#0F0")
+        login(api_client, user1.email, user_password)
+
+        response = api_client.post("/api/notes/", {"title": "T"}, format="json")
+        assert response.status_code == 201
+        assert response.json()["category"]["id"] == default.id
+        response = api_client.post("/api/notes/", {"category_id": theirs.id}, format="json")
+        assert response.status_code == 400
+        assert "category_id" in response.json()
+
+    def test_detail_get_patch_delete(self, auth_client, user1, user2):
+        cat = create_category(user1, "C", "#F00")
+        note = create_note(user1, cat, "Old", "full content")
+        url = f"/api/notes/{note.id}/"
+
+        response = auth_client.get(url)
+        assert response.json()["content"] == "full content"
+        etag = response["ETag"]
+        assert auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        stale = auth_client.patch(url, {"title": "X"}, format="json", HTTP_IF_MATCH='"stale"')
+        assert stale.status_code == 412
+        response = auth_client.patch(url, {"title": "New"}, format="json", HTTP_IF_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()["title"] == "New"
+        assert response["ETag"] != etag
+
+        assert auth_client.delete(url).status_code == 204
+        assert auth_client.get(url).status_code == 404
+        assert NoteTombstone.objects.filter(user=user1, note_id=note.id).exists()
+
+    def test_other_users_note_is_404(self, auth_client, user2):
+        note = create_note(user2, create_category(user2, "C", "#F00"), "Theirs", "")
+        assert auth_client.get(f"/api/notes/{note.id}/").status_code == 404
+        assert auth_client.patch(f"/api/notes/{note.id}/", {}, format="json").status_code == 404
+        assert auth_client.delete(f"/api/notes/{note.id}/").status_code == 404
@@ -0,0 +1,144 @@
+"""Tests for changed-column note updates and X-Write-Sequence (notes.views.update_locked_note)."""
+
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import create_category, create_note
+from core import metrics
+from notes.models import Note, NoteRevision
+
+
+def _patch(client, note, data, sequence=None, **headers):
+    if sequence is not None:
+        headers["HTTP_X_WRITE_SEQUENCE"] = str(sequence)
+    return client.patch(f"/api/notes/{note.pk}/", data, format="json", **headers)
+
+
+def _updates(captured):
+    return [q["sql"] for q in captured.captured_queries if q["sql"].startswith("UPDATE")]
+
+
+@pytest.fixture
+def note(user1):
+    return create_note(user1, create_category(user1, "Work"), "Title", "Body")
+
+
+@pytest.mark.django_db
+class TestChangedColumns:
+    def test_only_changed_columns_are_written(self, auth_client, note):
+        with CaptureQueriesContext(connection) as captured:
+            response = _patch(auth_client, note, {"title": "New", "content": "Body"})
+        assert response.status_code == 200
+        [update] = [sql for sql in _updates(captured) if '"notes_note"' in sql.split("SET")[0]]
+        assert '"title"' in update and '"updated_at"' in update
+        assert '"content"' not in update and '"write_sequence"' not in update
+        note.refresh_from_db()
+        assert (note.title, note.content) == ("New", "Body")
+
+    def test_unchanged_update_writes_nothing(self, auth_client, user1, note):
+        etag = auth_client.get(f"/api/notes/{note.pk}/")["ETag"]
+        with CaptureQueriesContext(connection) as captured:
+            response = _patch(
+                auth_client, note, {"title": "Title", "content": "Body", "category_id": note.category_id}
+            )
+        assert response.status_code == 200
+        assert response["ETag"] == etag
+        assert response.json()["title"] == "Title"
+        assert _updates(captured) == []
+        assert not NoteRevision.objects.exists()
+        assert metrics.snapshot("notes.update.")["notes.update.unchanged"] == 1
+
+    def test_category_move_still_updates_counts(self, auth_client, user1, note):
+        other = create_category(user1, "Other")
+        response = _patch(auth_client, note, {"category_id": other.pk})
+        assert response.json()["category"]["id"] == other.pk
+        counts = dict(user1.categories.values_list("name", "notes_count"))
+        assert counts == {"Work": 0, "Other": 1}
+
+    @pytest.mark.usefixtures("async_views")
+    def test_async_view(self, auth_client, note):
+        etag = auth_client.get(f"/api/notes/{note.pk}/")["ETag"]
+        response = _patch(auth_client, note, {"content": "Body"})
+        assert response.status_code == 200
+        assert response["ETag"] == etag
+
+
+@pytest.mark.django_db
+class TestWriteSequence:
+    def test_older_and_repeated_sequences_are_dropped(self, auth_client, note):
+        response = _patch(auth_client, note, {"content": "third"}, sequence=3)
+        assert response["X-Write-Sequence"] == "3"
+        for sequence, content in ((2, "second"), (3, "third, resent with other text")):
+            stale = _patch(auth_client, note, {"content": content}, sequence=sequence)
+            assert stale.status_code == 200
+            assert stale.json()["content"] == "third"
+            assert stale["X-Write-Sequence"] == "3"
+            assert stale["ETag"] == response["ETag"]
+        note.refresh_from_db()
+        assert note.content == "third"
+        assert NoteRevision.objects.filter(note=note).count() == 2
+        assert metrics.snapshot("notes.update.")["notes.update.stale"] == 2
+
+    def test_stale_write_is_dropped_before_validation(self, auth_client, note):
+        _patch(auth_client, note, {"content": "new"}, sequence=5)
+        response = _patch(auth_client, note, {"category_id": 999999}, sequence=4)
+        assert response.status_code == 200
+
+    def test_unchanged_write_stores_its_sequence_without_a_new_etag(self, auth_client, note):
+        first = _patch(auth_client, note, {"content": "draft"}, sequence=1)
+        with CaptureQueriesContext(connection) as captured:
+            same = _patch(auth_client, note, {"content": "draft"}, sequence=2)
+        assert same["ETag"] == first["ETag"]
+        [update] = _updates(captured)
+        assert '"updated_at"' not in update
+        # The save sent before it must not overwrite the text now.
+        assert _patch(auth_client, note, {"content": "older"}, sequence=1).json()["content"] == "draft"
+        assert Note.objects.get(pk=note.pk).write_sequence == 2
+
+    def test_writes_without_a_sequence_are_always_applied(self, auth_client, note):
+        _patch(auth_client, note, {"content": "sequenced"}, sequence=10)
+        response = _patch(auth_client, note, {"content": "plain"})
+        assert response.json()["content"] == "plain"
+        assert response["X-Write-Sequence"] == "10"
+
+    @pytest.mark.parametrize("value", ["abc", "-1", "1.5", str(2**63)])
+    def test_invalid_sequence_is_400(self, auth_client, note, value):
+        response = auth_client.patch(
+            f"/api/notes/{note.pk}/", {"content": "x"}, format="json", HTTP_X_WRITE_SEQUENCE=value
+        )
+        assert response.status_code == 400
+        assert "X-Write-Sequence" in response.json()
+
+    def test_disabled(self, settings, auth_client, note):
+        settings.NOTES_WRITE_SEQUENCES_ENABLED = False
+        _patch(auth_client, note, {"content": "new"}, sequence=5)
+        response = _patch(auth_client, note, {"content": "old"}, sequence=4)
+        assert response.json()["content"] == "old"
+        assert not response.has_header("X-Write-Sequence")
+
+    def test_if_match_is_checked_first(self, auth_client, note):
+        response = _patch(auth_client, note, {"content": "x"}, sequence=1, HTTP_IF_MATCH='"stale"')
+        assert response.status_code == 412
+
+    @pytest.mark.usefixtures("async_views")
+    def test_async_view(self, auth_client, note):
+        _patch(auth_client, note, {"content": "new"}, sequence=2)
+        response = _patch(auth_client, note, {"content": "old"}, sequence=1)
+        assert response.json()["content"] == "new"
+        assert response["X-Write-Sequence"] == "2"
+
+
+@pytest.mark.django_db
+def test_benchmark_autosave_command():
+    out = StringIO()
+    call_command("benchmark_autosave", "--saves", "30", "--reorder", "0.3", stdout=out)
+    data = json.loads(out.getvalue())
+    assert data["saves"] == 30
+    assert data["sequenced"]["final_content_is_latest"]
+    assert data["sequenced"]["write_statements"]["INSERT"] <= data["plain"]["write_statements"]["INSERT"]
+    assert not Note.objects.exists()
@@ -0,0 +1,195 @@
+"""Tests for live updates: the pub/sub fan-out, change events and the SSE stream."""
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import AsyncClient
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from conftest import create_category, create_note
+from core.pubsub import LocalBroker, get_broker
+from notes.events import sse_frame
+from notes.models import Note, NoteTombstone
+from notes.signals import deferred_note_changes
+from notes.sync import encode_sync_cursor
+
+
+def _parse(frame: str) -> dict:
+    return dict(line.split(": ", 1) for line in frame.strip().splitlines() if ": " in line)
+
+
+class TestLocalBroker:
+    def test_delivers_to_channel_subscribers_only(self):
+        broker = LocalBroker()
+
+        async def run():
+            mine, other = broker.subscribe("1"), broker.subscribe("2")
+            await sync_to_async(broker.publish)("1", "hello")
+            assert await mine.get(1) == "hello"
+            with pytest.raises(TimeoutError):
+                await other.get(0.01)
+            mine.close()
+            other.close()
+
+        async_to_sync(run)()
+        assert broker.subscriber_count() == 0
+
+    def test_slow_subscriber_is_flagged_instead_of_growing(self):
+        broker = LocalBroker()
+
+        async def run():
+            subscription = broker.subscribe("1", maxsize=1)
+            broker.publish("1", "a")
+            broker.publish("1", "b")
+            await asyncio.sleep(0)
+            assert subscription.overflowed
+            assert await subscription.get(1) == "a"
+
+        async_to_sync(run)()
+
+
+@pytest.mark.django_db
+class TestChangeEvents:
+    def _published(self, django_capture_on_commit_callbacks, action):
+        """Frames published to every channel while action runs and commits."""
+        broker = get_broker()
+        published = []
+        original = broker.publish
+        broker.publish = lambda channel, message: published.append((channel, _parse(message)))
+        try:
+            with django_capture_on_commit_callbacks(execute=True):
+                action()
+        finally:
+            broker.publish = original
+        return published
+
+    def test_note_and_category_writes_publish_events(self, user1, django_capture_on_commit_callbacks):
+        state = {}
+
+        def action():
+            state["category"] = create_category(user1, "C", "#F00")
+            note = state["note"] = create_note(user1, state["category"], "A", "")
+            note.title = "B"
+            note.save()
+            note.delete()
+
+        published = self._published(django_capture_on_commit_callbacks, action)
+
+        assert [(channel, frame["event"]) for channel, frame in published] == [
+            (str(user1.pk), "category.created"),
+            (str(user1.pk), "note.created"),
+            (str(user1.pk), "note.updated"),
+            (str(user1.pk), "note.deleted"),
+        ]
+        assert all(frame["id"] for _, frame in published)
+        assert f'"id":{state["category"].pk}' in published[0][1]["data"]
+
+    def test_deferred_batches_publish_one_event(self, user1, django_capture_on_commit_callbacks):
+        category = create_category(user1, "C", "#F00")
+
+        def action():
+            with deferred_note_changes():
+                for i in range(3):
+                    create_note(user1, category, f"N{i}", "")
+
+        published = self._published(django_capture_on_commit_callbacks, action)
+        assert [frame["event"] for _, frame in published] == ["notes.changed"]
+
+    def test_nothing_is_published_before_commit(self, user1, django_capture_on_commit_callbacks):
+        published = []
+        broker = get_broker()
+        broker.publish, original = (lambda channel, message: published.append(message)), broker.publish
+        try:
+            with django_capture_on_commit_callbacks() as callbacks:
+                create_category(user1, "C", "#F00")
+            assert published == []
+            for callback in callbacks:
+                callback()
+        finally:
+            broker.publish = original
+        assert len(published) == 1
+
+
+@pytest.mark.django_db
+class TestEventsView:
+    def _stream(self, user, settings, headers=None, publish=None, frames=3):
+        """Open the stream over ASGI and return its first frames."""
+        settings.NOTES_EVENTS_MAX_AGE = 1
+
+        async def run():
+            client = AsyncClient()
+            client.cookies["access_token"] = str(RefreshToken.for_user(user).access_token)
+            response = await client.get("/api/notes/events/", headers=headers or {})
+            chunks = response.streaming_content.__aiter__()
+            received = [(await anext(chunks)).decode()]
+            if publish:
+                get_broker().publish(str(user.pk), publish)
+            while len(received) < frames:
+                try:
+                    received.append((await anext(chunks)).decode())
+                except StopAsyncIteration:
+                    break
+            return response, received
+
+        return async_to_sync(run)()
+
+    def test_streams_published_events(self, user1, settings):
+        frame = sse_frame("note.created", {"id": 1}, "cursor")
+        response, received = self._stream(user1, settings, publish=frame, frames=2)
+        assert response["Content-Type"] == "text/event-stream"
+        assert response["Cache-Control"] == "no-cache"
+        assert received[0].startswith("retry: ")
+        assert received[1] == frame
+
+    def test_sends_keep_alives_while_idle(self, user1, settings):
+        settings.NOTES_EVENTS_HEARTBEAT = 0.01
+        _, received = self._stream(user1, settings, frames=2)
+        assert received[1] == ": keep-alive\n\n"
+
+    def test_replays_changes_since_last_event_id(self, user1, settings):
+        since = encode_sync_cursor(timezone.now() - timedelta(minutes=1))
+        note = create_note(user1, create_category(user1, "C", "#F00"), "A", "")
+        NoteTombstone.objects.create(user=user1, note_id=999)
+
+        _, received = self._stream(user1, settings, headers={"Last-Event-ID": since}, frames=3)
+
+        updated, deleted = map(_parse, received[1:3])
+        assert updated["event"] == "note.updated" and f'"id":{note.pk}' in updated["data"]
+        assert deleted["event"] == "note.deleted" and deleted["data"] == '{"id":999}'
+        assert "id" in deleted
+
+    def test_too_many_changes_ask_for_resync(self, user1, settings):
+        settings.NOTES_CHANGES_MAX = 1
+        since = encode_sync_cursor(timezone.now() - timedelta(minutes=1))
+        category = create_category(user1, "C", "#F00")
+        create_note(user1, category, "A", "")
+        create_note(user1, category, "B", "")
+        _, received = self._stream(user1, settings, headers={"Last-Event-ID": since}, frames=2)
+        assert _parse(received[1]) == {"event": "resync", "data": '{"reason":"too_many_changes"}'}
+
+    def test_expired_cursor_asks_for_resync(self, user1, settings):
+        since = encode_sync_cursor(timezone.now() - timedelta(days=365))
+        _, received = self._stream(user1, settings, headers={"Last-Event-ID": since}, frames=2)
+        assert _parse(received[1])["event"] == "resync"
+
+    def test_requires_authentication_and_a_valid_cursor(self, user1):
+        async def run():
+            client = AsyncClient()
+            anonymous = await client.get("/api/notes/events/")
+            client.cookies["access_token"] = str(RefreshToken.for_user(user1).access_token)
+            invalid = await client.get("/api/notes/events/?since=nope")
+            return anonymous.status_code, invalid.status_code
+
+        assert async_to_sync(run)() == (401, 400)
+
+    def test_wsgi_clients_are_told_to_poll(self, auth_client):
+        response = auth_client.get("/api/notes/events/")
+        assert response.status_code == 501
+        assert "/api/notes/changes/" in response.json()["detail"]
+
+    def test_stream_unsubscribes_when_it_ends(self, user1, settings):
+        self._stream(user1, settings, frames=5)
+        assert get_broker().subscriber_count() == 0
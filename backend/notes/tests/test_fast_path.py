@@ -0,0 +1,99 @@
+"""Tests that the values()-row read path matches the serializers byte for byte."""
+
+import json
+from collections import OrderedDict
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from categories.serializers import CategorySerializer
+from categories.views import categories_queryset
+from conftest import create_category, create_note
+from notes.models import Note
+from notes.serializers import NoteListSerializer, NoteSerializer
+from notes.views import NoteListRepresentationMixin
+
+TRICKY = 'Quotes " and \\ slashes, tab\t, separators \u2028\u2029, é, 日本, emoji 🎉, nul \x00'
+
+
+def expected_list(body: bytes, notes, fields=None) -> bytes:
+    """The bytes the serializer path renders for the page in body (first page if sparse)."""
+    fields = fields or list(NoteListSerializer.Meta.fields)
+    page = json.loads(body)
+    qs = NoteListRepresentationMixin().restrict_columns(notes, fields)
+    instances = list(qs.order_by("-updated_at", "-id"))
+    if "id" in fields:
+        ids = [item["id"] for item in page["results"]]
+        instances = [note for note in instances if note.pk in ids]
+    data = OrderedDict(
+        [
+            ("next", page["next"]),
+            ("previous", page["previous"]),
+            ("results", NoteListSerializer(instances, many=True, fields=fields).data),
+        ]
+    )
+    return JSONRenderer().render(data)
+
+
+@pytest.fixture
+def notes(user1, user2):
+    cat = create_category(user1, TRICKY, "#ABCDEF")
+    other = create_category(user1, "Other", "#123456")
+    for i in range(5):
+        create_note(user1, cat if i % 2 else other, f"{TRICKY} {i}", TRICKY * 20)
+    create_note(user1, cat, "", "")
+    create_note(user2, create_category(user2, "Theirs", "#000"), "Theirs", "")
+    return Note.objects.filter(user=user1)
+
+
+@pytest.mark.django_db
+class TestFastPathMatchesSerializers:
+    def test_list_pages(self, auth_client, notes):
+        response = auth_client.get("/api/notes/?page_size=4")
+        assert response.content == expected_list(response.content, notes)
+        response = auth_client.get(json.loads(response.content)["next"])
+        assert response.content == expected_list(response.content, notes)
+        assert json.loads(response.content)["previous"]
+
+    @pytest.mark.parametrize("fields", ["id", "title,category", "updated_at,content_preview"])
+    def test_sparse_fieldsets(self, auth_client, notes, fields):
+        response = auth_client.get(f"/api/notes/?fields={fields}")
+        assert response.content == expected_list(response.content, notes, fields.split(","))
+
+    def test_detail(self, auth_client, notes):
+        note = notes.first()
+        response = auth_client.get(f"/api/notes/{note.pk}/")
+        assert response.content == JSONRenderer().render(NoteSerializer(note).data)
+        theirs = Note.objects.exclude(user=note.user).get()
+        assert auth_client.get(f"/api/notes/{theirs.pk}/").status_code == 404
+
+    def test_changes(self, auth_client, notes):
+        response = auth_client.get("/api/notes/changes/")
+        body = json.loads(response.content)
+        fields = list(NoteListSerializer.Meta.fields)
+        by_id = {n.pk: n for n in NoteListRepresentationMixin().restrict_columns(notes, fields)}
+        assert len(body["notes"]) == len(by_id)
+        expected = NoteListSerializer([by_id[n["id"]] for n in body["notes"]], many=True).data
+        assert JSONRenderer().render(body["notes"]) == JSONRenderer().render(expected)
+
+    def test_search(self, auth_client, notes):
+        response = auth_client.get("/api/notes/search/?q=Quotes&fields=id,title")
+        assert response.status_code == 200
+        results = json.loads(response.content)["results"]
+        assert results and all(set(item) == {"id", "title"} for item in results)
+
+    def test_categories(self, auth_client, user1, notes):
+        response = auth_client.get("/api/categories/")
+        expected = CategorySerializer(categories_queryset(user1), many=True).data
+        assert response.content == JSONRenderer().render(expected)
+
+    @pytest.mark.usefixtures("async_views")
+    def test_async_views(self, auth_client, user1, notes):
+        response = auth_client.get("/api/notes/?page_size=4")
+        assert response.content == expected_list(response.content, notes)
+        note = notes.first()
+        response = auth_client.get(f"/api/notes/{note.pk}/")
+        assert response.content == JSONRenderer().render(NoteSerializer(note).data)
+        response = auth_client.get("/api/categories/")
+        expected = CategorySerializer(categories_queryset(user1), many=True).data
+        assert response.content == JSONRenderer().render(expected)
@@ -1,8 +1,19 @@
 """Tests for notes API."""
 
+import gzip
+import json
+from io import BytesIO, StringIO
+
 import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.core.management.base import CommandError
 
+from categories.models import Category
 from conftest import create_category, create_note, login
+from notes.export import aiter_export, export_queryset, iter_export
+from notes.importer import NoteImporter, iter_json_array
+from notes.models import Note
 
 
 @pytest.mark.django_db
@@ -58,7 +69,7 @@ class TestNotesList:
         login(api_client, "user1@example.com", user_password)
         response = api_client.get("/api/notes/")
         assert response.status_code == 200
-        titles = [n["title"] for n in response.data]
+        titles = [n["title"] for n in response.data["results"]]
         assert "Note1" in titles
         assert "Note2" not in titles
 
@@ -73,7 +84,7 @@ class TestNotesList:
 
         response = auth_client.get(f"/api/notes/?category={cat2.id}")
         assert response.status_code == 200
-        titles = [n["title"] for n in response.data]
+        titles = [n["title"] for n in response.data["results"]]
         assert "N2" in titles and "N3" in titles
         assert "N1" not in titles
 
@@ -146,3 +157,620 @@ class TestNoteDelete:
         response = auth_client.delete(f"/api/notes/{note_id}/")
         assert response.status_code == 204
         assert not Note.objects.filter(pk=note_id).exists()
+
+
+@pytest.mark.django_db
+class TestNotesPagination:
+    def _make_notes(self, user, category, count):
+        from django.utils import timezone
+
+        from notes.models import Note
+
+        notes = [create_note(user, category, f"N{i}", "") for i in range(count)]
+        # Give several notes the same timestamp so the id tiebreak is exercised.
+        same = timezone.now()
+        Note.objects.filter(pk__in=[n.pk for n in notes[:4]]).update(updated_at=same)
+        return list(
+            Note.objects.filter(user=user).order_by("-updated_at", "-id").values_list("id", flat=True)
+        )
+
+    def test_pages_follow_next_cursor_without_gaps_or_duplicates(self, auth_client, user1):
+        cat = create_category(user1, "C", "#F00")
+        expected = self._make_notes(user1, cat, 7)
+
+        seen = []
+        url = "/api/notes/?page_size=3"
+        while url:
+            response = auth_client.get(url)
+            assert response.status_code == 200
+            assert len(response.data["results"]) <= 3
+            seen.extend(n["id"] for n in response.data["results"])
+            url = response.data["next"]
+        assert seen == expected
+
+    def test_previous_cursor_returns_prior_page(self, auth_client, user1):
+        cat = create_category(user1, "C", "#F00")
+        expected = self._make_notes(user1, cat, 7)
+
+        first = auth_client.get("/api/notes/?page_size=3")
+        assert first.data["previous"] is None
+        second = auth_client.get(first.data["next"])
+        assert [n["id"] for n in second.data["results"]] == expected[3:6]
+        back = auth_client.get(second.data["previous"])
+        assert [n["id"] for n in back.data["results"]] == expected[:3]
+        assert back.data["previous"] is None
+        assert back.data["next"] is not None
+
+    def test_cursor_pagination_respects_category_filter(self, auth_client, user1):
+        cat1 = create_category(user1, "C1", "#F00")
+        cat2 = create_category(user1, "C2", "#0F0")
+        for i in range(4):
+            create_note(user1, cat1, f"A{i}", "")
+            create_note(user1, cat2, f"B{i}", "")
+
+        seen = []
+        url = f"/api/notes/?category={cat2.id}&page_size=3"
+        while url:
+            response = auth_client.get(url)
+            seen.extend(n["title"] for n in response.data["results"])
+            url = response.data["next"]
+        assert sorted(seen) == ["B0", "B1", "B2", "B3"]
+
+    def test_invalid_cursor_returns_404(self, auth_client):
+        response = auth_client.get("/api/notes/?cursor=not-a-cursor")
+        assert response.status_code == 404
+
+
+@pytest.mark.django_db
+class TestNotesListRepresentation:
+    def test_list_returns_bounded_preview_instead_of_content(
+        self, auth_client, user1, settings
+    ):
+        settings.NOTES_PREVIEW_LENGTH = 10
+        cat = create_category(user1, "C", "#F00")
+        create_note(user1, cat, "Long", "abcdefghijklmnopqrstuvwxyz")
+
+        response = auth_client.get("/api/notes/")
+        assert response.status_code == 200
+        note = response.data["results"][0]
+        assert "content" not in note
+        assert note["content_preview"] == "abcdefghij"
+        assert note["category"]["name"] == "C"
+
+    def test_list_query_never_selects_full_content(self, auth_client, user1):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        cat = create_category(user1, "C", "#F00")
+        create_note(user1, cat, "T", "body")
+
+        with CaptureQueriesContext(connection) as ctx:
+            auth_client.get("/api/notes/")
+        note_queries = [q["sql"] for q in ctx.captured_queries if '"notes_note"' in q["sql"]]
+        assert note_queries
+        for sql in note_queries:
+            # content is only ever read through the SUBSTR preview expression.
+            assert sql.count('"notes_note"."content"') == sql.upper().count("SUBSTR(")
+
+    def test_sparse_fieldset_limits_output(self, auth_client, user1):
+        cat = create_category(user1, "C", "#F00")
+        create_note(user1, cat, "T", "body")
+
+        response = auth_client.get("/api/notes/?fields=id,title")
+        assert response.status_code == 200
+        assert set(response.data["results"][0]) == {"id", "title"}
+
+    def test_sparse_fieldset_rejects_unknown_fields(self, auth_client):
+        response = auth_client.get("/api/notes/?fields=id,content")
+        assert response.status_code == 400
+        assert "fields" in response.data
+
+    def test_detail_still_returns_full_content(self, auth_client, user1):
+        cat = create_category(user1, "C", "#F00")
+        note = create_note(user1, cat, "T", "x" * 500)
+
+        response = auth_client.get(f"/api/notes/{note.id}/")
+        assert response.data["content"] == "x" * 500
+
+
+@pytest.mark.django_db
+class TestNotesSearch:
+    def test_search_ranks_title_matches_above_content_matches(self, auth_client, user1):
+        cat = create_category(user1, "C", "#F00")
+        body_hit = create_note(user1, cat, "Groceries", "remember the gardening gloves")
+        title_hit = create_note(user1, cat, "Gardening plan", "tomatoes and basil")
+        create_note(user1, cat, "Unrelated", "nothing here")
+
+        response = auth_client.get("/api/notes/search?q=gardening")
+        assert response.status_code == 200
+        assert [n["id"] for n in response.data["results"]] == [title_hit.id, body_hit.id]
+        assert "content_preview" in response.data["results"][0]
+
+    def test_search_is_scoped_to_current_user(self, api_client, user1, user2, user_password):
+        cat1 = create_category(user1, "C1", "#F00")
+        cat2 = create_category(user2, "C2", "#0F0")
+        create_note(user1, cat1, "Mine", "shared keyword")
+        create_note(user2, cat2, "Theirs", "shared keyword")
+
+        login(api_client, "user1@example.com", user_password)
+        response = api_client.get("/api/notes/search?q=keyword")
+        assert [n["title"] for n in response.data["results"]] == ["Mine"]
+
+    def test_search_index_follows_updates_and_deletes(self, auth_client, user1):
+        cat = create_category(user1, "C", "#F00")
+        note = create_note(user1, cat, "Draft", "alpha")
+        auth_client.patch(f"/api/notes/{note.id}/", {"content": "omega"}, format="json")
+
+        assert auth_client.get("/api/notes/search?q=alpha").data["results"] == []
+        assert len(auth_client.get("/api/notes/search?q=omega").data["results"]) == 1
+        auth_client.delete(f"/api/notes/{note.id}/")
+        assert auth_client.get("/api/notes/search?q=omega").data["results"] == []
+
+    def test_search_paginates_with_offset_links(self, auth_client, user1):
+        cat = create_category(user1, "C", "#F00")
+        for i in range(5):
+            create_note(user1, cat, f"Topic {i}", "searchable")
+
+        first = auth_client.get("/api/notes/search/?q=searchable&page_size=2")
+        assert len(first.data["results"]) == 2
+        assert first.data["previous"] is None
+        second = auth_client.get(first.data["next"])
+        third = auth_client.get(second.data["next"])
+        ids = [n["id"] for page in (first, second, third) for n in page.data["results"]]
+        assert len(set(ids)) == 5
+        assert third.data["next"] is None
+        assert third.data["previous"] is not None
+
+    def test_search_rejects_offsets_beyond_the_maximum(self, auth_client, user1):
+        create_note(user1, create_category(user1, "C", "#F00"), "Topic", "searchable")
+        response = auth_client.get("/api/notes/search/?q=searchable&offset=99999999999999999999999")
+        assert response.status_code == 400
+        assert "offset" in response.data
+        assert auth_client.get("/api/notes/search/?q=searchable&offset=10001").status_code == 400
+        at_limit = auth_client.get("/api/notes/search/?q=searchable&offset=10000")
+        assert at_limit.status_code == 200 and at_limit.data["results"] == []
+        assert auth_client.get("/api/notes/search/?q=searchable&offset=²").status_code == 200
+
+    def test_search_syntax_characters_are_treated_as_text(self, auth_client, user1):
+        cat = create_category(user1, "C", "#F00")
+        create_note(user1, cat, "Quote", 'say "hello" world')
+        response = auth_client.get('/api/notes/search?q="hello" (world*')
+        assert response.status_code == 200
+        assert len(response.data["results"]) == 1
+
+    def test_search_requires_query(self, auth_client):
+        response = auth_client.get("/api/notes/search?q=")
+        assert response.status_code == 400
+        assert "q" in response.data
+
+
+@pytest.mark.django_db
+class TestConditionalRequests:
+    def test_list_returns_304_when_etag_matches(self, auth_client, user1):
+        cat = create_category(user1, "C", "#F00")
+        create_note(user1, cat, "N", "")
+
+        first = auth_client.get("/api/notes/")
+        etag = first["ETag"]
+        assert etag.startswith('"')
+        assert first.has_header("Last-Modified")
+
+        second = auth_client.get("/api/notes/", HTTP_IF_NONE_MATCH=etag)
+        assert second.status_code == 304
+        assert second.content == b""
+
+    def test_list_etag_changes_after_create_and_delete(self, auth_client, user1):
+        cat = create_category(user1, "C", "#F00")
+        note = create_note(user1, cat, "N", "")
+        etag = auth_client.get("/api/notes/")["ETag"]
+
+        create_note(user1, cat, "M", "")
+        after_create = auth_client.get("/api/notes/", HTTP_IF_NONE_MATCH=etag)
+        assert after_create.status_code == 200
+
+        etag = after_create["ETag"]
+        note.delete()
+        after_delete = auth_client.get("/api/notes/", HTTP_IF_NONE_MATCH=etag)
+        assert after_delete.status_code == 200
+
+    def test_list_etag_differs_per_query(self, auth_client, user1):
+        cat = create_category(user1, "C", "#F00")
+        create_note(user1, cat, "N", "")
+        all_etag = auth_client.get("/api/notes/")["ETag"]
+        filtered = auth_client.get(f"/api/notes/?category={cat.id}", HTTP_IF_NONE_MATCH=all_etag)
+        assert filtered.status_code == 200
+
+    def test_detail_returns_304_and_patch_honours_if_match(self, auth_client, user1):
+        cat = create_category(user1, "C", "#F00")
+        note = create_note(user1, cat, "N", "")
+
+        etag = auth_client.get(f"/api/notes/{note.id}/")["ETag"]
+        assert auth_client.get(f"/api/notes/{note.id}/", HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        ok = auth_client.patch(
+            f"/api/notes/{note.id}/", {"title": "A"}, format="json", HTTP_IF_MATCH=etag
+        )
+        assert ok.status_code == 200
+        assert ok["ETag"] != etag
+
+        stale = auth_client.patch(
+            f"/api/notes/{note.id}/", {"title": "B"}, format="json", HTTP_IF_MATCH=etag
+        )
+        assert stale.status_code == 412
+        note.refresh_from_db()
+        assert note.title == "A"
+
+        fresh = auth_client.patch(
+            f"/api/notes/{note.id}/", {"title": "C"}, format="json", HTTP_IF_MATCH=ok["ETag"]
+        )
+        assert fresh.status_code == 200
+
+    def test_delete_with_stale_if_match_is_rejected(self, auth_client, user1):
+        cat = create_category(user1, "C", "#F00")
+        note = create_note(user1, cat, "N", "")
+        response = auth_client.delete(f"/api/notes/{note.id}/", HTTP_IF_MATCH='"stale"')
+        assert response.status_code == 412
+
+
+@pytest.mark.django_db
+class TestNotesChanges:
+    def test_changes_without_since_returns_everything_and_a_cursor(self, auth_client, user1):
+        cat = create_category(user1, "C", "#F00")
+        create_note(user1, cat, "A", "")
+        create_note(user1, cat, "B", "")
+
+        response = auth_client.get("/api/notes/changes")
+        assert response.status_code == 200
+        assert [n["title"] for n in response.data["notes"]] == ["A", "B"]
+        assert response.data["deleted"] == []
+        assert response.data["cursor"]
+
+    def test_changes_since_cursor_returns_updates_and_tombstones(
+        self, auth_client, user1, settings
+    ):
+        settings.NOTES_SYNC_OVERLAP_SECONDS = 0
+        cat = create_category(user1, "C", "#F00")
+        untouched = create_note(user1, cat, "Untouched", "")
+        edited = create_note(user1, cat, "Edited", "")
+        removed = create_note(user1, cat, "Removed", "")
+        cursor = auth_client.get("/api/notes/changes").data["cursor"]
+
+        auth_client.patch(f"/api/notes/{edited.id}/", {"title": "Edited!"}, format="json")
+        auth_client.delete(f"/api/notes/{removed.id}/")
+        created = auth_client.post("/api/notes/", {"title": "New"}, format="json").data
+
+        response = auth_client.get(f"/api/notes/changes?since={cursor}")
+        ids = [n["id"] for n in response.data["notes"]]
+        assert untouched.id not in ids
+        assert set(ids) == {edited.id, created["id"]}
+        assert response.data["deleted"] == [removed.id]
+
+        again = auth_client.get(f"/api/notes/changes?since={response.data['cursor']}")
+        assert again.data["notes"] == [] and again.data["deleted"] == []
+
+    def test_changes_are_paged_with_has_more(self, auth_client, user1, settings):
+        settings.NOTES_SYNC_OVERLAP_SECONDS = 0
+        cat = create_category(user1, "C", "#F00")
+        notes = [create_note(user1, cat, f"N{i}", "") for i in range(5)]
+        cursor = auth_client.get("/api/notes/changes").data["cursor"]
+        settings.NOTES_CHANGES_MAX = 2
+        for note in notes[1:]:
+            auth_client.patch(f"/api/notes/{note.id}/", {"title": f"{note.title}!"}, format="json")
+        auth_client.delete(f"/api/notes/{notes[0].id}/")
+
+        pages = []
+        while True:
+            page = auth_client.get(f"/api/notes/changes?since={cursor}").data
+            pages.append(([n["id"] for n in page["notes"]], page["deleted"], page["has_more"]))
+            cursor = page["cursor"]
+            if not page["has_more"]:
+                break
+        ids = [note.id for note in notes]
+        assert pages == [(ids[1:3], [ids[0]], True), (ids[3:5], [], False)]
+        assert auth_client.get(f"/api/notes/changes?since={cursor}").data["notes"] == []
+
+    def test_full_sync_is_paged(self, auth_client, user1, settings):
+        settings.NOTES_CHANGES_MAX = 2
+        cat = create_category(user1, "C", "#F00")
+        notes = [create_note(user1, cat, f"N{i}", "") for i in range(3)]
+        Note.objects.update(updated_at=notes[0].updated_at)  # ties are ordered by id
+        first = auth_client.get("/api/notes/changes").data
+        second = auth_client.get(f"/api/notes/changes?since={first['cursor']}").data
+        assert [n["title"] for n in first["notes"]] == ["N0", "N1"] and first["has_more"]
+        assert [n["title"] for n in second["notes"]] == ["N2"] and not second["has_more"]
+
+    def test_changes_rejects_malformed_cursor(self, auth_client):
+        response = auth_client.get("/api/notes/changes?since=garbage")
+        assert response.status_code == 400
+        assert "since" in response.data
+
+    def test_changes_with_expired_cursor_returns_410(self, auth_client):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from notes.sync import encode_sync_cursor
+
+        old = encode_sync_cursor(timezone.now() - timedelta(days=365))
+        response = auth_client.get(f"/api/notes/changes?since={old}")
+        assert response.status_code == 410
+
+    def test_prune_tombstones_command_removes_old_entries(self, user1):
+        from datetime import timedelta
+        from io import StringIO
+
+        from django.core.management import call_command
+        from django.utils import timezone
+
+        from notes.models import NoteTombstone
+        from notes.sync import record_tombstones
+
+        record_tombstones(user1.id, [1, 2])
+        NoteTombstone.objects.filter(note_id=1).update(
+            deleted_at=timezone.now() - timedelta(days=90)
+        )
+        call_command("prune_tombstones", "--days", "30", stdout=StringIO())
+        assert list(NoteTombstone.objects.values_list("note_id", flat=True)) == [2]
+
+
+@pytest.mark.django_db
+class TestNotesBulk:
+    def test_bulk_applies_all_operation_types_with_per_item_results(self, auth_client, user1):
+        from categories.models import Category
+        from notes.models import Note, NoteTombstone
+
+        cat1 = create_category(user1, "C1", "#F00")
+        cat2 = create_category(user1, "C2", "#0F0")
+        to_update = create_note(user1, cat1, "Old", "old body")
+        to_move = create_note(user1, cat1, "Move me", "")
+        to_delete = create_note(user1, cat1, "Bye", "")
+
+        response = auth_client.post(
+            "/api/notes/bulk/",
+            {
+                "create": [{"title": "A", "category_id": cat2.id}, {"title": "B"}],
+                "update": [{"id": to_update.id, "title": "New"}, {"id": 999999, "title": "X"}],
+                "move": [{"ids": [to_move.id, 999999], "category_id": cat2.id}],
+                "delete": [to_delete.id],
+            },
+            format="json",
+        )
+        assert response.status_code == 200
+        data = response.data
+        assert [r["status"] for r in data["create"]] == [201, 201]
+        assert [r["status"] for r in data["update"]] == [200, 404]
+        assert data["move"][0]["moved"] == [to_move.id]
+        assert data["move"][0]["not_found"] == [999999]
+        assert data["delete"] == [{"id": to_delete.id, "status": 204}]
+
+        to_update.refresh_from_db()
+        assert (to_update.title, to_update.content) == ("New", "old body")
+        assert Note.objects.get(pk=to_move.id).category_id == cat2.id
+        assert Note.objects.get(pk=data["create"][1]["id"]).category_id == cat1.id
+        assert not Note.objects.filter(pk=to_delete.id).exists()
+        assert NoteTombstone.objects.filter(note_id=to_delete.id).exists()
+        counts = dict(Category.objects.values_list("name", "notes_count"))
+        assert counts == {"C1": 2, "C2": 2}
+
+    def test_bulk_rejects_unowned_categories_per_item(self, api_client, user1, user2, user_password):
+        own = create_category(user1, "Mine", "#F00")
+        foreign = create_category(user2, "Theirs", "#0F0")
+        login(api_client, "user1@example.com", user_password)
+
+        response = api_client.post(
+            "/api/notes/bulk/",
+            {"create": [{"category_id": foreign.id}, {"category_id": own.id, "title": 5 * "x"}]},
+            format="json",
+        )
+        assert response.status_code == 200
+        first, second = response.data["create"]
+        assert first["status"] == 400 and "category_id" in first["errors"]
+        assert second["status"] == 201
+
+    def test_bulk_cannot_touch_other_users_notes(self, api_client, user1, user2, user_password):
+        cat2 = create_category(user2, "C2", "#0F0")
+        theirs = create_note(user2, cat2, "Theirs", "")
+        login(api_client, "user1@example.com", user_password)
+
+        response = api_client.post(
+            "/api/notes/bulk/", {"delete": [theirs.id]}, format="json"
+        )
+        assert response.data["delete"] == [{"id": theirs.id, "status": 404}]
+        theirs.refresh_from_db()
+
+    def test_bulk_uses_constant_number_of_queries(
+        self, auth_client, user1, django_assert_max_num_queries
+    ):
+        cat1 = create_category(user1, "C1", "#F00")
+        cat2 = create_category(user1, "C2", "#0F0")
+        notes = [create_note(user1, cat1, f"N{i}", "") for i in range(20)]
+
+        payload = {
+            "create": [{"title": f"new {i}", "category_id": cat2.id} for i in range(20)],
+            "update": [{"id": n.id, "content": "edited"} for n in notes[:10]],
+            "move": [{"ids": [n.id for n in notes[10:]], "category_id": cat2.id}],
+        }
+        with django_assert_max_num_queries(10):
+            response = auth_client.post("/api/notes/bulk/", payload, format="json")
+        assert response.status_code == 200
+
+    def test_bulk_update_writes_only_the_changed_columns(self, auth_client, user1, monkeypatch):
+        from notes.bulk import BulkNoteProcessor
+
+        cat1 = create_category(user1, "C1", "#F00")
+        cat2 = create_category(user1, "C2", "#0F0")
+        titled = create_note(user1, cat1, "Old", "body")
+        moved = create_note(user1, cat1, "Moved", "body")
+        load = BulkNoteProcessor._owned_notes
+
+        def load_then_move_elsewhere(processor, *args):
+            notes = load(processor, *args)
+            # Stands for a write committed between the read and the bulk_update.
+            Note.objects.filter(pk=titled.pk).update(category=cat2, content="edited elsewhere")
+            Category.objects.filter(pk=cat1.pk).update(notes_count=1)
+            Category.objects.filter(pk=cat2.pk).update(notes_count=1)
+            return notes
+
+        monkeypatch.setattr(BulkNoteProcessor, "_owned_notes", load_then_move_elsewhere)
+        response = auth_client.post(
+            "/api/notes/bulk/",
+            {
+                "update": [
+                    {"id": titled.id, "title": "New"},
+                    {"id": moved.id, "category_id": cat2.id, "title": "Moved"},
+                ]
+            },
+            format="json",
+        )
+        assert [r["status"] for r in response.data["update"]] == [200, 200]
+        titled.refresh_from_db()
+        assert (titled.title, titled.content, titled.category_id) == ("New", "edited elsewhere", cat2.id)
+        assert Note.objects.get(pk=moved.id).category_id == cat2.id
+        counts = dict(Category.objects.values_list("name", "notes_count"))
+        assert counts == {"C1": 0, "C2": 2}
+
+    def test_bulk_validates_envelope_and_limits(self, auth_client, settings):
+        assert auth_client.post("/api/notes/bulk/", {}, format="json").status_code == 400
+        settings.NOTES_BULK_MAX_ITEMS = 2
+        response = auth_client.post("/api/notes/bulk/", {"delete": [1, 2, 3]}, format="json")
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestNotesExport:
+    def _body(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_ndjson_export_streams_every_note_in_chunks(
+        self, api_client, user1, user2, user_password, settings, django_assert_num_queries
+    ):
+        settings.NOTES_EXPORT_CHUNK_SIZE = 2
+        cat = create_category(user1, "Work", "#F00")
+        for i in range(5):
+            create_note(user1, cat, f"N{i}", f"body {i} ✓")
+        create_note(user2, create_category(user2, "C", "#0F0"), "Theirs", "")
+        login(api_client, user1.email, user_password)
+
+        response = api_client.get("/api/notes/export")
+        assert response.status_code == 200
+        assert response.streaming
+        assert response["Content-Type"] == "application/x-ndjson"
+        assert "notes.ndjson" in response["Content-Disposition"]
+        chunks = list(response.streaming_content)
+        rows = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+        assert [r["title"] for r in rows] == [f"N{i}" for i in range(5)]
+        assert rows[0]["content"] == "body 0 ✓"
+        assert rows[0]["category"] == {"id": cat.id, "name": "Work", "color_hex": "#F00"}
+        # Three batches of at most two rows, then the (empty) tail.
+        assert len(chunks) == 4
+
+    def test_json_array_export_and_empty_export(self, auth_client, user1):
+        assert json.loads(self._body(auth_client.get("/api/notes/export?type=json"))) == []
+        create_note(user1, create_category(user1, "C", "#F00"), "Only", "x")
+        rows = json.loads(self._body(auth_client.get("/api/notes/export?type=json")))
+        assert [r["title"] for r in rows] == ["Only"]
+
+    def test_export_is_gzipped_when_accepted(self, auth_client, user1):
+        cat = create_category(user1, "C", "#F00")
+        for i in range(3):
+            create_note(user1, cat, f"N{i}", "x" * 1000)
+        response = auth_client.get("/api/notes/export", HTTP_ACCEPT_ENCODING="gzip, br")
+        assert response["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response["Vary"]
+        lines = gzip.decompress(self._body(response)).decode().splitlines()
+        assert len(lines) == 3
+
+    def test_async_export_matches_sync_export(self, user1):
+        cat = create_category(user1, "C", "#F00")
+        for i in range(3):
+            create_note(user1, cat, f"N{i}", "")
+
+        async def collect():
+            return b"".join([chunk async for chunk in aiter_export(export_queryset(user1), "json", 2)])
+
+        sync_body = b"".join(iter_export(export_queryset(user1), "json", 2))
+        assert async_to_sync(collect)() == sync_body
+
+    def test_export_rejects_unknown_type(self, auth_client):
+        assert auth_client.get("/api/notes/export?type=csv").status_code == 400
+
+
+@pytest.mark.django_db
+class TestNotesImport:
+    def _post(self, client, body, import_type="ndjson"):
+        return client.post(
+            f"/api/notes/import?type={import_type}", data=body, content_type="application/octet-stream"
+        )
+
+    def test_ndjson_import_batches_rows_and_reports_errors(
+        self, auth_client, user1, settings, django_assert_max_num_queries
+    ):
+        settings.NOTES_IMPORT_BATCH_SIZE = 2
+        default = create_category(user1, "Default", "#F00")
+        work = create_category(user1, "Work", "#0F0")
+        lines = [
+            {"title": "a", "content": "x", "category": "Work"},
+            {"title": "b", "category": {"name": "Trips", "color_hex": "#123456"}},
+            {"title": "c"},
+            {"title": "t" * 300},
+            "not json",
+            {"title": "d", "category": "Trips"},
+            {"title": "e", "category": "Work"},
+        ]
+        body = "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines)
+        with django_assert_max_num_queries(30):
+            response = self._post(auth_client, body)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["rows"] == 7 and data["created"] == 5 and data["failed"] == 2
+        assert data["batches"] == 3 and data["categories_created"] == 1
+        assert [e["row"] for e in data["errors"]] == [4, 5]
+        assert "title" in data["errors"][0]["errors"]
+
+        trips = Category.objects.get(user=user1, name="Trips")
+        assert trips.color_hex == "#123456"
+        by_title = dict(Note.objects.filter(user=user1).values_list("title", "category_id"))
+        assert by_title == {"a": work.id, "b": trips.id, "c": default.id, "d": trips.id, "e": work.id}
+        assert Category.objects.get(pk=work.pk).notes_count == 2
+        assert Category.objects.get(pk=trips.pk).notes_count == 2
+
+    def test_export_round_trips_through_json_import(self, auth_client, user1, user2, monkeypatch):
+        cat = create_category(user1, "Work", "#F00")
+        for i in range(4):
+            create_note(user1, cat, f"N{i}", f"body {i} ✓ with [brackets], and \"quotes\"")
+        exported = b"".join(auth_client.get("/api/notes/export?type=json").streaming_content)
+        # Tiny reads split values, strings and multi-byte characters across chunks.
+        monkeypatch.setattr("notes.importer._READ_SIZE", 7)
+        stats = NoteImporter(user2).run(iter_json_array(BytesIO(exported)))
+        assert (stats.rows, stats.created, stats.categories_created) == (4, 4, 1)
+        imported = Note.objects.filter(user=user2).order_by("id")
+        assert [n.content for n in imported] == [f"body {i} ✓ with [brackets], and \"quotes\"" for i in range(4)]
+        assert {n.category.name for n in imported} == {"Work"}
+
+    def test_malformed_json_keeps_rows_before_the_error(self, auth_client, user1):
+        create_category(user1, "C", "#F00")
+        response = self._post(auth_client, '[{"title": "ok"}, {"title": "broken"', import_type="json")
+        assert response.status_code == 400
+        assert response.json()["created"] == 1
+        assert self._post(auth_client, '{"title": "x"}', import_type="json").status_code == 400
+        assert self._post(auth_client, "[]", import_type="csv").status_code == 400
+
+    def test_json_array_that_is_not_utf8_is_rejected(self, auth_client, user1):
+        create_category(user1, "C", "#F00")
+        response = self._post(auth_client, b'[{"title": "ok"}, {"title": "\xff"}]', import_type="json")
+        assert response.status_code == 400
+        assert "UTF-8" in response.json()["detail"]
+
+    def test_import_command_reads_a_file_with_progress(self, user1, tmp_path):
+        create_category(user1, "C", "#F00")
+        path = tmp_path / "notes.ndjson"
+        path.write_text("\n".join(json.dumps({"title": f"n{i}"}) for i in range(5)))
+        out, err = StringIO(), StringIO()
+        call_command(
+            "import_notes", str(path), "--email", user1.email, "--batch-size", "2",
+            stdout=out, stderr=err,
+        )
+        assert "Imported 5 of 5 notes" in out.getvalue()
+        assert err.getvalue().count("batch") == 3
+        with pytest.raises(CommandError):
+            call_command("import_notes", str(path), "--email", "nobody@example.com")
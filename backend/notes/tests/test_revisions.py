@@ -0,0 +1,156 @@
+"""Tests for note revision history (notes.revisions)."""
+
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from conftest import create_category, create_note
+from notes.models import Note, NoteRevision
+from notes.revisions import apply_delta, encode_delta, rebuild, record_revision
+
+BODY = "".join(f"Paragraph {i}: some text that stays the same.\n" for i in range(200))
+
+
+def _patch(client, note, **data):
+    response = client.patch(f"/api/notes/{note.pk}/", data, format="json")
+    assert response.status_code == 200, response.content
+    return response
+
+
+class TestDeltas:
+    @pytest.mark.parametrize(
+        "base, content",
+        [
+            ("", "new"),
+            ("a\nb\nc\n", "a\nB\nc\nd"),
+            ("a\nb\nc\n", ""),
+            ("same\n" * 3, "same\n" * 5),
+            ("no newline", "no newline, longer"),
+            ("x\r\ny z", "x\r\nY z\n"),
+        ],
+    )
+    def test_round_trip(self, base, content):
+        assert apply_delta(base, encode_delta(base, content)) == content
+
+    def test_small_edit_is_much_smaller_than_the_content(self):
+        edited = BODY.replace("Paragraph 100:", "Paragraph one hundred:")
+        assert len(encode_delta(BODY, edited)) < 100 < len(BODY)
+
+
+@pytest.mark.django_db
+class TestRecording:
+    def test_first_edit_records_the_original_and_the_new_version(self, auth_client, user1):
+        note = create_note(user1, create_category(user1, "C"), "v1", BODY)
+        _patch(auth_client, note, content=BODY + "more")
+        _patch(auth_client, note, title="v3")
+        revisions = list(NoteRevision.objects.filter(note=note).order_by("number"))
+        assert [(r.number, r.title, r.depth) for r in revisions] == [
+            (1, "v1", 0), (2, "v1", 1), (3, "v3", 2),
+        ]
+        assert rebuild(note.pk, 1)[1] == BODY
+        assert rebuild(note.pk, 3)[1] == BODY + "more"
+
+    def test_no_revision_when_title_and_content_are_unchanged(self, auth_client, user1):
+        note = create_note(user1, create_category(user1, "C"), "t", "c")
+        other = create_category(user1, "Other")
+        _patch(auth_client, note, category_id=other.pk)
+        assert not NoteRevision.objects.exists()
+
+    def test_snapshot_interval_bounds_the_delta_chain(self, settings, user1):
+        settings.NOTES_REVISION_SNAPSHOT_INTERVAL = 4
+        note = create_note(user1, create_category(user1, "C"), "t", BODY)
+        versions = [BODY]
+        for i in range(10):
+            previous = note.title, note.content
+            note.content = note.content.replace(f"Paragraph {i}:", f"Edited {i}:")
+            note.save()
+            record_revision(note, *previous)
+            versions.append(note.content)
+        revisions = NoteRevision.objects.filter(note=note).order_by("number")
+        depths = list(revisions.values_list("depth", flat=True))
+        assert depths == [0, 1, 2, 3, 0, 1, 2, 3, 0, 1, 2]
+        for number, content in enumerate(versions, start=1):
+            assert rebuild(note.pk, number)[1] == content
+
+    def test_untracked_change_starts_a_new_snapshot(self, auth_client, user1):
+        note = create_note(user1, create_category(user1, "C"), "t", BODY)
+        _patch(auth_client, note, content=BODY + "one")
+        # Bulk updates and imports change notes without recording revisions.
+        Note.objects.filter(pk=note.pk).update(content="rewritten elsewhere\n" + BODY)
+        _patch(auth_client, note, content="rewritten elsewhere\n" + BODY + "two")
+        latest = NoteRevision.objects.get(note=note, number=3)
+        assert latest.depth == 0
+        assert rebuild(note.pk, 3)[1] == "rewritten elsewhere\n" + BODY + "two"
+
+    def test_written_in_the_update_transaction(self, auth_client, user1, monkeypatch):
+        note = create_note(user1, create_category(user1, "C"), "t", "c")
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("revision store down")
+
+        monkeypatch.setattr("notes.views.record_revision", fail)
+        with pytest.raises(RuntimeError):
+            auth_client.patch(f"/api/notes/{note.pk}/", {"content": "new"}, format="json")
+        note.refresh_from_db()
+        assert note.content == "c"
+
+    def test_disabled(self, settings, auth_client, user1):
+        settings.NOTES_REVISIONS_ENABLED = False
+        note = create_note(user1, create_category(user1, "C"), "t", "c")
+        _patch(auth_client, note, content="new")
+        assert not NoteRevision.objects.exists()
+
+    def test_deleting_the_note_deletes_its_history(self, auth_client, user1):
+        note = create_note(user1, create_category(user1, "C"), "t", "c")
+        _patch(auth_client, note, content="new")
+        auth_client.delete(f"/api/notes/{note.pk}/")
+        assert not NoteRevision.objects.exists()
+
+
+@pytest.mark.django_db
+class TestRevisionEndpoints:
+    def test_list_is_paginated_newest_first_without_content(self, auth_client, user1):
+        note = create_note(user1, create_category(user1, "C"), "t", BODY)
+        for i in range(4):
+            _patch(auth_client, note, content=BODY + f"edit {i}\n")
+        page = auth_client.get(f"/api/notes/{note.pk}/revisions/?page_size=3").json()
+        assert [r["number"] for r in page["results"]] == [5, 4, 3]
+        assert set(page["results"][0]) == {"number", "title", "content_length", "created_at"}
+        rest = auth_client.get(page["next"]).json()
+        assert [r["number"] for r in rest["results"]] == [2, 1]
+        assert rest["next"] is None
+
+    def test_detail_rebuilds_the_content(self, auth_client, user1):
+        note = create_note(user1, create_category(user1, "C"), "t", BODY)
+        _patch(auth_client, note, title="t2", content=BODY + "edit")
+        response = auth_client.get(f"/api/notes/{note.pk}/revisions/1")
+        assert response.json()["content"] == BODY
+        response = auth_client.get(f"/api/notes/{note.pk}/revisions/2/")
+        assert response.json()["title"] == "t2"
+        assert response.json()["content"] == BODY + "edit"
+        assert auth_client.get(f"/api/notes/{note.pk}/revisions/3/").status_code == 404
+
+    def test_other_users_notes_are_404(self, auth_client, user2):
+        note = create_note(user2, create_category(user2, "C"), "t", "c")
+        record_revision(note, "old", "old")
+        assert auth_client.get(f"/api/notes/{note.pk}/revisions/").status_code == 404
+        assert auth_client.get(f"/api/notes/{note.pk}/revisions/1/").status_code == 404
+
+    @pytest.mark.usefixtures("async_views")
+    def test_async_detail_view_records_revisions(self, auth_client, user1):
+        note = create_note(user1, create_category(user1, "C"), "t", "c")
+        response = auth_client.patch(f"/api/notes/{note.pk}/", {"content": "new"}, format="json")
+        assert response.status_code == 200
+        assert [rebuild(note.pk, n)[1] for n in (1, 2)] == ["c", "new"]
+
+
+@pytest.mark.django_db
+def test_benchmark_revisions_command():
+    out = StringIO()
+    call_command("benchmark_revisions", "--size", "2000", "--revisions", "5", stdout=out)
+    data = json.loads(out.getvalue())
+    assert data["revisions"] == 6
+    assert data["storage_bytes"]["stored"] < data["storage_bytes"]["full_copies"]
+    assert not Note.objects.exists()
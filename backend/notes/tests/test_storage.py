@@ -0,0 +1,215 @@
+"""Tests for the large-content storage tier (notes.storage)."""
+
+import gzip
+import json
+import random
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import create_category, create_note
+from notes.export import aiter_export, export_queryset
+from notes.models import Note, NoteContentChunk
+from notes.revisions import rebuild
+from notes import storage
+from notes.storage import load_bodies, load_content
+
+rng = random.Random(0)
+# No trailing whitespace: DRF's CharField would trim it from API writes.
+BIG = "\n".join(f"line {rng.getrandbits(64):016x}" for _ in range(200))
+
+
+@pytest.fixture
+def tier(settings):
+    settings.NOTES_LARGE_CONTENT_THRESHOLD = 1000
+    settings.NOTES_LARGE_CONTENT_HEAD_CHARS = 300
+    settings.NOTES_LARGE_CONTENT_CHUNK_BYTES = 512
+    settings.NOTES_PREVIEW_LENGTH = 200
+
+
+def _stored(note):
+    return Note.objects.values_list("content", "content_offloaded").get(pk=note.pk)
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("tier")
+class TestModel:
+    def test_large_body_is_chunked_out_of_the_row(self, user1):
+        note = create_note(user1, create_category(user1, "C"), "Big", BIG)
+        assert note.content == BIG
+        assert _stored(note) == (BIG[:300], True)
+        assert NoteContentChunk.objects.filter(note=note).count() > 1
+
+    def test_small_body_stays_inline(self, user1):
+        note = create_note(user1, create_category(user1, "C"), "Small", "short")
+        assert _stored(note) == ("short", False)
+        assert not NoteContentChunk.objects.exists()
+
+    def test_saving_a_loaded_note_keeps_its_body(self, user1):
+        note = create_note(user1, create_category(user1, "C"), "Big", BIG)
+        loaded = Note.objects.get(pk=note.pk)
+        loaded.title = "Renamed"
+        loaded.save()
+        assert _stored(note) == (BIG[:300], True)
+        assert Note.objects.get(pk=note.pk).content == BIG[:300]
+        assert load_content(Note.objects.get(pk=note.pk)) == BIG
+
+    def test_assigning_small_content_moves_it_back_inline(self, user1):
+        note = create_note(user1, create_category(user1, "C"), "Big", BIG)
+        loaded = Note.objects.get(pk=note.pk)
+        loaded.content = "short now"
+        loaded.save(update_fields=["content"])
+        assert _stored(note) == ("short now", False)
+        assert not NoteContentChunk.objects.exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("tier")
+class TestEndpoints:
+    def test_detail_returns_the_body_and_the_list_only_the_head(self, auth_client, user1):
+        note = create_note(user1, create_category(user1, "C"), "Big", BIG)
+        assert auth_client.get(f"/api/notes/{note.pk}/").json()["content"] == BIG
+        with CaptureQueriesContext(connection) as captured:
+            listed = auth_client.get("/api/notes/").json()["results"][0]
+        assert listed["content_preview"] == BIG[:200]
+        assert not any("notecontentchunk" in q["sql"] for q in captured.captured_queries)
+
+    def test_create_and_patch(self, auth_client, user1):
+        category = create_category(user1, "C")
+        created = auth_client.post(
+            "/api/notes/", {"title": "Big", "content": BIG, "category_id": category.pk}, format="json"
+        )
+        assert created.json()["content"] == BIG
+        note = Note.objects.get(pk=created.json()["id"])
+        edited = BIG.replace("line", "LINE", 1)
+        response = auth_client.patch(f"/api/notes/{note.pk}/", {"content": edited}, format="json")
+        assert response.json()["content"] == edited
+        assert auth_client.get(f"/api/notes/{note.pk}/").json()["content"] == edited
+        assert rebuild(note.pk, 1)[1] == BIG
+        assert rebuild(note.pk, 2)[1] == edited
+
+    def test_patching_other_fields_keeps_the_body(self, auth_client, user1):
+        note = create_note(user1, create_category(user1, "C"), "Big", BIG)
+        etag = auth_client.get(f"/api/notes/{note.pk}/")["ETag"]
+        unchanged = auth_client.patch(f"/api/notes/{note.pk}/", {"content": BIG}, format="json")
+        assert unchanged["ETag"] == etag
+        auth_client.patch(f"/api/notes/{note.pk}/", {"title": "Renamed"}, format="json")
+        assert auth_client.get(f"/api/notes/{note.pk}/").json()["content"] == BIG
+
+    @pytest.mark.usefixtures("async_views")
+    def test_async_detail(self, auth_client, user1):
+        note = create_note(user1, create_category(user1, "C"), "Big", BIG)
+        assert auth_client.get(f"/api/notes/{note.pk}/").json()["content"] == BIG
+        response = auth_client.patch(f"/api/notes/{note.pk}/", {"title": "T"}, format="json")
+        assert response.json()["content"] == BIG
+
+    def test_export(self, auth_client, user1):
+        category = create_category(user1, "C")
+        create_note(user1, category, "Big", BIG)
+        create_note(user1, category, "Small", "small")
+        response = auth_client.get("/api/notes/export", HTTP_ACCEPT_ENCODING="gzip")
+        lines = gzip.decompress(b"".join(response.streaming_content)).decode().splitlines()
+        assert [json.loads(line)["content"] for line in lines] == [BIG, "small"]
+
+    def test_async_export(self, user1):
+        create_note(user1, create_category(user1, "C"), "Big", BIG)
+
+        async def collect():
+            return b"".join([chunk async for chunk in aiter_export(export_queryset(user1), "ndjson", 10)])
+
+        assert json.loads(async_to_sync(collect)())["content"] == BIG
+
+    def test_bulk_create_and_update(self, auth_client, user1):
+        category = create_category(user1, "C")
+        kept = create_note(user1, category, "Kept", BIG)
+        shrunk = create_note(user1, category, "Shrunk", BIG)
+        response = auth_client.post(
+            "/api/notes/bulk/",
+            {
+                "create": [{"title": "New", "content": BIG, "category_id": category.pk}],
+                "update": [
+                    {"id": kept.pk, "title": "Only the title"},
+                    {"id": shrunk.pk, "content": "tiny"},
+                ],
+            },
+            format="json",
+        )
+        created_id = response.json()["create"][0]["id"]
+        assert auth_client.get(f"/api/notes/{created_id}/").json()["content"] == BIG
+        assert auth_client.get(f"/api/notes/{kept.pk}/").json()["content"] == BIG
+        assert _stored(shrunk) == ("tiny", False)
+        assert set(NoteContentChunk.objects.values_list("note_id", flat=True)) == {created_id, kept.pk}
+
+    def test_import(self, auth_client, user1):
+        create_category(user1, "Default")
+        body = json.dumps({"title": "Imported", "content": BIG}) + "\n"
+        auth_client.post("/api/notes/import", data=body, content_type="application/octet-stream")
+        note = Note.objects.get(title="Imported")
+        assert _stored(note)[1] is True
+        assert auth_client.get(f"/api/notes/{note.pk}/").json()["content"] == BIG
+
+
+@pytest.mark.django_db
+class TestOffloadCommand:
+    def test_moves_existing_notes_both_ways(self, settings, user1):
+        category = create_category(user1, "C")
+        notes = [create_note(user1, category, f"Big {i}", BIG + str(i)) for i in range(3)]
+        small = create_note(user1, category, "Small", "small")
+        updated_at = {n.pk: n.updated_at for n in Note.objects.all()}
+        settings.NOTES_LARGE_CONTENT_THRESHOLD = 1000
+
+        call_command("offload_note_contents", "--batch-size", "2", stdout=None)
+        assert [_stored(n)[1] for n in notes] == [True, True, True]
+        assert _stored(small) == ("small", False)
+        assert {n.pk: n.updated_at for n in Note.objects.all()} == updated_at
+        assert load_bodies([notes[2].pk]) == {notes[2].pk: BIG + "2"}
+
+        call_command("offload_note_contents", "--inline", stdout=None)
+        assert [_stored(n) for n in notes] == [(BIG + str(i), False) for i in range(3)]
+        assert not NoteContentChunk.objects.exists()
+
+    def test_skips_notes_written_after_the_batch_was_read(self, settings, monkeypatch, user1):
+        category = create_category(user1, "C")
+        edited, kept = (create_note(user1, category, f"Big {i}", BIG + str(i)) for i in range(2))
+        settings.NOTES_LARGE_CONTENT_THRESHOLD = 1000
+        original_head_chars = storage.head_chars
+
+        def head_chars_after_an_edit():
+            if Note.objects.get(pk=edited.pk).title != "Edited":
+                note = Note.objects.get(pk=edited.pk)
+                note.title, note.content = "Edited", "now short"
+                note.save()
+            return original_head_chars()
+
+        monkeypatch.setattr(storage, "head_chars", head_chars_after_an_edit)
+        assert storage.offload_existing(batch_size=10) == 1
+        assert _stored(edited) == ("now short", False)
+        assert _stored(kept)[1] is True
+        assert load_bodies([edited.pk, kept.pk]) == {kept.pk: BIG + "1"}
+
+    def test_inline_skips_notes_written_after_the_batch_was_read(self, settings, monkeypatch, user1):
+        settings.NOTES_LARGE_CONTENT_THRESHOLD = 1000
+        category = create_category(user1, "C")
+        edited, kept = (create_note(user1, category, f"Big {i}", BIG + str(i)) for i in range(2))
+        original_load_bodies = storage.load_bodies
+
+        def load_bodies_then_edit(note_ids):
+            bodies = original_load_bodies(note_ids)
+            note = Note.objects.get(pk=edited.pk)
+            note.content = BIG + " edited"
+            note.save()
+            return bodies
+
+        monkeypatch.setattr(storage, "load_bodies", load_bodies_then_edit)
+        assert storage.offload_existing(batch_size=10, inline=True) == 1
+        assert _stored(kept) == (BIG + "1", False)
+        assert _stored(edited) == ((BIG + " edited")[:storage.head_chars()], True)
+        assert original_load_bodies([edited.pk]) == {edited.pk: BIG + " edited"}
+
+    def test_requires_a_threshold(self, settings):
+        settings.NOTES_LARGE_CONTENT_THRESHOLD = 0
+        with pytest.raises(CommandError):
+            call_command("offload_note_contents")
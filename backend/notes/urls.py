@@ -1,11 +1,46 @@
+from django.conf import settings
 from django.urls import path
 
-from notes.views import NoteDetailView, NoteListCreateView
+from notes.views import (
+    AsyncNoteDetailView,
+    AsyncNoteListCreateView,
+    NoteBulkView,
+    NoteChangesView,
+    NoteDetailView,
+    NoteEventsView,
+    NoteExportView,
+    NoteImportView,
+    NoteListCreateView,
+    NoteRevisionDetailView,
+    NoteRevisionListView,
+    NoteSearchView,
+)
 
 app_name = "notes"
 
+if settings.API_ASYNC_VIEWS:
+    list_view, detail_view = AsyncNoteListCreateView, AsyncNoteDetailView
+else:
+    list_view, detail_view = NoteListCreateView, NoteDetailView
+
 urlpatterns = [
-    path("", NoteListCreateView.as_view(), name="list-create"),
-    path("<int:pk>/", NoteDetailView.as_view(), name="detail"),
-    path("<int:pk>", NoteDetailView.as_view(), name="detail-no-slash"),
+    path("", list_view.as_view(), name="list-create"),
+    path("search/", NoteSearchView.as_view(), name="search"),
+    path("search", NoteSearchView.as_view(), name="search-no-slash"),
+    path("bulk/", NoteBulkView.as_view(), name="bulk"),
+    path("bulk", NoteBulkView.as_view(), name="bulk-no-slash"),
+    path("changes/", NoteChangesView.as_view(), name="changes"),
+    path("changes", NoteChangesView.as_view(), name="changes-no-slash"),
+    path("events/", NoteEventsView.as_view(), name="events"),
+    path("events", NoteEventsView.as_view(), name="events-no-slash"),
+    path("export/", NoteExportView.as_view(), name="export"),
+    path("export", NoteExportView.as_view(), name="export-no-slash"),
+    path("import/", NoteImportView.as_view(), name="import"),
+    path("import", NoteImportView.as_view(), name="import-no-slash"),
+    path("<int:pk>/", detail_view.as_view(), name="detail"),
+    path("<int:pk>", detail_view.as_view(), name="detail-no-slash"),
+    path("<int:pk>/revisions/", NoteRevisionListView.as_view(), name="revisions"),
+    path("<int:pk>/revisions", NoteRevisionListView.as_view(), name="revisions-no-slash"),
+    path("<int:pk>/revisions/<int:number>/", NoteRevisionDetailView.as_view(), name="revision"),
+    path("<int:pk>/revisions/<int:number>", NoteRevisionDetailView.as_view(), name="revision-no-slash"),
 ]
@@ -1,45 +1,537 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models.functions import Substr
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.middleware.gzip import re_accepts_gzip
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from rest_framework import status
 from rest_framework.exceptions import ValidationError
 from rest_framework.generics import (
     CreateAPIView,
+    GenericAPIView,
     ListAPIView,
     RetrieveUpdateDestroyAPIView,
 )
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from categories.models import Category
-from notes.models import Note
-from notes.serializers import NoteSerializer
+from core import metrics
+from core.async_views import AsyncAPIView, json_response
+from core.cache import CachedListMixin, aget_or_build, response_key
+from notes.bulk import BulkNoteProcessor
+from notes.conditional import (
+    WRITE_SEQUENCE_HEADER,
+    aload_note_updated_at,
+    aload_versions,
+    check_if_match,
+    is_stale_write,
+    note_detail_etag,
+    note_detail_last_modified,
+    note_etag,
+    note_list_etag,
+    note_list_last_modified,
+    request_write_sequence,
+)
+from notes.events import event_stream
+from notes.export import EXPORT_FORMATS, aiter_export, export_queryset, iter_export
+from notes.importer import IMPORT_FORMATS, ImportFormatError, NoteImporter, iter_rows
+from notes.models import Note, NoteRevision
+from notes.pagination import (
+    KeysetCursorPagination,
+    RankedOffsetPagination,
+    RevisionCursorPagination,
+)
+from notes.revisions import rebuild, record_revision
+from notes.search import search_notes
+from notes.serializers import (
+    NOTE_ROW_COLUMNS,
+    BulkNoteOperationsSerializer,
+    NoteListSerializer,
+    NoteRevisionDetailSerializer,
+    NoteRevisionSerializer,
+    NoteSerializer,
+    note_list_row,
+    note_rows,
+)
+from notes.storage import afill_rows, fill_rows, load_content
+from notes.sync import CursorExpired, changes_since, decode_sync_cursor, record_tombstones
+
+# Columns each list field needs; id and updated_at are always loaded for the cursor.
+LIST_FIELD_COLUMNS = {
+    "id": [],
+    "title": ["title"],
+    "content_preview": [],
+    "category": ["category", "category__id", "category__name", "category__color_hex"],
+    "updated_at": [],
+}
+
+
+class NoteListRepresentationMixin:
+    """Serve GET requests in NoteListSerializer form from a column-trimmed queryset.
+
+    Lists are built from values() rows (notes.serializers.note_list_row); the
+    serializer remains the reference for their output.
+    """
+
+    def get_serializer_class(self):
+        if self.request.method == "GET":
+            return NoteListSerializer
+        return NoteSerializer
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method == "GET":
+            kwargs["fields"] = self.get_requested_fields()
+        return super().get_serializer(*args, **kwargs)
+
+    def get_requested_fields(self):
+        """Parse ?fields=a,b into a validated list (all list fields by default)."""
+        raw = self.request.query_params.get("fields")
+        if not raw:
+            return list(LIST_FIELD_COLUMNS)
+        requested = [f.strip() for f in raw.split(",") if f.strip()]
+        unknown = [f for f in requested if f not in LIST_FIELD_COLUMNS]
+        if unknown or not requested:
+            raise ValidationError(
+                {"fields": f"Unknown field(s): {', '.join(unknown)}. "
+                           f"Allowed: {', '.join(LIST_FIELD_COLUMNS)}."},
+                code="invalid",
+            )
+        return requested
+
+    def restrict_columns(self, qs, fields):
+        """Load only the columns the requested fields need; never the full content."""
+        columns = ["id", "updated_at"]
+        for field in fields:
+            columns.extend(LIST_FIELD_COLUMNS[field])
+        if "category" in fields:
+            qs = qs.select_related("category")
+        if "content_preview" in fields:
+            qs = qs.annotate(
+                content_preview=Substr("content", 1, settings.NOTES_PREVIEW_LENGTH)
+            )
+        return qs.only(*columns)
+
+    def list_rows(self, qs, fields):
+        """qs as values() rows for the read fast path, with their mapper to list output."""
+        columns, to_dicts = note_list_row(frozenset(fields))
+        return qs.values(*columns), to_dicts
 
+    def list(self, request, *args, **kwargs):
+        """ListAPIView.list() built from values() rows instead of NoteListSerializer."""
+        rows, to_dicts = self.list_rows(
+            self.filter_queryset(self.get_queryset()), self.get_requested_fields()
+        )
+        return self.get_paginated_response(to_dicts(self.paginate_queryset(rows)))
 
-class NoteListCreateView(ListAPIView, CreateAPIView):
-    """GET /api/notes/ - List notes. POST /api/notes/ - Create note."""
+
+def filter_by_category(qs, request):
+    """Apply ?category=<id> (or 'all') to a notes queryset."""
+    category_id = request.query_params.get("category")
+    if category_id and category_id != "all":
+        if not category_id.isdigit():
+            raise ValidationError(
+                {"category": "Must be a valid category id or 'all' (without quotes)."},
+                code="invalid",
+            )
+        qs = qs.filter(category_id=int(category_id))
+    return qs
+
+
+@method_decorator(
+    condition(etag_func=note_list_etag, last_modified_func=note_list_last_modified),
+    name="get",
+)
+class NoteListCreateView(
+    CachedListMixin, NoteListRepresentationMixin, ListAPIView, CreateAPIView
+):
+    """GET /api/notes/ - List notes (cursor paginated, cached). POST /api/notes/ - Create note."""
 
     serializer_class = NoteSerializer
+    pagination_class = KeysetCursorPagination
+    cache_namespace = "notes"
+    allow_stateless_user = True
 
     def get_queryset(self):
-        qs = Note.objects.filter(user=self.request.user).select_related("category")
-        category_id = self.request.query_params.get("category")
-        if category_id and category_id != "all":
-            if not category_id.isdigit():
-                raise ValidationError(
-                    {"category": "Must be a valid category id or 'all' (without quotes)."},
-                    code="invalid",
-                )
-            qs = qs.filter(category_id=int(category_id))
-        return qs.order_by("-updated_at")
+        qs = Note.objects.filter(user=self.request.user)
+        if self.request.method == "GET":
+            qs = self.restrict_columns(qs, self.get_requested_fields())
+        else:
+            qs = qs.select_related("category")
+        return filter_by_category(qs, self.request).order_by("-updated_at")
 
     def perform_create(self, serializer):
         user = self.request.user
         category = serializer.validated_data.get("category")
         if category is None:
-            category = Category.objects.filter(user=user).order_by("created_at").first()
+            category = Category.objects.filter(user=user).order_by("created_at", "id").first()
         serializer.save(user=user, category=category)
 
 
+class NoteSearchView(NoteListRepresentationMixin, ListAPIView):
+    """GET /api/notes/search?q= - Ranked full-text search over the user's notes."""
+
+    pagination_class = RankedOffsetPagination
+    allow_stateless_user = True
+
+    def get_queryset(self):
+        query = self.request.query_params.get("q", "").strip()
+        if not query:
+            raise ValidationError({"q": "This query parameter is required."}, code="required")
+        qs = Note.objects.filter(user=self.request.user)
+        qs = self.restrict_columns(qs, self.get_requested_fields())
+        return search_notes(qs, query)
+
+
+class NoteBulkView(APIView):
+    """POST /api/notes/bulk/ - Create, update, move and delete many notes in one transaction."""
+
+    def post(self, request):
+        serializer = BulkNoteOperationsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = BulkNoteProcessor(request.user).run(serializer.validated_data)
+        return Response(results, status=status.HTTP_200_OK)
+
+
+class NoteExportView(APIView):
+    """GET /api/notes/export?type=ndjson|json - Stream all of the user's notes.
+
+    Gzip-compressed on the fly when the client sends Accept-Encoding: gzip.
+    """
+
+    allow_stateless_user = True
+
+    def get(self, request):
+        export_format = request.query_params.get("type", "ndjson")
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError(
+                {"type": f"Must be one of: {', '.join(EXPORT_FORMATS)}."}, code="invalid"
+            )
+        compress = bool(re_accepts_gzip.search(request.META.get("HTTP_ACCEPT_ENCODING", "")))
+        # The ASGI handler buffers sync iterators whole, so feed it an async one.
+        stream = aiter_export if isinstance(request._request, ASGIRequest) else iter_export
+        content_type, filename = EXPORT_FORMATS[export_format]
+        response = StreamingHttpResponse(
+            stream(
+                export_queryset(request.user),
+                export_format,
+                settings.NOTES_EXPORT_CHUNK_SIZE,
+                compress,
+            ),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if compress:
+            response["Content-Encoding"] = "gzip"
+        return response
+
+
+class NoteImportView(APIView):
+    """POST /api/notes/import?type=ndjson|json - Stream-import notes from the request body.
+
+    Returns row, created and failed counts with the first per-row errors.
+    """
+
+    def post(self, request):
+        import_format = request.query_params.get("type", "ndjson")
+        if import_format not in IMPORT_FORMATS:
+            raise ValidationError(
+                {"type": f"Must be one of: {', '.join(IMPORT_FORMATS)}."}, code="invalid"
+            )
+        importer = NoteImporter(request.user)
+        # Read the raw body as a stream; request.data would load it all.
+        try:
+            stats = importer.run(iter_rows(request._request, import_format))
+        except ImportFormatError as exc:
+            return Response(
+                {"detail": str(exc), **importer.stats.as_dict()},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(stats.as_dict(), status=status.HTTP_200_OK)
+
+
+def parse_since(value):
+    """Decode an optional sync cursor from the client, or raise a 400."""
+    if not value:
+        return None
+    try:
+        return decode_sync_cursor(value)
+    except (ValueError, UnicodeError):
+        raise ValidationError({"since": "Invalid sync cursor."}, code="invalid")
+
+
+class NoteChangesView(NoteListRepresentationMixin, GenericAPIView):
+    """GET /api/notes/changes?since=<cursor> - Notes changed and deleted since a sync cursor.
+
+    At most NOTES_CHANGES_MAX notes per response; with has_more, the client
+    requests again with the returned cursor until has_more is false.
+    """
+
+    allow_stateless_user = True
+
+    def get(self, request):
+        since = parse_since(request.query_params.get("since"))
+        fields = self.get_requested_fields()
+        qs = self.restrict_columns(Note.objects.filter(user=request.user), fields)
+        rows, to_dicts = self.list_rows(qs, fields)
+        try:
+            rows, deleted, cursor, has_more = changes_since(
+                request.user, rows, since, limit=settings.NOTES_CHANGES_MAX
+            )
+        except CursorExpired:
+            return Response(
+                {"detail": "Sync cursor expired; perform a full sync without 'since'."},
+                status=status.HTTP_410_GONE,
+            )
+        return Response(
+            {
+                "cursor": cursor,
+                "notes": to_dicts(rows),
+                "deleted": deleted,
+                "has_more": has_more,
+            }
+        )
+
+
+class NoteEventsView(AsyncAPIView):
+    """GET /api/notes/events/ - Server-sent events for the user's note and category changes.
+
+    Resumes from the Last-Event-ID header (or ?since=<cursor>); see notes.events.
+    Served only by ASGI workers, where an idle stream costs no thread.
+    """
+
+    async def get(self, request):
+        if not isinstance(request._request, ASGIRequest):
+            return json_response(
+                {"detail": "Live updates need an ASGI server; poll /api/notes/changes/ instead."},
+                status=status.HTTP_501_NOT_IMPLEMENTED,
+            )
+        since = parse_since(
+            request.headers.get("Last-Event-ID") or request.query_params.get("since")
+        )
+        return StreamingHttpResponse(
+            event_stream(request.user, since),
+            content_type="text/event-stream",
+            # No caching, and no buffering by proxies such as nginx.
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+
+def update_locked_note(request, note, partial):
+    """Apply a PUT/PATCH to a note the caller has locked; returns (data, headers).
+
+    Only changed columns are written, and an update that changes nothing
+    writes nothing. With an X-Write-Sequence header, a write that is not newer
+    than the last one applied to the note is dropped without validation and
+    answered with the stored note, so autosaves that arrive out of order
+    cannot overwrite newer text.
+    """
+    sequence = request_write_sequence(request)
+    load_content(note)
+    if is_stale_write(note, sequence):
+        metrics.increment("notes.update.stale")
+        data = NoteSerializer(note, context={"request": request}).data
+    else:
+        previous = note.title, note.content
+        serializer = NoteSerializer(note, data=request.data, partial=partial, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        note = serializer.save(write_sequence=sequence)
+        if serializer.changed_fields:
+            metrics.increment("notes.update.written")
+            record_revision(note, *previous)
+        else:
+            metrics.increment("notes.update.unchanged")
+        data = serializer.data
+    headers = {"ETag": note_etag(note)}
+    if note.write_sequence is not None:
+        headers[WRITE_SEQUENCE_HEADER] = str(note.write_sequence)
+    return data, headers
+
+
+@method_decorator(
+    condition(etag_func=note_detail_etag, last_modified_func=note_detail_last_modified),
+    name="get",
+)
 class NoteDetailView(RetrieveUpdateDestroyAPIView):
-    """GET /api/notes/<id>/, PATCH /api/notes/<id>/, DELETE /api/notes/<id>/"""
+    """GET /api/notes/<id>/, PATCH /api/notes/<id>/, DELETE /api/notes/<id>/ (full content)
+
+    Writes honour If-Match against the note's ETag for optimistic concurrency.
+    """
 
     serializer_class = NoteSerializer
     lookup_url_kwarg = "pk"
+    allow_stateless_user = True
+
+    def get_queryset(self):
+        qs = Note.objects.filter(user=self.request.user).select_related("category")
+        if self.request.method not in SAFE_METHODS:
+            # Lock the row so the If-Match check and the write are atomic.
+            qs = qs.select_for_update(of=("self",))
+        return qs
+
+    def get_object(self):
+        note = super().get_object()
+        if self.request.method not in SAFE_METHODS:
+            check_if_match(self.request, note)
+        return note
+
+    def retrieve(self, request, *args, **kwargs):
+        """NoteSerializer output built from a values() row."""
+        row = (
+            Note.objects.filter(pk=kwargs["pk"], user=request.user)
+            .values(*NOTE_ROW_COLUMNS, "content_offloaded")
+            .first()
+        )
+        if row is None:
+            raise Http404("No Note matches the given query.")
+        return Response(note_rows(fill_rows([row]))[0])
+
+    @transaction.atomic
+    def update(self, request, *args, **kwargs):
+        data, headers = update_locked_note(request, self.get_object(), kwargs.get("partial", False))
+        return Response(data, headers=headers)
+
+    @transaction.atomic
+    def destroy(self, request, *args, **kwargs):
+        return super().destroy(request, *args, **kwargs)
+
+    def perform_destroy(self, instance):
+        note_id = instance.pk
+        super().perform_destroy(instance)
+        record_tombstones(instance.user_id, [note_id])
+
+
+@method_decorator(
+    condition(etag_func=note_list_etag, last_modified_func=note_list_last_modified),
+    name="get",
+)
+class AsyncNoteListCreateView(NoteListRepresentationMixin, AsyncAPIView):
+    """Async NoteListCreateView (settings.API_ASYNC_VIEWS): same responses, cache and ETags."""
+
+    allow_stateless_user = True
+
+    async def initial(self, request, *args, **kwargs):
+        await super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            await aload_versions(request)
+
+    async def get(self, request):
+        fields = self.get_requested_fields()
+        qs = self.restrict_columns(Note.objects.filter(user=request.user), fields)
+        qs = filter_by_category(qs, request)
+
+        async def build():
+            rows, to_dicts = self.list_rows(qs, fields)
+            paginator = KeysetCursorPagination()
+            page = await paginator.apaginate_queryset(rows, request, view=self)
+            return paginator.get_paginated_data(to_dicts(page))
+
+        key = response_key("notes", request.user.pk, request.get_full_path())
+        response = json_response(await aget_or_build(key, build))
+        response.api_cache_key = key
+        return response
+
+    async def post(self, request):
+        serializer = NoteSerializer(data=request.data, context={"request": request})
+        # Validation looks up the category_id among the user's categories.
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        category = serializer.validated_data.get("category")
+        if category is None:
+            category = (
+                await Category.objects.filter(user=request.user).order_by("created_at", "id").afirst()
+            )
+        note = Note(**{**serializer.validated_data, "user": request.user, "category": category})
+        await note.asave()
+        return json_response(NoteSerializer(note).data, status=status.HTTP_201_CREATED)
+
+
+@method_decorator(
+    condition(etag_func=note_detail_etag, last_modified_func=note_detail_last_modified),
+    name="get",
+)
+class AsyncNoteDetailView(AsyncAPIView):
+    """Async NoteDetailView (settings.API_ASYNC_VIEWS).
+
+    Reads use the async ORM. Writes lock the row for the If-Match check, which
+    needs a transaction, so each runs as one synchronous unit in a thread.
+    """
+
+    allow_stateless_user = True
+
+    async def initial(self, request, *args, **kwargs):
+        await super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            await aload_note_updated_at(request, kwargs["pk"])
+
+    async def get(self, request, pk):
+        row = await (
+            Note.objects.filter(pk=pk, user=request.user)
+            .values(*NOTE_ROW_COLUMNS, "content_offloaded")
+            .afirst()
+        )
+        if row is None:
+            raise Http404("No Note matches the given query.")
+        return json_response(note_rows(await afill_rows([row]))[0])
+
+    async def put(self, request, pk):
+        data, headers = await sync_to_async(self.update_note)(request, pk, partial=False)
+        return json_response(data, headers=headers)
+
+    async def patch(self, request, pk):
+        data, headers = await sync_to_async(self.update_note)(request, pk, partial=True)
+        return json_response(data, headers=headers)
+
+    async def delete(self, request, pk):
+        await sync_to_async(self.delete_note)(request, pk)
+        return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+    def get_locked_note(self, request, pk):
+        qs = Note.objects.filter(user=request.user).select_related("category")
+        note = get_object_or_404(qs.select_for_update(of=("self",)), pk=pk)
+        check_if_match(request, note)
+        return note
+
+    @transaction.atomic
+    def update_note(self, request, pk, partial):
+        return update_locked_note(request, self.get_locked_note(request, pk), partial)
+
+    @transaction.atomic
+    def delete_note(self, request, pk):
+        note = self.get_locked_note(request, pk)
+        note.delete()
+        record_tombstones(note.user_id, [pk])
+
+
+class NoteRevisionListView(ListAPIView):
+    """GET /api/notes/<id>/revisions/ - The note's revisions, newest first, without content."""
+
+    serializer_class = NoteRevisionSerializer
+    pagination_class = RevisionCursorPagination
+    allow_stateless_user = True
 
     def get_queryset(self):
-        return Note.objects.filter(user=self.request.user).select_related("category")
+        notes = Note.objects.only("id")
+        note = get_object_or_404(notes, pk=self.kwargs["pk"], user=self.request.user)
+        return NoteRevision.objects.filter(note=note).defer("data", "content_hash")
+
+
+class NoteRevisionDetailView(APIView):
+    """GET /api/notes/<id>/revisions/<number>/ - One revision, rebuilt with its full content."""
+
+    allow_stateless_user = True
+
+    def get(self, request, pk, number):
+        get_object_or_404(Note.objects.only("id"), pk=pk, user=request.user)
+        try:
+            revision, content = rebuild(pk, number)
+        except NoteRevision.DoesNotExist:
+            raise Http404("No revision matches the given query.")
+        revision.content = content
+        return Response(NoteRevisionDetailSerializer(revision).data)
@@ -1,5 +1,13 @@
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from core import metrics
+from users.user_cache import cache_user, get_cached_user
 
 ACCESS_COOKIE_NAME = "access_token"
 REFRESH_COOKIE_NAME = "refresh_token"
@@ -39,7 +47,13 @@ def clear_auth_cookies(response) -> None:
 
 
 class CookieJWTAuthentication(JWTAuthentication):
-    """JWT authentication via access_token cookie."""
+    """JWT authentication via access_token cookie.
+
+    Users are looked up through users.user_cache when AUTH_USER_CACHE_TTL is
+    set. With AUTH_STATELESS_READS, safe requests to views that declare
+    ``allow_stateless_user = True`` get an unsaved User built from the token
+    claims and skip the lookup entirely.
+    """
 
     def authenticate(self, request):
         raw_token = request.COOKIES.get("access_token")
@@ -47,6 +61,72 @@ class CookieJWTAuthentication(JWTAuthentication):
             return None
         try:
             validated_token = self.get_validated_token(raw_token)
+            if self.is_stateless_request(request):
+                return (self.get_token_user(validated_token), validated_token)
             return (self.get_user(validated_token), validated_token)
         except Exception:
+            metrics.increment("auth.token.invalid")
+            return None
+
+    async def aauthenticate(self, request):
+        """authenticate() for core.async_views.AsyncAPIView."""
+        raw_token = request.COOKIES.get("access_token")
+        if not raw_token:
+            return None
+        try:
+            validated_token = self.get_validated_token(raw_token)
+            if self.is_stateless_request(request):
+                return (self.get_token_user(validated_token), validated_token)
+            return (await self.aget_user(validated_token), validated_token)
+        except Exception:
+            metrics.increment("auth.token.invalid")
             return None
+
+    def is_stateless_request(self, request) -> bool:
+        """Whether to use the token user: only for safe methods on views that allow it.
+
+        Views that also accept writes (list/create, detail) can set
+        ``allow_stateless_user``: their writes still load the full user.
+        """
+        if not settings.AUTH_STATELESS_READS or request.method not in SAFE_METHODS:
+            return False
+        view = (getattr(request, "parser_context", None) or {}).get("view")
+        return getattr(view, "allow_stateless_user", False)
+
+    def get_token_user(self, validated_token):
+        """Build a lightweight, unsaved user carrying only the id from the token.
+
+        It is always active: a deactivated account keeps read access until the
+        access token expires (see AUTH_STATELESS_READS).
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+        user = get_user_model()(**{api_settings.USER_ID_FIELD: user_id, "is_active": True})
+        user._state.adding = False  # stands for an existing row
+        return user
+
+    def cached_user(self, validated_token):
+        """(cached user or None, token for cache_user() after loading it on a miss)."""
+        if settings.AUTH_USER_CACHE_TTL <= 0:
+            return None, None
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return None, None
+        return get_cached_user(user_id)
+
+    def get_user(self, validated_token):
+        user, token = self.cached_user(validated_token)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache_user(user, token)
+        return user
+
+    async def aget_user(self, validated_token):
+        """get_user() for async views: cache hits stay on the event loop, misses load in a thread."""
+        user, token = self.cached_user(validated_token)
+        if user is None:
+            user = await sync_to_async(super().get_user)(validated_token)
+            cache_user(user, token)
+        return user
@@ -0,0 +1,55 @@
+"""Password hashing on a bounded worker pool.
+
+PBKDF2 is deliberately slow. With AUTH_HASH_WORKERS > 0 every hash (signup,
+login and Django's dummy hash for unknown users) runs on a process-wide pool
+of that many threads, so a burst of logins occupies at most that many cores
+while other requests keep being served. The request thread waits for its
+result; hashes and their format are unchanged.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+from core import metrics
+
+_lock = threading.Lock()
+_executor = None
+
+
+def _get_executor(workers: int) -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None or _executor._max_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        return _executor
+
+
+def run_hash(func, *args, **kwargs):
+    """Call func on the hashing pool (inline when AUTH_HASH_WORKERS is 0)."""
+    workers = settings.AUTH_HASH_WORKERS
+    if workers <= 0:
+        return func(*args, **kwargs)
+    submitted = time.perf_counter()
+
+    def timed():
+        metrics.observe("auth.hash_queue_ms", (time.perf_counter() - submitted) * 1000.0)
+        return func(*args, **kwargs)
+
+    return _get_executor(workers).submit(timed).result()
+
+
+class PooledPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """Django's default PBKDF2 hasher, computed on the AUTH_HASH_WORKERS pool.
+
+    verify() and harden_runtime() go through encode(), so they are pooled too.
+    """
+
+    def encode(self, password, salt, iterations=None):
+        metrics.increment("auth.password_hashes")
+        return run_hash(super().encode, password, salt, iterations)
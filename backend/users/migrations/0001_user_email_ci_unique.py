@@ -0,0 +1,17 @@
+from django.db import migrations
+
+# auth.User belongs to django.contrib.auth, so the index is created with SQL
+# rather than declared on the model. LOWER() works on PostgreSQL and SQLite.
+CREATE_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS users_user_email_ci_unique ON auth_user (LOWER(email))"
+DROP_INDEX = "DROP INDEX IF EXISTS users_user_email_ci_unique"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_INDEX, DROP_INDEX),
+    ]
@@ -0,0 +1,19 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.user_cache import evict_user
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User, dispatch_uid="users_user_saved")
+def user_saved(sender, instance, created, **kwargs):
+    # Any change may deactivate the user or rotate the password hash.
+    if not created:
+        evict_user(instance.pk)
+
+
+@receiver(post_delete, sender=User, dispatch_uid="users_user_deleted")
+def user_deleted(sender, instance, **kwargs):
+    evict_user(instance.pk)
@@ -23,7 +23,7 @@ class TestSignup:
 
         User = get_user_model()
         user = User.objects.get(email="newuser@example.com")
-        categories = list(Category.objects.filter(user=user).order_by("created_at"))
+        categories = list(Category.objects.filter(user=user).order_by("created_at", "id"))
         assert len(categories) == 3
         expected = [(c.name, c.color_hex) for c in categories]
         assert expected == list(DEFAULT_CATEGORIES)
@@ -37,6 +37,47 @@ class TestSignup:
         assert response.status_code == 400
         assert "email" in response.data
 
+    def test_signup_duplicate_email_in_other_case_returns_400(self, api_client, user_password):
+        from conftest import create_user
+
+        create_user("Mixed.Case@Example.com", user_password)
+        response = api_client.post(
+            "/api/auth/signup/",
+            {"email": "mixed.case@example.com", "password": user_password},
+            format="json",
+        )
+        assert response.status_code == 400
+        assert response.data == {"email": ["A user with this email already exists."]}
+
+    def test_signup_inserts_default_categories_in_one_query(self, api_client, user_password):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as captured:
+            response = api_client.post(
+                "/api/auth/signup/",
+                {"email": "fast@example.com", "password": user_password},
+                format="json",
+            )
+        assert response.status_code == 201
+        statements = [q["sql"] for q in captured.captured_queries if "SAVEPOINT" not in q["sql"]]
+        assert len(statements) == 2
+        assert statements[1].startswith('INSERT INTO "categories_category"')
+
+    def test_password_hashing_can_run_on_a_worker_pool(self, api_client, settings, user_password):
+        from core import metrics
+
+        settings.AUTH_HASH_WORKERS = 2
+        api_client.post(
+            "/api/auth/signup/",
+            {"email": "pooled@example.com", "password": user_password},
+            format="json",
+        )
+        assert login(api_client, "pooled@example.com", user_password).status_code == 200
+        assert login(api_client, "pooled@example.com", "wrong-password").status_code == 401
+        # One hash at signup, one per login attempt.
+        assert metrics.summaries("auth.")["auth.hash_queue_ms"]["count"] == 3
+
 
 @pytest.mark.django_db
 class TestLogin:
@@ -78,3 +119,155 @@ class TestLogout:
         # Server sets both cookies with max_age=0 to clear them
         assert "access_token" in response.cookies
         assert "refresh_token" in response.cookies
+
+
+@pytest.mark.django_db
+class TestAuthenticatedUserCache:
+    def _user_queries(self, client, path):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(path)
+        assert response.status_code == 200
+        return [q for q in ctx.captured_queries if 'FROM "auth_user"' in q["sql"]]
+
+    def test_repeat_requests_skip_user_lookup(self, auth_client):
+        assert len(self._user_queries(auth_client, "/api/auth/me/")) == 1
+        assert self._user_queries(auth_client, "/api/auth/me/") == []
+
+    def test_shared_tier_serves_other_workers(self, auth_client):
+        from users.user_cache import clear_local
+
+        self._user_queries(auth_client, "/api/auth/me/")
+        clear_local()  # simulate a different process
+        assert self._user_queries(auth_client, "/api/auth/me/") == []
+
+    def test_deactivating_user_invalidates_cache(self, auth_client, user1):
+        auth_client.get("/api/auth/me/")
+        user1.is_active = False
+        user1.save()
+        assert auth_client.get("/api/auth/me/").status_code in (401, 403)
+
+    def test_password_change_invalidates_cache(self, auth_client, user1):
+        self._user_queries(auth_client, "/api/auth/me/")
+        user1.set_password("another-password")
+        user1.save()
+        assert len(self._user_queries(auth_client, "/api/auth/me/")) == 1
+
+    def test_fill_that_raced_an_eviction_is_discarded(self, user1):
+        from users.user_cache import cache_user, evict_user, get_cached_user
+
+        user, token = get_cached_user(user1.pk)
+        assert user is None
+        evict_user(user1.pk)  # e.g. a deactivation committed while the row was loading
+        cache_user(user1, token)
+        assert get_cached_user(user1.pk)[0] is None
+
+        user, token = get_cached_user(user1.pk)
+        cache_user(user1, token)
+        assert get_cached_user(user1.pk)[0].pk == user1.pk
+
+    def test_deactivation_during_a_lookup_is_not_cached_over(
+        self, auth_client, user1, monkeypatch
+    ):
+        from django.contrib.auth import get_user_model
+        from rest_framework_simplejwt.authentication import JWTAuthentication
+
+        load = JWTAuthentication.get_user
+
+        def load_then_deactivate(self, validated_token):
+            user = load(self, validated_token)
+            deactivated = get_user_model().objects.get(pk=user1.pk)
+            deactivated.is_active = False
+            deactivated.save()
+            return user
+
+        monkeypatch.setattr(JWTAuthentication, "get_user", load_then_deactivate)
+        assert auth_client.get("/api/auth/me/").status_code == 200
+        monkeypatch.setattr(JWTAuthentication, "get_user", load)
+        assert auth_client.get("/api/auth/me/").status_code in (401, 403)
+
+    def test_cache_disabled_with_zero_ttl(self, auth_client, settings):
+        settings.AUTH_USER_CACHE_TTL = 0
+        self._user_queries(auth_client, "/api/auth/me/")
+        assert len(self._user_queries(auth_client, "/api/auth/me/")) == 1
+
+    def test_stateless_reads_skip_lookup_on_opted_in_views(self, auth_client, settings):
+        from users.user_cache import clear_local
+        from django.core.cache import cache
+
+        settings.AUTH_STATELESS_READS = True
+        cache.clear()
+        clear_local()
+        assert self._user_queries(auth_client, "/api/notes/") == []
+        # Views that need the full user row still load it.
+        assert len(self._user_queries(auth_client, "/api/auth/me/")) == 1
+
+
+@pytest.mark.django_db
+class TestAuthThrottling:
+    def _login(self, client, email, password="wrongpassword", ip="10.0.0.1"):
+        return client.post(
+            "/api/auth/login/",
+            {"email": email, "password": password},
+            format="json",
+            REMOTE_ADDR=ip,
+        )
+
+    def test_login_is_limited_per_email_before_hashing(self, api_client, user1, settings):
+        from core import metrics
+
+        settings.AUTH_THROTTLE_RATES = {**settings.AUTH_THROTTLE_RATES, "login_email": "2/min"}
+        for _ in range(2):
+            assert self._login(api_client, "User1@example.com").status_code == 401
+        hashes = metrics.snapshot("auth.password_hashes").get("auth.password_hashes", 0)
+
+        response = self._login(api_client, "user1@example.com", ip="10.0.0.2")
+
+        assert response.status_code == 429
+        assert int(response["Retry-After"]) >= 1
+        assert metrics.snapshot("auth.password_hashes").get("auth.password_hashes", 0) == hashes
+        counters = metrics.snapshot("auth_throttle")
+        assert counters["auth_throttle.rejected.login_email"] == 1
+        assert counters["auth_throttle.hashes_avoided"] == 1
+
+    def test_login_is_limited_per_ip(self, api_client, user1, settings):
+        settings.AUTH_THROTTLE_RATES = {**settings.AUTH_THROTTLE_RATES, "login_ip": "3/min"}
+        for n in range(3):
+            assert self._login(api_client, f"someone{n}@example.com").status_code == 401
+        assert self._login(api_client, "other@example.com").status_code == 429
+        assert self._login(api_client, "other@example.com", ip="10.0.0.9").status_code == 401
+
+    def test_signup_is_limited_per_ip(self, api_client, user_password, settings):
+        settings.AUTH_THROTTLE_RATES = {**settings.AUTH_THROTTLE_RATES, "signup_ip": "1/hour"}
+        payload = {"email": "first@example.com", "password": user_password}
+        assert api_client.post("/api/auth/signup/", payload, format="json").status_code == 201
+        payload["email"] = "second@example.com"
+        response = api_client.post("/api/auth/signup/", payload, format="json")
+        assert response.status_code == 429
+        assert "Retry-After" in response
+
+    def test_throttling_can_be_disabled(self, api_client, user1, settings):
+        settings.AUTH_THROTTLE_ENABLED = False
+        settings.AUTH_THROTTLE_RATES = {**settings.AUTH_THROTTLE_RATES, "login_email": "1/min"}
+        for _ in range(3):
+            assert self._login(api_client, "user1@example.com").status_code == 401
+
+    def test_previous_window_still_counts(self):
+        from users.throttling import SlidingWindowThrottle
+
+        # 7 now + 8 previous at half weight: over 10/min until the previous weighs 3.
+        assert SlidingWindowThrottle._wait(10, 60, 7, 8, 30.0) == 8
+        assert SlidingWindowThrottle._wait(10, 60, 10, 8, 30.0) == 30
+
+    def test_staff_can_read_auth_counters(self, api_client, user_password):
+        from conftest import create_user
+
+        admin = create_user("ops@example.com", user_password)
+        admin.is_staff = True
+        admin.save()
+        login(api_client, admin.email, user_password)
+        response = api_client.get("/api/ops/auth/")
+        assert response.status_code == 200
+        assert response.json()["counters"]["auth.password_hashes"] >= 1
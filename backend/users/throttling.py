@@ -0,0 +1,125 @@
+"""Sliding-window throttles for the password endpoints (login, signup).
+
+Each hash costs tens of milliseconds of CPU, so credential stuffing or a
+signup flood is mostly hashing work. These throttles run in DRF's
+``initial()``, before the view validates credentials or hashes anything, and
+reject with 429 and Retry-After once a client IP or an email address goes
+over its AUTH_THROTTLE_RATES limit.
+
+The window is the usual sliding-window counter: one counter per fixed
+window in the shared Django cache (``cache.incr`` is atomic on Redis), with
+the previous window weighted by how much of it still overlaps. Every
+attempt counts, including rejected ones, so a client that keeps retrying
+stays throttled.
+"""
+
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+from core import metrics
+
+_PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """Parse "<count>/<s|min|hour|day>" into (count, seconds); None when unset."""
+    if not rate:
+        return None
+    count, _, period = rate.partition("/")
+    return int(count), _PERIODS[period.strip()[0]]
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Limit requests per ``get_ident_key()`` to AUTH_THROTTLE_RATES[scope]."""
+
+    scope = None
+
+    def get_ident_key(self, request):
+        """Identifier to count against, or None to let the request through."""
+        raise NotImplementedError
+
+    def allow_request(self, request, view) -> bool:
+        rate = parse_rate(settings.AUTH_THROTTLE_RATES.get(self.scope))
+        if not settings.AUTH_THROTTLE_ENABLED or rate is None:
+            return True
+        ident = self.get_ident_key(request)
+        if ident is None:
+            return True
+        limit, period = rate
+        now = time.time()
+        window = int(now // period)
+        key = f"throttle:{self.scope}:{ident}"
+        cache = caches[settings.API_CACHE_ALIAS]
+        current_key = f"{key}:{window}"
+        cache.add(current_key, 0, timeout=period * 2)
+        try:
+            current = cache.incr(current_key)
+        except ValueError:
+            # Evicted between add() and incr().
+            cache.set(current_key, 1, timeout=period * 2)
+            current = 1
+        previous = cache.get(f"{key}:{window - 1}", 0)
+        elapsed = now - window * period
+        if previous * (1 - elapsed / period) + current <= limit:
+            return True
+        self.wait_seconds = self._wait(limit, period, current, previous, elapsed)
+        metrics.increment(f"auth_throttle.rejected.{self.scope}")
+        return False
+
+    @staticmethod
+    def _wait(limit, period, current, previous, elapsed) -> int:
+        if current >= limit or not previous:
+            seconds = period - elapsed
+        else:
+            # Until the previous window's weight has decayed enough.
+            seconds = period * (1 - (limit - current) / previous) - elapsed
+        return max(1, math.ceil(seconds))
+
+    def wait(self):
+        return getattr(self, "wait_seconds", None)
+
+
+class IPThrottle(SlidingWindowThrottle):
+    def get_ident_key(self, request):
+        return self.get_ident(request)
+
+
+class EmailThrottle(SlidingWindowThrottle):
+    def get_ident_key(self, request):
+        try:
+            email = request.data.get("email")
+        except AttributeError:
+            return None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        # Normalised as the views do; hashed to keep addresses out of cache keys.
+        return hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+
+
+class LoginIPThrottle(IPThrottle):
+    scope = "login_ip"
+
+
+class LoginEmailThrottle(EmailThrottle):
+    scope = "login_email"
+
+
+class SignupIPThrottle(IPThrottle):
+    scope = "signup_ip"
+
+
+class SignupEmailThrottle(EmailThrottle):
+    scope = "signup_email"
+
+
+class PasswordThrottleMixin:
+    """Counts the hashes a throttled login/signup request did not compute."""
+
+    def throttled(self, request, wait):
+        metrics.increment("auth_throttle.hashes_avoided")
+        super().throttled(request, wait)
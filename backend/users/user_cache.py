@@ -0,0 +1,111 @@
+"""Two-tier cache of authenticated users keyed by id.
+
+A short-lived in-process tier answers repeat requests on the same worker
+without any I/O; the shared Django cache tier serves the other workers.
+User saves and deletes evict both tiers (the in-process tier only in the
+current process, which is why its TTL is kept short).
+
+Shared entries are keyed by a per-user generation that eviction bumps, as in
+core.cache. A lookup returns the generation it read along with the user,
+and a fill after a miss stores under that generation with ``cache.add``: a
+user loaded before an eviction lands under a key nobody reads any more,
+instead of bringing the evicted user back for AUTH_USER_CACHE_TTL.
+"""
+
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from core import metrics
+
+_lock = threading.Lock()
+_local = {}
+# Evictions seen by this process; a local fill is dropped if one happened since its lookup.
+_evictions = 0
+
+
+def _shared():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def _generation_key(user_id) -> str:
+    return f"auth:user:gen:{user_id}"
+
+
+def _key(user_id, generation) -> str:
+    return f"auth:user:{user_id}:{generation}"
+
+
+def _generation(user_id) -> int:
+    cache = _shared()
+    key = _generation_key(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        # Seed from the clock so an evicted counter never reuses an old generation.
+        cache.add(key, time.time_ns(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def get_cached_user(user_id):
+    """Return (a private copy of the cached user or None, fill token for cache_user)."""
+    now = time.monotonic()
+    with _lock:
+        entry = _local.get(user_id)
+        evictions = _evictions
+    if entry is not None and entry[0] > now:
+        metrics.increment("auth_user_cache.local_hit")
+        return copy.copy(entry[1]), None
+
+    generation = _generation(user_id)
+    user = _shared().get(_key(user_id, generation))
+    if user is None:
+        metrics.increment("auth_user_cache.miss")
+        return None, (generation, evictions)
+    metrics.increment("auth_user_cache.shared_hit")
+    _store_local(user_id, user, evictions)
+    return copy.copy(user), None
+
+
+def cache_user(user, token) -> None:
+    """Store a user loaded after a miss, unless it was evicted since the lookup.
+
+    ``token`` comes from get_cached_user(); None (cache off) stores nothing.
+    """
+    if token is None:
+        return
+    generation, evictions = token
+    _shared().add(_key(user.pk, generation), user, timeout=settings.AUTH_USER_CACHE_TTL)
+    _store_local(user.pk, user, evictions)
+
+
+def _store_local(user_id, user, evictions) -> None:
+    ttl = settings.AUTH_USER_LOCAL_CACHE_TTL
+    if ttl <= 0:
+        return
+    with _lock:
+        if evictions == _evictions:
+            _local[user_id] = (time.monotonic() + ttl, copy.copy(user))
+
+
+def evict_user(user_id) -> None:
+    """Drop user_id from both tiers (local tier in this process only)."""
+    global _evictions
+    with _lock:
+        _evictions += 1
+        _local.pop(user_id, None)
+    cache = _shared()
+    key = _generation_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def clear_local() -> None:
+    """Empty the in-process tier (used by tests)."""
+    with _lock:
+        _local.clear()
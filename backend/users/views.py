@@ -1,4 +1,5 @@
 from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import make_password
 from django.db import IntegrityError, transaction
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
@@ -8,6 +9,7 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from categories.models import Category
+from core import metrics
 from users.authentication import (
     REFRESH_COOKIE_NAME,
     clear_auth_cookies,
@@ -15,14 +17,22 @@ from users.authentication import (
     set_auth_cookies,
 )
 from users.serializers import DEFAULT_CATEGORIES, LoginSerializer, SignupSerializer
+from users.throttling import (
+    LoginEmailThrottle,
+    LoginIPThrottle,
+    PasswordThrottleMixin,
+    SignupEmailThrottle,
+    SignupIPThrottle,
+)
 
 User = get_user_model()
 
 
-class SignupView(APIView):
+class SignupView(PasswordThrottleMixin, APIView):
     """POST /api/auth/signup/ - Create a new user with default categories."""
 
     permission_classes = [AllowAny]
+    throttle_classes = [SignupIPThrottle, SignupEmailThrottle]
 
     def post(self, request: Request) -> Response:
         serializer = SignupSerializer(data=request.data)
@@ -32,37 +42,38 @@ class SignupView(APIView):
         email = serializer.validated_data["email"].strip().lower()
         password = serializer.validated_data["password"]
 
-        if User.objects.filter(email__iexact=email).exists():
-            return Response(
-                {"email": ["A user with this email already exists."]},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
+        # Hash before the transaction so it is not held open during PBKDF2.
+        user = User(username=email, email=email, password=make_password(password))
+        # Duplicates (in any letter case) are caught by the unique index on
+        # LOWER(email) instead of a separate existence query.
         try:
             with transaction.atomic():
-                user = User.objects.create_user(
-                    username=email,
-                    email=email,
-                    password=password,
+                user.save()
+                Category.objects.bulk_create(
+                    [
+                        Category(user=user, name=name, color_hex=color_hex)
+                        for name, color_hex in DEFAULT_CATEGORIES
+                    ]
                 )
-                for name, color_hex in DEFAULT_CATEGORIES:
-                    Category.objects.create(user=user, name=name, color_hex=color_hex)
         except IntegrityError:
+            metrics.increment("auth.signup.failure")
             return Response(
-                {"detail": "Unable to create user or default categories."},
+                {"email": ["A user with this email already exists."]},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        metrics.increment("auth.signup.success")
         return Response(
             {"id": user.id, "email": user.email},
             status=status.HTTP_201_CREATED,
         )
 
 
-class LoginView(APIView):
+class LoginView(PasswordThrottleMixin, APIView):
     """POST /api/auth/login/ - Authenticate user and set JWT cookies."""
 
     permission_classes = [AllowAny]
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
 
     def post(self, request: Request) -> Response:
         serializer = LoginSerializer(data=request.data)
@@ -74,11 +85,13 @@ class LoginView(APIView):
 
         user = authenticate(request, username=email, password=password)
         if user is None:
+            metrics.increment("auth.login.failure")
             return Response(
                 {"detail": "Invalid credentials"},
                 status=status.HTTP_401_UNAUTHORIZED,
             )
 
+        metrics.increment("auth.login.success")
         refresh = RefreshToken.for_user(user)
         response = Response(
             {"id": user.id, "email": user.email},
@@ -107,6 +120,7 @@ class RefreshView(APIView):
     def post(self, request: Request) -> Response:
         refresh_token = request.COOKIES.get(REFRESH_COOKIE_NAME)
         if not refresh_token:
+            metrics.increment("auth.refresh.failure")
             return Response(
                 {"detail": "Refresh token missing or invalid"},
                 status=status.HTTP_401_UNAUTHORIZED,
@@ -116,8 +130,10 @@ class RefreshView(APIView):
             access_token = str(refresh.access_token)
             response = Response({"ok": True}, status=status.HTTP_200_OK)
             set_access_cookie(response, access_token)
+            metrics.increment("auth.refresh.success")
             return response
         except Exception:
+            metrics.increment("auth.refresh.failure")
             return Response(
                 {"detail": "Refresh token missing or invalid"},
                 status=status.HTTP_401_UNAUTHORIZED,
@@ -7,7 +7,7 @@ import { useEffect, useState } from "react";
 import { AuthGuard } from "@/components/AuthGuard";
 import { CategoryButton } from "@/components/CategoryButton";
 import { NoteCard } from "@/components/NoteCard";
-import { api } from "@/lib/api";
+import { api, fetchAllPages } from "@/lib/api";
 
 type Category = {
   id: number;
@@ -19,7 +19,7 @@ type Category = {
 type Note = {
   id: number;
   title: string;
-  content: string;
+  content_preview: string;
   category: { id: number; name: string; color_hex: string };
   updated_at: string;
 };
@@ -37,7 +37,7 @@ export default function DashboardPage() {
     try {
       const [catsRes, notesRes] = await Promise.all([
         api.get<Category[]>("/api/categories/"),
-        api.get<Note[]>("/api/notes/"),
+        fetchAllPages<Note>("/api/notes/"),
       ]);
       setCategories(catsRes ?? []);
       setNotes(notesRes ?? []);
@@ -7,7 +7,7 @@ type NoteCardProps = {
   note: {
     id: number;
     title: string;
-    content: string;
+    content_preview: string;
     category: { id: number; name: string; color_hex: string };
     updated_at: string;
   };
@@ -29,7 +29,7 @@ export function NoteCard({ note }: NoteCardProps) {
         {note.title || "Untitled"}
       </h3>
       <p className="text-sm leading-relaxed text-black line-clamp-3 whitespace-pre-wrap">
-        {note.content || "No content"}
+        {note.content_preview || "No content"}
       </p>
     </Link>
   );
@@ -76,6 +76,24 @@ export async function apiFetch<T>(
   return doFetch<T>(path, options);
 }
 
+export type Paginated<T> = {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+};
+
+/** Follow `next` cursors of a paginated list endpoint and collect every page. */
+export async function fetchAllPages<T>(path: string): Promise<T[]> {
+  const items: T[] = [];
+  let next: string | null = path;
+  while (next) {
+    const page: Paginated<T> = await apiFetch<Paginated<T>>(next);
+    items.push(...(page?.results ?? []));
+    next = page?.next ?? null;
+  }
+  return items;
+}
+
 export const api = {
   get: <T>(path: string) => apiFetch<T>(path),
 